@@ -0,0 +1 @@
+"""Performance benchmarks for fennil (run with ``python -m benchmarks``)."""
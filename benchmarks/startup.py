@@ -0,0 +1,31 @@
+"""Cold-start time of the fennil entry point, measured in fresh interpreters."""
+
+import subprocess
+import sys
+import time
+
+STARTUP_STAGES = {
+    # Interpreter start-up alone, to put the other numbers in perspective.
+    "python": "pass",
+    # What `fennil` pays before the server starts listening.
+    "import": "import fennil.app.main",
+    "app": "from fennil.app.core import FennilApp; FennilApp()",
+    # Server ready: the empty map is built, which pulls in pydeck.
+    "app_ready": (
+        "from fennil.app.core import FennilApp; app = FennilApp(); app._update_layers()"
+    ),
+}
+
+
+def cold_start(code, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def run_startup(repeat):
+    """Best-of-``repeat`` wall time of each startup stage in a new process."""
+    return {name: cold_start(code, repeat) for name, code in STARTUP_STAGES.items()}
@@ -0,0 +1,227 @@
+"""Time the startup, load, derive, layer-build and serialize stages of fennil."""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fennil.app.deck import build_deck
+from fennil.app.io import (
+    build_fault_proj_data,
+    build_tde_data,
+    is_valid_data_folder,
+    load_folder_data,
+)
+from fennil.app.registry import FIELD_REGISTRY, LayerContext
+from fennil.app.state import DatasetSnapshot, StaticMapSettings
+from fennil.app.viz import load_all_viz
+from fennil.app.viz.fault_lines import build_fault_lines
+from fennil.app.viz.slip_compare import slip_compare_layers
+
+from .startup import run_startup
+from .synthetic import SCALES, generate_run
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIRECTORY = ROOT / "data"
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+
+# Every field turned on, so the layer stage covers all builders. The run
+# fields are drawn for both datasets and the comparison fields are set on the
+# second one, as the drawer does when two runs are loaded.
+RUN_FIELDS = {
+    "locs": True,
+    "obs": True,
+    "sig": True,
+    "mod": True,
+    "res": True,
+    "heat": "mag",
+    "rot": True,
+    "euler": True,
+    "seg": True,
+    "tri": True,
+    "str": True,
+    "mog": True,
+    "strain": "res",
+    "slip": "ss",
+    "tde": "ss",
+    "fault_proj": True,
+}
+COMPARE_FIELDS = {
+    "res_compare": True,
+    "heat_compare": "mag",
+    "slip_compare": "ss",
+    "tde_compare": "ss",
+}
+ALL_FIELDS = {**RUN_FIELDS, **COMPARE_FIELDS}
+
+
+def timed(func, repeat):
+    """Run ``func`` ``repeat`` times, returning (median seconds, last result)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def layer_context(folder, data):
+    right = DatasetSnapshot.from_data(folder, data, RUN_FIELDS)
+    left = DatasetSnapshot.from_data(folder, data, ALL_FIELDS)
+    return LayerContext(
+        specs=FIELD_REGISTRY.export_specs(),
+        datasets=[right, left],
+        velocity_scale=1.0,
+    )
+
+
+def build_all_layers(folder, data, cold=True):
+    if cold:
+        # Drop derived geometry so the cache does not hide the build cost.
+        data.derived.invalidate()
+    ctx = layer_context(folder, data)
+    build_fault_lines(ctx)
+    FIELD_REGISTRY.build_layers(ctx)
+    return ctx
+
+
+def run_scenario(folder, repeat):
+    timings = {}
+    timings["load"], data = timed(lambda: load_folder_data(folder), repeat)
+    timings["derive_tde"], _ = timed(lambda: build_tde_data(data.meshes), repeat)
+    timings["derive_fault_proj"], _ = timed(
+        lambda: build_fault_proj_data(data.segment), repeat
+    )
+    timings["slip_compare"], _ = timed(
+        lambda: slip_compare_layers(data, data, "ss", 1.0), repeat
+    )
+    timings["layers"], ctx = timed(lambda: build_all_layers(folder, data), repeat)
+    timings["layers_cached"], ctx = timed(
+        lambda: build_all_layers(folder, data, cold=False), repeat
+    )
+    deck = build_deck(ctx.all_layers, StaticMapSettings())
+    timings["serialize"], payload = timed(deck.to_json, repeat)
+    timings["payload_mb"] = len(payload) / 1e6
+    return timings
+
+
+def scenarios(args, tmp_directory):
+    for name in args.scales:
+        folder = Path(tmp_directory) / name
+        generate_run(folder, SCALES[name], seed=args.seed)
+        yield f"synthetic/{name}", folder
+    if args.bundled:
+        for folder in sorted(DATA_DIRECTORY.glob("*")):
+            if folder.is_dir() and is_valid_data_folder(folder):
+                yield f"data/{folder.name}", folder
+
+
+def compare(results, baselines, tolerance):
+    regressions = []
+    for scenario, timings in results.items():
+        reference = baselines.get("results", {}).get(scenario, {})
+        for stage, value in timings.items():
+            base = reference.get(stage)
+            if stage == "payload_mb" or not base:
+                continue
+            ratio = value / base
+            if ratio > tolerance:
+                regressions.append((scenario, stage, base, value, ratio))
+    return regressions
+
+
+def print_results(results):
+    stages = sorted({stage for timings in results.values() for stage in timings})
+    width = max(len(name) for name in results) + 2
+    print("scenario".ljust(width) + "".join(stage.rjust(18) for stage in stages))
+    for scenario, timings in results.items():
+        row = [f"{timings.get(stage, float('nan')):18.4f}" for stage in stages]
+        print(scenario.ljust(width) + "".join(row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--scales",
+        nargs="*",
+        default=["small", "medium"],
+        choices=sorted(SCALES),
+        help="Synthetic run sizes to generate",
+    )
+    parser.add_argument(
+        "--no-bundled",
+        dest="bundled",
+        action="store_false",
+        help="Skip the runs bundled in data/",
+    )
+    parser.add_argument(
+        "--no-startup",
+        dest="startup",
+        action="store_false",
+        help="Skip the cold-start measurements of the fennil entry point",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--save", action="store_true", help="Store results as new baselines"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error when a stage is slower than its baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="Allowed slowdown factor against the baselines",
+    )
+    parser.add_argument("--baselines", type=Path, default=BASELINES_FILE)
+    args = parser.parse_args(argv)
+
+    load_all_viz()
+
+    results = {}
+    if args.startup:
+        print("running startup", file=sys.stderr)
+        results["startup"] = run_startup(args.repeat)
+
+    with tempfile.TemporaryDirectory(prefix="fennil-bench-") as tmp_directory:
+        for scenario, folder in scenarios(args, tmp_directory):
+            print(f"running {scenario}", file=sys.stderr)
+            results[scenario] = run_scenario(folder, args.repeat)
+
+    print_results(results)
+
+    if args.save:
+        args.baselines.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n"
+        )
+        print(f"baselines written to {args.baselines}")
+        return 0
+
+    if not args.baselines.exists():
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baselines.read_text()), args.tolerance
+    )
+    for scenario, stage, base, value, ratio in regressions:
+        print(
+            f"REGRESSION {scenario} {stage}: {base:.4f}s -> {value:.4f}s ({ratio:.2f}x)"
+        )
+    return 1 if regressions and args.check else 0
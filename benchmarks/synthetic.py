@@ -0,0 +1,160 @@
+"""Generate synthetic celeri-style run folders for benchmarking."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATION_VELOCITY_COLUMNS = (
+    ("east_vel", "north_vel"),
+    ("model_east_vel", "model_north_vel"),
+    ("model_east_vel_residual", "model_north_vel_residual"),
+    ("model_east_vel_rotation", "model_north_vel_rotation"),
+    ("model_east_elastic_segment", "model_north_elastic_segment"),
+    ("model_east_vel_tde", "model_north_vel_tde"),
+    ("model_east_vel_block_strain_rate", "model_north_vel_block_strain_rate"),
+    ("model_east_vel_mogi", "model_north_vel_mogi"),
+)
+
+
+@dataclass(frozen=True)
+class RunScale:
+    stations: int
+    segments: int
+    meshes: int
+    triangles: int  # per mesh
+
+
+# Block labels of the synthetic stations, each block with an Euler pole
+BLOCKS = 20
+
+
+SCALES = {
+    "small": RunScale(stations=500, segments=500, meshes=2, triangles=1_000),
+    "medium": RunScale(stations=2_000, segments=4_000, meshes=4, triangles=5_000),
+    "large": RunScale(stations=10_000, segments=10_000, meshes=8, triangles=20_000),
+}
+
+# Region roughly matching the bundled Japan runs.
+LON_RANGE = (128.0, 148.0)
+LAT_RANGE = (30.0, 46.0)
+
+
+def generate_run(folder, scale, seed=0):
+    """Write the model csv files of a run of ``scale`` into ``folder``."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    synthetic_station(rng, scale.stations).to_csv(
+        folder / "model_station.csv", index=False
+    )
+    synthetic_segment(rng, scale.segments).to_csv(
+        folder / "model_segment.csv", index=False
+    )
+    synthetic_meshes(rng, scale.meshes, scale.triangles).to_csv(
+        folder / "model_meshes.csv", index=False
+    )
+    synthetic_block(rng, BLOCKS).to_csv(folder / "model_block.csv", index=False)
+    return folder
+
+
+def synthetic_station(rng, count):
+    station = pd.DataFrame(
+        {
+            "lon": rng.uniform(*LON_RANGE, count),
+            "lat": rng.uniform(*LAT_RANGE, count),
+            "corr": rng.uniform(-0.2, 0.2, count),
+            "name": [f"S{i:05d}_GPS" for i in range(count)],
+            "east_sig": rng.uniform(0.5, 2.0, count),
+            "north_sig": rng.uniform(0.5, 2.0, count),
+            "block_label": rng.integers(0, BLOCKS, count),
+        }
+    )
+    for east, north in STATION_VELOCITY_COLUMNS:
+        station[east] = rng.normal(0.0, 10.0, count)
+        station[north] = rng.normal(0.0, 10.0, count)
+    return station
+
+
+def synthetic_block(rng, count):
+    """Blocks with random Euler poles (degrees, degrees/Myr)."""
+    return pd.DataFrame(
+        {
+            "name": [f"block{i:02d}" for i in range(count)],
+            "euler_lon": rng.uniform(-180.0, 180.0, count),
+            "euler_lat": rng.uniform(-60.0, 60.0, count),
+            "euler_rate": rng.uniform(-1.0, 1.0, count),
+            "block_label": np.arange(count),
+        }
+    )
+
+
+def synthetic_segment(rng, count, chain_length=25):
+    """Random-walk fault traces so that consecutive segments share endpoints."""
+    n_chains = max(1, count // chain_length)
+    starts = np.column_stack(
+        (
+            rng.uniform(*LON_RANGE, n_chains),
+            rng.uniform(*LAT_RANGE, n_chains),
+        )
+    )
+    steps = rng.normal(0.0, 0.05, (n_chains, chain_length, 2))
+    nodes = np.concatenate(
+        (starts[:, None, :], starts[:, None, :] + np.cumsum(steps, axis=1)), axis=1
+    )
+    start = nodes[:, :-1, :].reshape(-1, 2)[:count]
+    end = nodes[:, 1:, :].reshape(-1, 2)[:count]
+    count = len(start)
+
+    return pd.DataFrame(
+        {
+            "name": [f"seg_{i:05d}" for i in range(count)],
+            "lon1": start[:, 0],
+            "lat1": start[:, 1],
+            "lon2": end[:, 0],
+            "lat2": end[:, 1],
+            "dip": rng.choice([90.0, 45.0, 30.0, 135.0], count),
+            "locking_depth": rng.choice([0.0, 15.0, 25.0], count),
+            "west_labels": rng.integers(0, 20, count),
+            "east_labels": rng.integers(0, 20, count),
+            "model_strike_slip_rate": rng.normal(0.0, 20.0, count),
+            "model_dip_slip_rate": rng.normal(0.0, 20.0, count),
+            "model_tensile_slip_rate": rng.normal(0.0, 2.0, count),
+        }
+    )
+
+
+def synthetic_meshes(rng, n_meshes, n_triangles):
+    """Structured dipping triangle meshes with shared vertices."""
+    frames = []
+    nx = max(1, int(np.sqrt(n_triangles / 2)))
+    ny = max(1, n_triangles // (2 * nx))
+    for mesh_idx in range(n_meshes):
+        lon0 = rng.uniform(LON_RANGE[0], LON_RANGE[1] - 3.0)
+        lat0 = rng.uniform(LAT_RANGE[0], LAT_RANGE[1] - 2.0)
+        lon = lon0 + np.linspace(0.0, 3.0, nx + 1)
+        lat = lat0 + np.linspace(0.0, 2.0, ny + 1)
+        grid_lon, grid_lat = np.meshgrid(lon, lat)
+        grid_dep = -np.linspace(0.0, 60.0, ny + 1)[:, None] * np.ones((1, nx + 1))
+
+        i, j = np.meshgrid(np.arange(ny), np.arange(nx), indexing="ij")
+        i = i.ravel()
+        j = j.ravel()
+        corners = [
+            ((i, j), (i, j + 1), (i + 1, j)),
+            ((i, j + 1), (i + 1, j + 1), (i + 1, j)),
+        ]
+        for tri in corners:
+            frame = {}
+            for k, (row, col) in enumerate(tri, start=1):
+                frame[f"lon{k}"] = grid_lon[row, col]
+                frame[f"lat{k}"] = grid_lat[row, col]
+                frame[f"dep{k}"] = grid_dep[row, col]
+            frames.append(pd.DataFrame(frame).assign(mesh_idx=mesh_idx))
+
+    meshes = pd.concat(frames, ignore_index=True)
+    meshes["strike_slip_rate"] = rng.normal(0.0, 30.0, len(meshes))
+    meshes["dip_slip_rate"] = rng.normal(0.0, 30.0, len(meshes))
+    return meshes
@@ -44,6 +44,17 @@ def tests(session: nox.Session) -> None:
     session.run("pytest", *session.posargs)
 
 
+@nox.session
+def bench(session: nox.Session) -> None:
+    """
+    Run the performance benchmarks. Pass --save to refresh the baselines or
+    --check to fail on regressions.
+    """
+    # The strain field needs scipy
+    session.install(".[strain]")
+    session.run("python", "-m", "benchmarks", *session.posargs)
+
+
 @nox.session(reuse_venv=True)
 def docs(session: nox.Session) -> None:
     """
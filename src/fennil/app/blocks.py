@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BlockIndex:
+    """Stations and bordering segments of each block of a run.
+
+    ``labels`` holds the sorted block labels. Block ``k`` owns the station rows
+    ``station_rows[station_starts[k]:station_starts[k + 1]]``; segments are
+    listed the same way under each block on either side of them.
+    """
+
+    labels: np.ndarray  # (n_blocks,)
+    names: tuple  # (n_blocks,) from model_block.csv, or "Block <label>"
+    station_rows: np.ndarray  # (n_stations,) station rows grouped by block
+    station_starts: np.ndarray  # (n_blocks + 1,)
+    segment_rows: np.ndarray  # segment rows grouped by bordering block
+    segment_starts: np.ndarray  # (n_blocks + 1,)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def station_counts(self):
+        return np.diff(self.station_starts)
+
+    @property
+    def segment_counts(self):
+        return np.diff(self.segment_starts)
+
+    def positions(self, labels):
+        """Positions of the known ``labels`` in :attr:`labels`."""
+        labels = np.asarray(labels, dtype=self.labels.dtype)
+        positions = np.searchsorted(self.labels, labels)
+        found = positions < len(self.labels)
+        found[found] = self.labels[positions[found]] == labels[found]
+        return positions[found]
+
+    def stations(self, labels):
+        """Sorted station rows of the blocks ``labels``."""
+        return self._rows(self.station_rows, self.station_starts, labels)
+
+    def segments(self, labels):
+        """Sorted rows of the segments bordering any of the blocks ``labels``."""
+        return self._rows(self.segment_rows, self.segment_starts, labels)
+
+    def _rows(self, rows, starts, labels):
+        parts = [rows[starts[k] : starts[k + 1]] for k in self.positions(labels)]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def reduce(self, values, ufunc=np.add, empty=0.0):
+        """
+        ``ufunc`` reduction of per-station ``values`` over each block, in one
+        ``reduceat`` pass over the grouped rows; blocks without stations get
+        ``empty``.
+        """
+        grouped = np.asarray(values, dtype=float)[self.station_rows]
+        result = np.full(len(self), empty, dtype=float)
+        filled = self.station_counts > 0
+        if grouped.size:
+            result[filled] = ufunc.reduceat(grouped, self.station_starts[:-1][filled])
+        return result
+
+    def residual_stats(self, resmag):
+        """Per-block station count, mean, RMS and maximum residual magnitude."""
+        counts = self.station_counts
+        divisor = np.maximum(counts, 1)
+        return {
+            "stations": counts,
+            "segments": self.segment_counts,
+            "mean": self.reduce(resmag) / divisor,
+            "rms": np.sqrt(self.reduce(np.square(resmag)) / divisor),
+            "max": self.reduce(resmag, np.maximum),
+        }
+
+
+def _group(rows, groups, n_groups):
+    """Rows sorted by group and the offsets of each group."""
+    order = np.argsort(groups, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(np.bincount(groups, minlength=n_groups))))
+    return np.asarray(rows)[order], starts
+
+
+def build_block_index(
+    station_labels, west_labels=None, east_labels=None, block_labels=None, names=None
+):
+    """
+    :class:`BlockIndex` of the station ``block_label`` column and the segment
+    ``west_labels``/``east_labels`` columns. ``block_labels`` and ``names``
+    come from model_block.csv; without it the labels in use are indexed.
+    """
+    station_labels = np.asarray(station_labels, dtype=np.int64)
+    sides = [
+        np.asarray(side, dtype=np.int64)
+        for side in (west_labels, east_labels)
+        if side is not None
+    ]
+    if block_labels is None:
+        labels = np.unique(np.concatenate([station_labels, *sides]))
+    else:
+        labels = np.asarray(block_labels, dtype=np.int64)
+        order = np.argsort(labels, kind="stable")
+        labels = labels[order]
+        if names is not None:
+            names = [names[i] for i in order]
+    if names is None:
+        names = [f"Block {label}" for label in labels]
+
+    def _positions(values):
+        positions = np.searchsorted(labels, values)
+        known = positions < len(labels)
+        known[known] = labels[positions[known]] == values[known]
+        return positions, known
+
+    positions, known = _positions(station_labels)
+    station_rows, station_starts = _group(
+        np.flatnonzero(known), positions[known], len(labels)
+    )
+
+    segment_rows = []
+    segment_blocks = []
+    for side in sides:
+        positions, known = _positions(side)
+        segment_rows.append(np.flatnonzero(known))
+        segment_blocks.append(positions[known])
+    if sides:
+        rows = np.concatenate(segment_rows)
+        blocks = np.concatenate(segment_blocks)
+        # Segments inside a block (same label on both sides) are listed once
+        pairs = np.unique(np.column_stack((blocks, rows)), axis=0)
+        segment_rows, segment_starts = _group(pairs[:, 1], pairs[:, 0], len(labels))
+    else:
+        segment_rows, segment_starts = _group([], np.empty(0, np.int64), len(labels))
+
+    return BlockIndex(
+        labels=labels,
+        names=tuple(str(name).strip() for name in names),
+        station_rows=np.asarray(station_rows, dtype=np.int64),
+        station_starts=station_starts,
+        segment_rows=np.asarray(segment_rows, dtype=np.int64),
+        segment_starts=segment_starts,
+    )
+
+
+def block_items(data):
+    """Memoized block selector entries with the residual statistics of each block."""
+    return data.derived.get(
+        ("block_items",), lambda: _block_items(data.block_index, data.resmag)
+    )
+
+
+def _block_items(index, resmag):
+    if index is None:
+        return []
+    stats = index.residual_stats(resmag)
+    items = []
+    for k, (label, name) in enumerate(zip(index.labels, index.names, strict=True)):
+        parts = [f"{stats['stations'][k]} stations", f"{stats['segments'][k]} segments"]
+        if stats["stations"][k]:
+            parts.append(
+                f"res {stats['mean'][k]:.2f} / rms {stats['rms'][k]:.2f}"
+                f" / max {stats['max'][k]:.2f} mm/yr"
+            )
+        items.append(
+            {"value": str(label), "title": name, "subtitle": " · ".join(parts)}
+        )
+    return items
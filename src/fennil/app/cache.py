@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+DERIVED_CACHE_SIZE = 256
+
+
+class CacheStats:
+    """Hit/miss counters grouped by cache entry kind."""
+
+    def __init__(self):
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, kind, hit):
+        with self._lock:
+            if hit:
+                self.hits[kind] += 1
+            else:
+                self.misses[kind] += 1
+
+    def reset(self):
+        self.hits.clear()
+        self.misses.clear()
+
+    def summary(self):
+        summary = {}
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits[kind]
+            misses = self.misses[kind]
+            summary[kind] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses),
+            }
+        return summary
+
+
+# Aggregated over every dataset so the app can report a single hit ratio.
+CACHE_STATS = CacheStats()
+
+
+class DerivedCache:
+    """
+    Per-dataset memo for arrays derived from the loaded tables.
+
+    Keys are tuples whose first item names the kind of entry (e.g.
+    ``("vector_geometry", "east_vel", "north_vel")``); the kind is used to
+    group hit/miss statistics and for targeted invalidation.
+
+    The cache is shared by field builders running on a thread pool: a key
+    is only computed once, concurrent callers wait for that computation and
+    count as hits.
+    """
+
+    def __init__(self, maxsize=DERIVED_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, factory):
+        kind = key[0]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._record(kind, True)
+                return self._entries[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = future = Future()
+
+        if pending is not None:
+            self._record(kind, True)
+            return pending.result()
+
+        try:
+            value = factory()
+        except BaseException as error:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        self._record(kind, False)
+        return value
+
+    def copy(self, exclude=()):
+        """New cache holding the entries whose kind is not in ``exclude``."""
+        cache = DerivedCache(self.maxsize)
+        with self._lock:
+            cache._entries.update(
+                (key, value)
+                for key, value in self._entries.items()
+                if key[0] not in exclude
+            )
+        return cache
+
+    def invalidate(self, *kinds):
+        with self._lock:
+            if not kinds:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in kinds]:
+                del self._entries[key]
+
+    def _record(self, kind, hit):
+        self.stats.record(kind, hit)
+        CACHE_STATS.record(kind, hit)
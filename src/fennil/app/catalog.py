@@ -0,0 +1,348 @@
+"""Persistent index of the run folders under a ``base_runs_folder``."""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from math import inf
+from pathlib import Path
+
+from fennil.app.sources import archive_runs, is_archive, split_compression
+
+REQUIRED_RUN_FILES = ("model_station.csv", "model_segment.csv", "model_meshes.csv")
+# Model files read when the run has them
+OPTIONAL_RUN_FILES = ("model_block.csv",)
+
+# Row counts reported for a run, by csv file
+STAT_FILES = {
+    "stations": "model_station.csv",
+    "segments": "model_segment.csv",
+    "triangles": "model_meshes.csv",
+    "blocks": "model_block.csv",
+}
+
+# Run parameters worth showing and searching, from config.json or args_*.json
+CATALOG_PARAMS = (
+    "run_name",
+    "solve_type",
+    "inversion_type",
+    "segment_file_name",
+    "station_file_name",
+    "block_file_name",
+    "mesh_parameters_file_name",
+    "lon_range",
+    "lat_range",
+    "slip_constraint_weight",
+    "tri_con_weight",
+)
+
+CATALOG_VERSION = 1
+CATALOG_SCAN_WORKERS = 16
+# Seconds a folder listing or stat result is trusted before it is read again
+CATALOG_REFRESH_INTERVAL = 30.0
+CATALOG_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "fennil"
+
+
+@dataclass
+class RunEntry:
+    name: str
+    mtime_ns: int
+    valid: bool | None  # None until the folder is scanned
+    files: dict = field(default_factory=dict)  # file name -> size in bytes
+    params: dict = field(default_factory=dict)
+    stats: dict = field(default_factory=dict)  # see STAT_FILES
+
+    @property
+    def size(self):
+        return sum(self.files.values())
+
+    def summary(self):
+        """One line description for the file browser."""
+        if not self.valid:
+            return ""
+        parts = [
+            f"{self.stats[key]:,} {key}"
+            for key in ("segments", "stations", "triangles")
+            if self.stats.get(key)
+        ]
+        if self.params.get("solve_type"):
+            parts.append(str(self.params["solve_type"]))
+        parts.append(f"{self.size / 1e6:.1f} MB")
+        return " · ".join(parts)
+
+    def matches(self, terms):
+        text = " ".join(
+            [self.name, *(f"{key}={value}" for key, value in self.params.items())]
+        ).lower()
+        return all(term in text for term in terms)
+
+
+def count_rows(path):
+    """Data rows of a csv file (lines after the header)."""
+    lines = 0
+    last = b"\n"
+    with Path(path).open("rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def read_params(folder, files):
+    """Selected :data:`CATALOG_PARAMS` of the run configuration, if any."""
+    names = ["config.json"] if "config.json" in files else []
+    names += sorted(
+        name for name in files if name.startswith("args_") and name.endswith(".json")
+    )
+    for name in names:
+        try:
+            config = json.loads((folder / name).read_text())
+        except (OSError, ValueError):
+            continue
+        if not isinstance(config, dict):
+            continue
+        params = {}
+        for key in CATALOG_PARAMS:
+            value = config.get(key)
+            if value in (None, ""):
+                continue
+            if key.endswith("_file_name"):
+                value = Path(str(value)).name
+            params[key] = value
+        return params
+    return {}
+
+
+def scan_run(folder, mtime_ns):
+    folder = Path(folder)
+    with os.scandir(folder) as entries:
+        files = {
+            entry.name: entry.stat().st_size
+            for entry in entries
+            if entry.is_file() and not entry.name.startswith(".")
+        }
+    stats = {}
+    for key, name in STAT_FILES.items():
+        if name in files:
+            try:
+                stats[key] = count_rows(folder / name)
+            except OSError:
+                continue
+    return RunEntry(
+        name=folder.name,
+        mtime_ns=mtime_ns,
+        valid=has_run_files(files),
+        files=files,
+        params=read_params(folder, files),
+        stats=stats,
+    )
+
+
+def has_run_files(files):
+    """Whether ``files`` has every model file, possibly compressed."""
+    plain = {split_compression(name)[0] for name in files}
+    return all(name in plain for name in REQUIRED_RUN_FILES)
+
+
+def catalog_path(root):
+    digest = hashlib.sha1(str(Path(root).resolve()).encode()).hexdigest()[:16]
+    return CATALOG_DIR / f"catalog_{digest}.json"
+
+
+class RunCatalog:
+    """
+    Index of the sub-folders of ``root``, saved as JSON in :data:`CATALOG_DIR`.
+
+    :meth:`list_folder` only reads the directory entries of ``root``, new
+    folders get a placeholder entry (``valid`` is None) until :meth:`scan`
+    stats them on a thread pool. Only folders whose modification time changed
+    (files added, removed or renamed) are read again, and stat results are
+    trusted for ``max_age`` seconds. Plain files of ``root`` are listed by
+    name only. ``root`` may also be an archive, whose member folders are
+    listed from the archive index.
+    """
+
+    def __init__(self, root, path=None):
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else catalog_path(self.root)
+        self.runs = {}
+        self.files = []
+        self.listed = None
+        self._checked = {}  # folder name -> time.monotonic() of its last stat
+        self._dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self.runs) + len(self.files)
+
+    @property
+    def archive(self):
+        """The root is a zip/tar archive of run folders."""
+        return is_archive(self.root) and self.root.is_file()
+
+    def load(self):
+        try:
+            content = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if content.get("version") != CATALOG_VERSION:
+            return
+        self.runs = {
+            name: RunEntry(**entry) for name, entry in content.get("runs", {}).items()
+        }
+        self.files = content.get("files", [])
+
+    def save(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        content = {
+            "version": CATALOG_VERSION,
+            "root": str(self.root),
+            "runs": {name: asdict(entry) for name, entry in self.runs.items()},
+            "files": self.files,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(content, separators=(",", ":")))
+            tmp.replace(self.path)
+        except OSError:
+            # Read-only cache directory: the catalog still works in memory
+            pass
+
+    def list_folder(self, max_age=None):
+        """Read the entries of ``root`` unless listed less than ``max_age`` ago."""
+        now = time.monotonic()
+        listed = self.listed
+        if max_age is not None and listed is not None and now - listed < max_age:
+            return False
+
+        folders = []
+        files = []
+        if self.archive:
+            folders.extend(name for name in archive_runs(self.root) if name)
+        else:
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        folders.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+        folders.sort()
+        files.sort()
+
+        if list(self.runs) != folders or self.files != files:
+            self._dirty = True
+        self.runs = {
+            name: self.runs.get(name) or RunEntry(name=name, mtime_ns=0, valid=None)
+            for name in folders
+        }
+        self.files = files
+        self.listed = now
+        return True
+
+    def stale(self, names, max_age=CATALOG_REFRESH_INTERVAL):
+        """The folders of ``names`` not stat'ed within ``max_age`` seconds."""
+        now = time.monotonic()
+        return [
+            name
+            for name in names
+            if name in self.runs and now - self._checked.get(name, -inf) >= max_age
+        ]
+
+    def scan(self, names, workers=CATALOG_SCAN_WORKERS):
+        """Stat ``names`` and rescan the changed ones; returns how many were."""
+        members = archive_runs(self.root) if self.archive else None
+
+        def _update(name):
+            folder = self.root / name
+            entry = self.runs.get(name)
+            try:
+                path = self.root if members is not None else folder
+                mtime_ns = path.stat().st_mtime_ns
+                known = entry is not None and entry.valid is not None
+                if known and entry.mtime_ns == mtime_ns:
+                    return entry
+                if members is not None:
+                    # Only the member listing: reading members means decompressing
+                    files = members.get(name, {})
+                    return RunEntry(name, mtime_ns, has_run_files(files), files)
+                return scan_run(folder, mtime_ns)
+            except OSError:
+                return RunEntry(name=name, mtime_ns=0, valid=False)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_update, names))
+
+        now = time.monotonic()
+        scanned = 0
+        for name, entry in zip(names, results, strict=True):
+            self._checked[name] = now
+            if entry is not self.runs.get(name):
+                self.runs[name] = entry
+                scanned += 1
+        if scanned:
+            self._dirty = True
+        return scanned
+
+    def refresh(self, workers=CATALOG_SCAN_WORKERS):
+        """Bring the whole index up to date, return the number of rescanned runs."""
+        self.list_folder()
+        scanned = self.scan(list(self.runs), workers=workers)
+        self.save()
+        return scanned
+
+    def search(self, query="", offset=0, limit=None, valid_only=False):
+        """
+        Runs then plain files whose name (or, for runs, parameters) contain
+        every word of ``query``; returns ``(page, total)``.
+        """
+        terms = query.lower().split()
+        runs = [
+            entry
+            for entry in self.runs.values()
+            if (entry.valid or not valid_only) and entry.matches(terms)
+        ]
+        files = (
+            [] if valid_only else [name for name in self.files if _match(name, terms)]
+        )
+        items = runs + files
+        end = None if limit is None else offset + limit
+        return items[offset:end], len(items)
+
+
+def _match(name, terms):
+    name = name.lower()
+    return all(term in name for term in terms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="fennil catalog",
+        description="Build or update the run catalog of a base_runs_folder.",
+    )
+    parser.add_argument("root", type=Path, help="Folder holding the run folders")
+    parser.add_argument("--search", default="", help="Only list matching runs")
+    parser.add_argument("--workers", type=int, default=CATALOG_SCAN_WORKERS)
+    args = parser.parse_args(argv)
+
+    catalog = RunCatalog(args.root)
+    start = time.perf_counter()
+    scanned = catalog.refresh(workers=args.workers)
+    sys.stderr.write(
+        f"{len(catalog.runs)} folders, {scanned} scanned "
+        f"in {time.perf_counter() - start:.2f}s ({catalog.path})\n"
+    )
+    runs, _ = catalog.search(args.search, valid_only=True)
+    for entry in runs:
+        sys.stdout.write(f"{entry.name}\t{entry.summary()}\n")
+    return 0
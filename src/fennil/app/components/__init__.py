@@ -1,4 +1,25 @@
+from .block_panel import BlockPanel
+from .deck_map import DeckMap
 from .file_browser import FileBrowser
+from .filter_panel import FilterPanel
+from .legend import ColormapLegend
+from .playback_bar import PlaybackBar
+from .playback_panel import PlaybackPanel
+from .profile_panel import ProfilePanel
 from .scale import Scale
+from .sweep_panel import SweepPanel
+from .view3d import View3D
 
-__all__ = ["FileBrowser", "Scale"]
+__all__ = [
+    "BlockPanel",
+    "ColormapLegend",
+    "DeckMap",
+    "FileBrowser",
+    "FilterPanel",
+    "PlaybackBar",
+    "PlaybackPanel",
+    "ProfilePanel",
+    "Scale",
+    "SweepPanel",
+    "View3D",
+]
@@ -0,0 +1,26 @@
+from trame.widgets import vuetify3 as v3
+
+
+class BlockPanel(v3.VAutocomplete):
+    """
+    Block selector of the BlockSettings provided as ``name``: only the
+    stations and the bordering segments of the selected blocks are drawn.
+    """
+
+    def __init__(self, name="blocks", **kwargs):
+        super().__init__(
+            v_model=(f"{name}.selected",),
+            items=(f"{name}.items",),
+            item_props=True,
+            label="Isolate blocks",
+            prepend_inner_icon="mdi-select-group",
+            multiple=True,
+            chips=True,
+            closable_chips=True,
+            clearable=True,
+            density="compact",
+            variant="outlined",
+            hide_details=True,
+            classes="mx-2 my-2",
+            **kwargs,
+        )
@@ -0,0 +1,23 @@
+from trame.widgets import deckgl
+
+from fennil.app import module
+
+# Layer classes of fennil.js made available to the deck.gl JSON converter
+CUSTOM_LIBRARIES = "[{libraryName: 'FennilClasses', resourceUri: '__fennil/fennil.js'}]"
+
+
+class DeckMap(deckgl.Deck):
+    """Deck widget whose JSON goes through the fennil.js client helpers.
+
+    ``options`` is a client expression for the expandDeck options, e.g.
+    ``"{exaggeration: map.vertical_exaggeration}"``; changing them only
+    re-renders on the client.
+    """
+
+    def __init__(self, options="{}", **kwargs):
+        super().__init__(**kwargs)
+        self.server.enable_module(module)
+        self._attributes["jsonInput"] = (
+            f':jsonInput="window.fennil.expandDeck({self.key}, {options})"'
+        )
+        self._attributes["customLibraries"] = f':customLibraries="{CUSTOM_LIBRARIES}"'
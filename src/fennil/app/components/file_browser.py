@@ -1,15 +1,22 @@
+import asyncio
 from pathlib import Path
 
 from trame.widgets import dataclass, html
 from trame.widgets import vuetify3 as v3
 from trame_dataclass.core import StateDataModel
 
-from fennil.app.io import is_valid_data_folder
+from fennil.app.catalog import CATALOG_REFRESH_INTERVAL, RunCatalog, RunEntry
+from fennil.app.prefetch import PREFETCH_NEIGHBOURS
+from fennil.app.sources import is_archive
 
 FILE_BROWSER_HEADERS = [
     {"title": "Name", "align": "start", "key": "name", "sortable": False},
     {"title": "Type", "align": "start", "key": "type", "sortable": False},
+    {"title": "Details", "align": "start", "key": "details", "sortable": False},
 ]
+FILE_BROWSER_PAGE_SIZE = 500
+# Folders stat'ed per step, so run badges appear while the page is scanned
+FILE_BROWSER_SCAN_BATCH = 50
 
 
 class FileBrowserState(StateDataModel):
@@ -19,18 +26,32 @@ class FileBrowserState(StateDataModel):
     active: int = -1
     error: str | None
     headers: list = FILE_BROWSER_HEADERS
+    search: str = ""
+    page: int = 1
+    pages: int = 1
+    total: int = 0
 
 
 class FileBrowser(dataclass.Provider):
-    def __init__(self, current_directory=None, on_open=None, **kwargs):
+    def __init__(
+        self, current_directory=None, on_open=None, on_highlight=None, **kwargs
+    ):
         if current_directory is None:
             current_directory = Path.cwd()
         self._on_open = on_open
+        # Called with the run folders likely to be opened next ([] to cancel)
+        self._on_highlight = on_highlight
         self._state = None
+        # One catalog per listed folder, kept while the app runs
+        self._catalogs = {}
+        # (search, page) shown, so state watchers skip our own updates
+        self._listed = None
+        self._listing_task = None
         super().__init__(name="browser", **kwargs)
         self._state = FileBrowserState(self.server, current=str(current_directory))
         self.instance = self._state._id
-        self.update_listing()
+        self._state.watch(["search"], self._on_search)
+        self._state.watch(["page"], self._on_page)
 
         with (
             self,
@@ -63,18 +84,36 @@ class FileBrowser(dataclass.Provider):
                             readonly=True,
                             classes="ml-2 flex-grow-1",
                         )
-                    with v3.VDataTable(
+                        v3.VTextField(
+                            v_model="browser.search",
+                            prepend_inner_icon="mdi-magnify",
+                            placeholder="Search runs",
+                            clearable=True,
+                            hide_details=True,
+                            density="compact",
+                            variant="outlined",
+                            classes="ml-2",
+                            style="max-width: 240px;",
+                            debounce=300,
+                        )
+                        v3.VBtn(
+                            icon="mdi-refresh",
+                            variant="text",
+                            size="small",
+                            click=self.refresh,
+                        )
+                    with v3.VDataTableVirtual(
                         density="compact",
                         fixed_header=True,
-                        headers=["browser.header"],
+                        headers=["browser.headers"],
                         items=["browser.listing"],
+                        item_value="name",
                         height="50vh",
                         style="user-select: none; cursor: pointer;",
-                        items_per_page=-1,
                     ):
-                        v3.Template(v_slot_bottom=True)
-                        with v3.Template(v_slot_item="{ item }"):
+                        with v3.Template(v_slot_item="{ item, itemRef }"):
                             with v3.VDataTableRow(
+                                raw_attrs=[':ref="itemRef"'],
                                 item=["item"],
                                 click=(self.select_entry, "[item]"),
                                 dblclick=(self.open_entry, "[item]"),
@@ -90,8 +129,35 @@ class FileBrowser(dataclass.Provider):
                                             classes="mr-2",
                                         )
                                         html.Div("{{ item.name }}")
+                                        v3.VChip(
+                                            "run",
+                                            v_if="item.valid === true",
+                                            color="success",
+                                            size="x-small",
+                                            label=True,
+                                            classes="ml-2",
+                                        )
+                                        v3.VProgressCircular(
+                                            v_if="item.valid === null",
+                                            indeterminate=True,
+                                            size=12,
+                                            width=1,
+                                            classes="ml-2",
+                                        )
                                 with v3.Template(raw_attrs=["v-slot:item.type"]):
                                     html.Div("{{ item.type }}")
+                                with v3.Template(raw_attrs=["v-slot:item.details"]):
+                                    html.Div(
+                                        "{{ item.details }}",
+                                        classes="text-caption text-medium-emphasis",
+                                    )
+                    v3.VPagination(
+                        v_model="browser.page",
+                        length=["browser.pages"],
+                        v_show="browser.pages > 1",
+                        density="compact",
+                        total_visible=7,
+                    )
 
                 with v3.VCardActions(classes="pa-3"):
                     html.Div(
@@ -112,43 +178,140 @@ class FileBrowser(dataclass.Provider):
                         click=self.select_folder,
                     )
 
-    def update_listing(self):
+    def _catalog(self, folder):
+        catalog = self._catalogs.get(folder)
+        if catalog is None:
+            catalog = self._catalogs[folder] = RunCatalog(folder)
+        return catalog
+
+    def update_listing(self, force=False):
+        """List the current folder in the background, replacing a listing in
+        progress. ``force`` reads the folder and stats its runs again."""
+        if self._listing_task is not None:
+            self._listing_task.cancel()
+        self._listing_task = asyncio.ensure_future(self._list(force))
+
+    async def _list(self, force):
         current = Path(self._state.current)
         if not current.exists():
             current = Path.home()
             self._state.current = str(current.resolve())
 
+        max_age = 0 if force else CATALOG_REFRESH_INTERVAL
+        catalog = self._catalog(current)
+        try:
+            await asyncio.to_thread(catalog.list_folder, max_age)
+        except OSError as error:
+            self._state.error = str(error)
+            return
+
+        # Show the names right away, then badges as the folders get scanned
+        items = self._show_page(catalog)
+        names = [item.name for item in items if isinstance(item, RunEntry)]
+        pending = catalog.stale(names, max_age)
+        for start in range(0, len(pending), FILE_BROWSER_SCAN_BATCH):
+            batch = pending[start : start + FILE_BROWSER_SCAN_BATCH]
+            if await asyncio.to_thread(catalog.scan, batch):
+                self._show_page(catalog)
+        await asyncio.to_thread(catalog.save)
+
+    def _show_page(self, catalog):
+        search = self._state.search or ""
+        pages = max(1, -(-len(catalog) // FILE_BROWSER_PAGE_SIZE))
+        page = min(max(self._state.page, 1), pages)
+        items, total = catalog.search(
+            search,
+            offset=(page - 1) * FILE_BROWSER_PAGE_SIZE,
+            limit=FILE_BROWSER_PAGE_SIZE,
+        )
         entries = []
-        for entry in current.iterdir():
-            name = entry.name
-            if name.startswith("."):
-                continue
-            if entry.is_dir():
+        for item in items:
+            if isinstance(item, str) and is_archive(item):
+                # Browsed like a folder, its runs are read without extracting
                 entries.append(
                     {
-                        "name": name,
-                        "type": "directory",
-                        "icon": "mdi-folder",
+                        "name": item,
+                        "type": "archive",
+                        "icon": "mdi-archive",
+                        "valid": False,
+                        "details": "",
                     }
                 )
-            elif entry.is_file():
+            elif isinstance(item, str):
                 entries.append(
                     {
-                        "name": name,
+                        "name": item,
                         "type": "file",
                         "icon": "mdi-file-document-outline",
+                        "valid": False,
+                        "details": "",
+                    }
+                )
+            else:
+                entries.append(
+                    {
+                        "name": item.name,
+                        "type": "directory",
+                        "icon": "mdi-folder",
+                        "valid": item.valid,
+                        "details": item.summary(),
                     }
                 )
-        entries.sort(key=lambda item: (item["type"] != "directory", item["name"]))
+        active = self._state.active
+        if self._listed != (search, page):
+            active = -1
         listing = [{**item, "index": idx} for idx, item in enumerate(entries)]
         self._state.listing = listing
+        self._state.total = total
+        self._state.pages = max(1, -(-total // FILE_BROWSER_PAGE_SIZE))
+        self._state.page = page
+        self._state.active = active
+        self._listed = (search, page)
+        return items
+
+    def refresh(self):
+        self.update_listing(force=True)
+
+    def navigate(self, folder):
+        self._state.current = str(Path(folder).resolve())
+        self._state.search = ""
+        self._state.page = 1
         self._state.active = -1
+        self._highlight()
+        self.update_listing()
+
+    def _on_search(self, search):
+        if self._listed is None or (search or "") != self._listed[0]:
+            self._state.page = 1
+            self.update_listing()
+
+    def _on_page(self, page):
+        if self._listed is None or page != self._listed[1]:
+            self.update_listing()
 
     def select_entry(self, entry):
         self._state.active = entry.get("index", -1) if entry else -1
+        self._highlight()
+
+    def _highlight(self):
+        """Report the highlighted run and its neighbours for prefetching."""
+        if self._on_highlight is None:
+            return
+        listing = self._state.listing or []
+        active = self._state.active
+        folders = []
+        if 0 <= active < len(listing) and listing[active].get("valid"):
+            current = Path(self._state.current)
+            for offset in range(PREFETCH_NEIGHBOURS + 1):
+                for index in dict.fromkeys((active - offset, active + offset)):
+                    if 0 <= index < len(listing) and listing[index].get("valid"):
+                        folders.append(current / listing[index]["name"])
+        self._on_highlight(folders)
 
     def open_entry(self, entry):
-        if not entry or entry.get("type") != "directory":
+        from fennil.app.io import is_valid_data_folder  # pandas, imported on demand
+
+        if not entry or entry.get("type") not in ("directory", "archive"):
             return
         current = Path(self._state.current)
         next_path = (current / entry.get("name")).resolve()
@@ -160,18 +323,14 @@ class FileBrowser(dataclass.Provider):
                 self._on_open(next_path)
             return
 
-        self._state.current = str(next_path)
-        self.update_listing()
+        self.navigate(next_path)
 
     def go_home(self):
-        self._state.current = str(Path.home().resolve())
-        self.update_listing()
+        self.navigate(Path.home())
 
     def go_parent(self):
         current = Path(self._state.current)
-        parent = current.parent if current.parent != current else current
-        self._state.current = str(parent.resolve())
-        self.update_listing()
+        self.navigate(current.parent if current.parent != current else current)
 
     def open(self, existing_path=None):
         if existing_path:
@@ -182,6 +341,8 @@ class FileBrowser(dataclass.Provider):
         self.update_listing()
 
     def select_folder(self):
+        from fennil.app.io import is_valid_data_folder  # pandas, imported on demand
+
         current = Path(self._state.current)
         folder_path = current
         active_idx = self._state.active
@@ -0,0 +1,48 @@
+from trame.widgets import html
+from trame.widgets import vuetify3 as v3
+
+from fennil.app.viz.filters import FILTERS
+
+
+class FilterPanel(v3.VCol):
+    """
+    Range sliders of the FilterSettings provided as ``name``.
+
+    The ranges only live on the client, where fennil.js turns them into
+    shader uniforms; moving a slider never rebuilds the layers.
+    """
+
+    def __init__(self, name="filters", **kwargs):
+        super().__init__(**kwargs)
+
+        with self:
+            with html.Div(classes="d-flex align-center"):
+                v3.VLabel("Filters", classes="text-caption")
+                v3.VSpacer()
+                v3.VBtn(
+                    icon="mdi-filter-off-outline",
+                    size="small",
+                    density="compact",
+                    variant="plain",
+                    title="Clear filters",
+                    disabled=[f"!Object.keys({name}.ranges || {{}}).length"],
+                    click=f"{name}.ranges = {{}}",
+                )
+            for key, spec in FILTERS.items():
+                bounds = f"{name}.bounds.{key}"
+                v3.VRangeSlider(
+                    v_if=bounds,
+                    model_value=[f"({name}.ranges || {{}}).{key} || {bounds}"],
+                    update_modelValue=(
+                        f"{name}.ranges = {{...{name}.ranges, {key}: $event}}"
+                    ),
+                    label=spec["label"],
+                    title=spec["unit"],
+                    min=[f"{bounds}[0]"],
+                    max=[f"{bounds}[1]"],
+                    step=spec["step"],
+                    color=[f"({name}.ranges || {{}}).{key} ? 'primary' : undefined"],
+                    thumb_label=True,
+                    density="compact",
+                    hide_details=True,
+                )
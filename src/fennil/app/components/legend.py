@@ -0,0 +1,68 @@
+from trame.widgets import html
+from trame.widgets import vuetify3 as v3
+
+
+def palette_gradient(palette):
+    """Discrete CSS gradient of ``palette``, one band per color."""
+    step = 100 / len(palette)
+    stops = []
+    for i, (r, g, b, *_) in enumerate(palette):
+        stops.append(f"rgb({r},{g},{b}) {i * step:.2f}% {(i + 1) * step:.2f}%")
+    return f"linear-gradient(to right, {', '.join(stops)})"
+
+
+class ColormapLegend(html.Div):
+    """
+    Colorbar of a viz.styles Colormap with editable bounds.
+
+    The bounds are stored in the ColormapSettings provided as ``name`` and,
+    like the filter ranges, only recolor the layers on the client.
+    """
+
+    def __init__(self, colormap, name="colormaps", **kwargs):
+        super().__init__(classes="d-flex align-center ga-1 text-caption", **kwargs)
+        ranges = f"{name}.ranges"
+        value = f"({ranges} || {{}}).{colormap.name}"
+        default = [colormap.vmin, colormap.vmax]
+
+        def bound(index):
+            v3.VTextField(
+                model_value=[f"({value} || {default})[{index}]"],
+                update_modelValue=(
+                    f"{ranges} = {{...{ranges}, {colormap.name}: "
+                    f"Object.assign([...({value} || {default})], "
+                    f"{{{index}: Number($event)}})}}"
+                ),
+                type="number",
+                density="compact",
+                variant="plain",
+                hide_details=True,
+                style="width: 3.5rem;",
+                classes="flex-grow-0",
+            )
+
+        with self:
+            html.Span(
+                f"{colormap.label} ({colormap.unit})",
+                style="color: #666;",
+            )
+            bound(0)
+            html.Div(
+                style=(
+                    "width: 6rem; height: 0.75rem; border-radius: 2px; "
+                    f"background: {palette_gradient(colormap.palette)};"
+                ),
+            )
+            bound(1)
+            v3.VBtn(
+                icon="mdi-restore",
+                size="x-small",
+                density="compact",
+                variant="plain",
+                title="Reset range",
+                disabled=[f"!{value}"],
+                click=(
+                    f"{ranges} = Object.fromEntries(Object.entries({ranges})"
+                    f".filter(([key]) => key !== '{colormap.name}'))"
+                ),
+            )
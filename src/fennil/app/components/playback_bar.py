@@ -0,0 +1,41 @@
+from trame.widgets import html
+from trame.widgets import vuetify3 as v3
+
+
+class PlaybackBar(v3.VCard):
+    """Play button and frame slider of the PlaybackSettings provided as ``name``."""
+
+    def __init__(self, name="playback", **kwargs):
+        super().__init__(
+            rounded="lg",
+            elevation=4,
+            style=(
+                "position: absolute; bottom: 16px; left: 50%;"
+                " transform: translateX(-50%); width: 480px; z-index: 1;"
+            ),
+            **kwargs,
+        )
+
+        with self:
+            with html.Div(classes="d-flex align-center px-2 py-1"):
+                v3.VBtn(
+                    icon=[f"{name}.playing ? 'mdi-pause' : 'mdi-play'"],
+                    density="compact",
+                    variant="plain",
+                    click=f"{name}.playing = !{name}.playing",
+                )
+                v3.VSlider(
+                    v_model=f"{name}.frame",
+                    min=0,
+                    max=[f"{name}.names.length - 1"],
+                    step=1,
+                    hide_details=True,
+                    density="compact",
+                    color="primary",
+                    classes="mx-2",
+                )
+                html.Div(
+                    f"{{{{ {name}.names[{name}.frame] }}}}",
+                    classes="text-caption text-no-wrap",
+                    style="min-width: 80px;",
+                )
@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from trame.widgets import dataclass, html
+from trame.widgets import vuetify3 as v3
+from trame_dataclass.core import StateDataModel
+
+from fennil.app.catalog import RunCatalog
+
+# Runs loaded as frames at once, each keeps its value columns in memory
+PLAYBACK_MAX_RUNS = 64
+
+
+class PlaybackLoadState(StateDataModel):
+    show: bool = False
+    root: str = ""
+    search: str = ""
+    running: bool = False
+    error: str | None
+
+
+class PlaybackPanel(dataclass.Provider):
+    """
+    Dialog loading the runs of a folder (optionally filtered like the file
+    browser search) as the frames of one dataset, read on a process pool;
+    the Dataset of the first run is passed to ``on_open(path, data)``.
+    """
+
+    def __init__(self, root=None, on_open=None, **kwargs):
+        self._on_open = on_open
+        self._task = None
+        super().__init__(name="playback_load", **kwargs)
+        self._state = PlaybackLoadState(self.server, root=str(root or Path.cwd()))
+        self.instance = self._state._id
+
+        with (
+            self,
+            v3.VDialog(v_model="playback_load.show", max_width="800"),
+        ):
+            with v3.VCard(title="Play runs", rounded="lg"):
+                with v3.VCardText():
+                    with v3.VRow(dense=True, classes="align-center"):
+                        v3.VTextField(
+                            v_model="playback_load.root",
+                            label="Runs folder",
+                            hide_details=True,
+                            density="compact",
+                            variant="outlined",
+                            classes="flex-grow-1",
+                        )
+                        v3.VTextField(
+                            v_model="playback_load.search",
+                            prepend_inner_icon="mdi-magnify",
+                            placeholder="Search runs",
+                            clearable=True,
+                            hide_details=True,
+                            density="compact",
+                            variant="outlined",
+                            classes="ml-2",
+                            style="max-width: 240px;",
+                        )
+                        v3.VBtn(
+                            text="Load",
+                            color="primary",
+                            variant="flat",
+                            loading=("playback_load.running",),
+                            click=self.load,
+                            classes="ml-2",
+                        )
+
+                with v3.VCardActions(classes="pa-3"):
+                    html.Div(
+                        "{{ playback_load.error }}",
+                        v_if="playback_load.error",
+                        classes="text-error text-caption",
+                    )
+                    v3.VSpacer()
+                    v3.VBtn(
+                        text="Close",
+                        variant="flat",
+                        click="playback_load.show = false",
+                    )
+
+    def open(self, root=None):
+        if root:
+            self._state.root = str(Path(root).resolve())
+        self._state.show = True
+
+    def load(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._task = asyncio.ensure_future(self._load())
+
+    async def _load(self):
+        from fennil.app.playback import load_playback  # pandas
+
+        self._state.error = None
+        self._state.running = True
+        try:
+            catalog = RunCatalog(self._state.root)
+            await asyncio.to_thread(catalog.refresh)
+            runs, total = catalog.search(self._state.search or "", valid_only=True)
+            if total < 2:
+                self._state.error = "At least two runs are needed."
+                return
+            folders = [catalog.root / entry.name for entry in runs[:PLAYBACK_MAX_RUNS]]
+            data = await asyncio.to_thread(load_playback, folders)
+        except (OSError, BrokenProcessPool) as error:
+            self._state.error = str(error) or "A worker process died."
+            return
+        except Exception as error:  # noqa: BLE001
+            # Runs missing residual or slip columns fail in the workers
+            self._state.error = f"{type(error).__name__}: {error}"
+            return
+        finally:
+            self._state.running = False
+
+        if total > PLAYBACK_MAX_RUNS:
+            self._state.error = (
+                f"{total} runs match, only the first {PLAYBACK_MAX_RUNS} are played."
+            )
+        else:
+            self._state.show = False
+        if self._on_open:
+            self._on_open(folders[0], data)
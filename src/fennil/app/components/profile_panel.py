@@ -0,0 +1,87 @@
+from trame.widgets import html
+from trame.widgets import vuetify3 as v3
+
+
+class ProfilePanel(v3.VNavigationDrawer):
+    def __init__(self, on_export=None, on_clear=None, **kwargs):
+        super().__init__(
+            v_model=("profile_panel", False),
+            location="right",
+            width=420,
+            temporary=False,
+            **kwargs,
+        )
+
+        with self:
+            with v3.VToolbar(density="compact", title="Render profile"):
+                v3.VBtn(
+                    text="JSON",
+                    prepend_icon="mdi-download",
+                    size="small",
+                    variant="text",
+                    click=(on_export, "['json']"),
+                )
+                v3.VBtn(
+                    text="Trace",
+                    prepend_icon="mdi-download",
+                    size="small",
+                    variant="text",
+                    click=(on_export, "['trace']"),
+                )
+                v3.VBtn(
+                    icon="mdi-delete-sweep-outline",
+                    size="small",
+                    variant="text",
+                    click=on_clear,
+                )
+            html.Div(
+                "Saved to {{ profile_export_path }}",
+                v_if="profile_export_path",
+                classes="text-caption px-4 pt-2",
+            )
+
+            with v3.VTable(density="compact", classes="text-caption"):
+                with html.Tbody():
+                    with html.Tr(
+                        v_for="value, name in profile_report.counters",
+                        key="name",
+                    ):
+                        html.Td("{{ name }}")
+                        html.Td("{{ value }}", classes="text-right")
+                    with html.Tr(
+                        v_for="stats, kind in profile_report.cache",
+                        key="kind",
+                    ):
+                        html.Td("cache {{ kind }}")
+                        html.Td(
+                            "{{ (100 * stats.hit_ratio).toFixed(0) }}% "
+                            "({{ stats.hits }}/{{ stats.hits + stats.misses }})",
+                            classes="text-right",
+                        )
+
+            with v3.VCard(
+                v_for="update in profile_report.updates",
+                key="update.id",
+                flat=True,
+                border=True,
+                classes="ma-2",
+            ):
+                v3.VCardSubtitle(
+                    "#{{ update.id }} · {{ update.total_ms }} ms · "
+                    "{{ update.payload_kb }} KB",
+                    classes="pt-2",
+                )
+                with v3.VTable(density="compact", classes="text-caption"):
+                    with html.Tbody():
+                        with html.Tr(v_for="stage, i in update.stages", key="i"):
+                            html.Td("{{ stage.label }}")
+                            html.Td("{{ stage.ms }} ms", classes="text-right")
+                with html.Div(classes="pa-2"):
+                    v3.VChip(
+                        "{{ name }} {{ size }} KB",
+                        v_for="size, name in update.fields_kb",
+                        key="name",
+                        size="x-small",
+                        label=True,
+                        classes="mr-1 mb-1",
+                    )
@@ -0,0 +1,202 @@
+import asyncio
+import math
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from trame.widgets import dataclass, html
+from trame.widgets import vuetify3 as v3
+from trame_dataclass.core import StateDataModel
+
+from fennil.app.catalog import RunCatalog
+
+# Runs compared at once, the matrix grows with their square
+SWEEP_MAX_RUNS = 64
+SWEEP_CELL_STYLE = "{ background: cell.color, cursor: i === j ? 'default' : 'pointer' }"
+
+
+class SweepState(StateDataModel):
+    show: bool = False
+    root: str = ""
+    search: str = ""
+    running: bool = False
+    error: str | None
+    metric: str = "res_rms"
+    metrics: list
+    unit: str = ""
+    names: list
+    # Matrix cells of the selected metric: {"text", "color"}
+    rows: list
+
+
+class SweepPanel(dataclass.Provider):
+    """
+    Dialog comparing every pair of the runs of a folder (optionally filtered
+    like the file browser search), computed on a process pool; clicking a
+    cell loads its two runs through ``on_open_pair(right, left)``.
+    """
+
+    def __init__(self, root=None, on_open_pair=None, **kwargs):
+        self._on_open_pair = on_open_pair
+        self._matrix = None
+        self._task = None
+        super().__init__(name="sweep", **kwargs)
+        self._state = SweepState(self.server, root=str(root or Path.cwd()))
+        self.instance = self._state._id
+        self._state.watch(["metric"], self._show_metric)
+
+        with (
+            self,
+            v3.VDialog(v_model="sweep.show", max_width="1100", scrollable=True),
+        ):
+            with v3.VCard(title="Compare runs", rounded="lg"):
+                with v3.VCardText():
+                    with v3.VRow(dense=True, classes="pb-2 align-center"):
+                        v3.VTextField(
+                            v_model="sweep.root",
+                            label="Runs folder",
+                            hide_details=True,
+                            density="compact",
+                            variant="outlined",
+                            classes="flex-grow-1",
+                        )
+                        v3.VTextField(
+                            v_model="sweep.search",
+                            prepend_inner_icon="mdi-magnify",
+                            placeholder="Search runs",
+                            clearable=True,
+                            hide_details=True,
+                            density="compact",
+                            variant="outlined",
+                            classes="ml-2",
+                            style="max-width: 240px;",
+                        )
+                        v3.VBtn(
+                            text="Compare",
+                            color="primary",
+                            variant="flat",
+                            loading=("sweep.running",),
+                            click=self.compute,
+                            classes="ml-2",
+                        )
+                    v3.VSelect(
+                        v_model="sweep.metric",
+                        items=("sweep.metrics",),
+                        v_show="sweep.rows.length",
+                        hide_details=True,
+                        density="compact",
+                        variant="outlined",
+                        classes="pb-2",
+                        style="max-width: 360px;",
+                    )
+                    with v3.VTable(
+                        v_if="sweep.rows.length",
+                        density="compact",
+                        fixed_header=True,
+                        height="60vh",
+                        classes="text-caption",
+                        style="user-select: none;",
+                    ):
+                        with html.Thead():
+                            with html.Tr():
+                                html.Th("{{ sweep.unit }}")
+                                html.Th(
+                                    "{{ name }}",
+                                    v_for="name, j in sweep.names",
+                                    key="j",
+                                    classes="text-center",
+                                )
+                        with html.Tbody():
+                            with html.Tr(v_for="row, i in sweep.rows", key="i"):
+                                html.Th("{{ sweep.names[i] }}")
+                                html.Td(
+                                    "{{ cell.text }}",
+                                    v_for="cell, j in row",
+                                    key="j",
+                                    title=("sweep.names[i] + ' / ' + sweep.names[j]",),
+                                    classes="text-center",
+                                    style=(SWEEP_CELL_STYLE,),
+                                    click=(self.open_pair, "[i, j]"),
+                                )
+
+                with v3.VCardActions(classes="pa-3"):
+                    html.Div(
+                        "{{ sweep.error }}",
+                        v_if="sweep.error",
+                        classes="text-error text-caption",
+                    )
+                    v3.VSpacer()
+                    v3.VBtn(text="Close", variant="flat", click="sweep.show = false")
+
+    def open(self, root=None):
+        if root:
+            self._state.root = str(Path(root).resolve())
+        self._state.show = True
+
+    def compute(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._task = asyncio.ensure_future(self._compute())
+
+    async def _compute(self):
+        from fennil.app.sweep import SWEEP_METRICS, compute_sweep  # pandas
+
+        self._state.error = None
+        self._state.running = True
+        try:
+            catalog = RunCatalog(self._state.root)
+            await asyncio.to_thread(catalog.refresh)
+            runs, total = catalog.search(self._state.search or "", valid_only=True)
+            if total < 2:
+                self._state.error = "At least two runs are needed."
+                return
+            if total > SWEEP_MAX_RUNS:
+                self._state.error = (
+                    f"{total} runs match, only the first {SWEEP_MAX_RUNS} are compared."
+                )
+            folders = [catalog.root / entry.name for entry in runs[:SWEEP_MAX_RUNS]]
+            self._matrix = await asyncio.to_thread(compute_sweep, folders)
+        except (OSError, BrokenProcessPool) as error:
+            self._state.error = str(error) or "A worker process died."
+            return
+        except Exception as error:  # noqa: BLE001
+            # Runs missing residual or slip columns fail in the workers
+            self._state.error = f"{type(error).__name__}: {error}"
+            return
+        finally:
+            self._state.running = False
+
+        self._state.metrics = [
+            {"value": name, "title": label}
+            for name, (label, _) in SWEEP_METRICS.items()
+        ]
+        self._state.names = [name.lstrip("0") for name in self._matrix.names]
+        self._show_metric(self._state.metric)
+
+    def _show_metric(self, metric):
+        from fennil.app.sweep import SWEEP_DECIMALS, SWEEP_METRICS
+
+        if self._matrix is None or metric not in SWEEP_METRICS:
+            return
+        values = self._matrix.metrics[metric]
+        colors = self._matrix.cell_colors(metric)
+        self._state.unit = SWEEP_METRICS[metric][1]
+        self._state.rows = [
+            [
+                {
+                    "text": f"{value:.{SWEEP_DECIMALS}f}"
+                    if math.isfinite(value)
+                    else "",
+                    "color": color,
+                }
+                for value, color in zip(row, color_row, strict=True)
+            ]
+            for row, color_row in zip(values.tolist(), colors, strict=True)
+        ]
+
+    def open_pair(self, right, left):
+        if self._matrix is None or right == left:
+            return
+        self._state.show = False
+        if self._on_open_pair:
+            folders = self._matrix.folders
+            self._on_open_pair(Path(folders[right]), Path(folders[left]))
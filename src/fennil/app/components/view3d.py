@@ -0,0 +1,35 @@
+from trame.widgets import vuetify3 as v3
+
+v3.enable_lab()
+
+
+class View3D(v3.VCol):
+    """3D toggle and vertical exaggeration of the MapSettings provided as ``name``."""
+
+    def __init__(self, name="map", **kwargs):
+        super().__init__(**kwargs)
+
+        with self:
+            with v3.VRow(dense=True, align="center"):
+                with v3.VCol(cols="auto"):
+                    v3.VSwitch(
+                        v_model=f"{name}.view_3d",
+                        label="3D",
+                        color="primary",
+                        inset=True,
+                        density="compact",
+                        hide_details=True,
+                    )
+                with v3.VCol():
+                    v3.VNumberInput(
+                        v_model=f"{name}.vertical_exaggeration",
+                        disabled=[f"!{name}.view_3d"],
+                        prepend_icon="mdi-arrow-expand-vertical",
+                        min=[1],
+                        max=[100],
+                        step=[1],
+                        density="compact",
+                        hide_details=True,
+                        variant="outlined",
+                        control_variant="split",
+                    )
@@ -1,18 +1,50 @@
+import asyncio
+import json
+from pathlib import Path
+
 from trame.app import TrameApp
 from trame.decorators import change
 from trame.ui.vuetify3 import VAppLayout
-from trame.widgets import deckgl, html
+from trame.widgets import html
 from trame.widgets import vuetify3 as v3
 from trame_dataclass.core import get_instance
 
-from fennil.app.io import load_folder_data
-
-from .components import FileBrowser, Scale
-from .deck import build_deck, mapbox
+from .blocks import block_items
+from .components import (
+    BlockPanel,
+    ColormapLegend,
+    DeckMap,
+    FileBrowser,
+    FilterPanel,
+    PlaybackBar,
+    PlaybackPanel,
+    ProfilePanel,
+    Scale,
+    SweepPanel,
+    View3D,
+)
+from .deck import TOOLTIP, build_deck, mapbox
+from .prefetch import Prefetcher
+from .profiling import PROFILER
 from .registry import FIELD_REGISTRY, LayerContext
-from .state import DatasetVisualization, MapSettings
+from .scheduler import BuildCancelled, RenderScheduler
+from .state import (
+    BlockSettings,
+    ColormapSettings,
+    DatasetSnapshot,
+    DatasetVisualization,
+    FilterSettings,
+    MapSettings,
+    PlaybackSettings,
+    StaticMapSettings,
+)
 from .viz import load_all_viz
-from .viz.fault_lines import build_fault_lines
+from .viz.filters import filter_bounds
+from .viz.styles import COLORMAPS
+from .watch import WATCH_INTERVAL, RunWatcher
+
+# Camera pitch used when switching to the 3D view from a top-down view
+VIEW_3D_PITCH = 45
 
 
 class FennilApp(TrameApp):
@@ -22,8 +54,26 @@ class FennilApp(TrameApp):
         # --hot-reload for dev UI faster
         if self.server.hot_reload:
             self.server.controller.on_server_reload.add(self._build_ui)
+            self.server.controller.on_server_reload.add(self._update_layers)
 
-        # Load all available viz
+        # Render pipeline profiling (--profile)
+        self.server.cli.add_argument(
+            "--profile",
+            action="store_true",
+            help="Record render pipeline timings and payload sizes",
+        )
+        self.server.cli.add_argument(
+            "--profile-output",
+            default=".",
+            help="Directory where profiling exports are written",
+        )
+        args, _ = self.server.cli.parse_known_args()
+        PROFILER.enabled = args.profile
+        self._profile_output = Path(args.profile_output)
+        self.state.profile_report = PROFILER.report()
+        self.state.profile_export_path = None
+
+        # Register fields from the manifest, builders are imported on first use
         load_all_viz()
 
         # Only 2 datasets max
@@ -32,35 +82,239 @@ class FennilApp(TrameApp):
             DatasetVisualization(self.server),
         ]
         self.map_params = MapSettings(self.server)
+        self.map_params.watch(["view_3d"], self._toggle_3d)
+        # Client side value filters, the server only reports their bounds
+        self._filters = FilterSettings(self.server)
+        # Client side colormap ranges, set from the footer legends
+        self._colormaps = ColormapSettings(self.server)
+        # Isolated blocks, the server draws their stations and segments only
+        self._blocks = BlockSettings(self.server)
+        self._blocks.watch(["selected"], self._update_layers)
+        # Frame of the played runs, stepped here while playing; the client
+        # recolors the layers for it without a rebuild
+        self._playback = PlaybackSettings(self.server)
+        self._playback.watch(["playing"], self._toggle_playback)
+        self._play_task = None
         for viz_config in self._datasets:
             viz_config.watch(["fields", "enabled"], self._update_layers)
+            viz_config.watch(
+                ["fields", "enabled", "available_fields"], self._update_playback
+            )
+            viz_config.watch(["live"], self._toggle_live)
+        # Live datasets: polled run folders, by dataset index
+        self._watchers = {}
+        self._live_task = None
         self.state.field_specs = FIELD_REGISTRY.export_specs()
 
-        # build ui
+        # Rapid UI changes are merged into one rebuild of the latest state
+        self._scheduler = RenderScheduler(self._render_layers)
+
+        # Runs highlighted in the file browser are loaded ahead of opening
+        self._prefetcher = Prefetcher()
+
+        # build ui, the map is filled once the server is up (pydeck is imported then)
         self._build_ui()
+        self.ctrl.on_server_ready.add(self._update_layers)
 
     @change("scale", "field_specs")
     def _update_layers(self, *_, **__):
-        """Update DeckGL layers based on loaded data and visibility controls"""
-        ctx = LayerContext(
-            specs=self.state.field_specs,
-            datasets=self._datasets,
-            velocity_scale=self.state.scale,
+        """Schedule an update of the DeckGL layers (see RenderScheduler)"""
+        self._scheduler.request()
+
+    async def _render_layers(self, token):
+        """Build layers from a snapshot of the state off the event loop, then push"""
+        with PROFILER.update(scale=self.state.scale) as record:
+            ctx = LayerContext(
+                specs=self.state.field_specs,
+                datasets=[
+                    DatasetSnapshot.from_visualization(ds) for ds in self._datasets
+                ],
+                velocity_scale=self.state.scale,
+                view_3d=self.map_params.view_3d,
+                cancel_token=token,
+            )
+            view = StaticMapSettings.from_settings(self.map_params)
+            blocks = list(self._blocks.selected or [])
+            try:
+                deck_data = await asyncio.to_thread(
+                    self._build_deck_data, ctx, view, blocks
+                )
+                # Superseded while the thread was finishing
+                token.raise_if_cancelled()
+            except BuildCancelled:
+                if record is not None:
+                    record["args"]["cancelled"] = True
+                raise
+
+            with PROFILER.stage("push"), self.state:
+                self.state[self._deck_key] = deck_data
+                self._update_filter_bounds(ctx.datasets)
+                self._update_block_items()
+
+        if PROFILER.enabled:
+            with self.state:
+                self.state.profile_report = PROFILER.report()
+
+    @staticmethod
+    def _build_deck_data(ctx, view, blocks=None):
+        from .io import block_subset
+        from .viz.fault_lines import build_fault_lines
+
+        if blocks:
+            for ds in ctx.datasets:
+                if ds.enabled and ds.data is not None and ds.data.block_index:
+                    ds.data = block_subset(ds.data, blocks)
+
+        with PROFILER.stage("fault_lines"):
+            build_fault_lines(ctx)
+        with PROFILER.stage("fields"):
+            FIELD_REGISTRY.build_layers(ctx)
+        ctx.raise_if_cancelled()
+        with PROFILER.stage("build_deck"):
+            deck = build_deck(ctx.all_layers, view)
+        with PROFILER.stage("serialize"):
+            payload = deck.to_json()
+            deck_data = json.loads(payload)
+        PROFILER.record_payload(deck_data)
+        return deck_data
+
+    def _update_filter_bounds(self, datasets):
+        """Filter slider bounds of the rendered data, drop filters without data."""
+        bounds = filter_bounds(datasets)
+        if bounds == self._filters.bounds:
+            return
+        self._filters.bounds = bounds
+        ranges = self._filters.ranges or {}
+        self._filters.ranges = {k: v for k, v in ranges.items() if k in bounds}
+
+    def _update_block_items(self):
+        """Blocks of the first dataset with block labels, drop unknown selections."""
+        items = next(
+            (
+                block_items(ds.data)
+                for ds in self._datasets
+                if ds.enabled and ds.data is not None and ds.data.block_index
+            ),
+            [],
+        )
+        if items == self._blocks.items:
+            return
+        self._blocks.items = items
+        values = {item["value"] for item in items}
+        selected = self._blocks.selected or []
+        if any(value not in values for value in selected):
+            self._blocks.selected = [value for value in selected if value in values]
+
+    def _toggle_3d(self, view_3d):
+        """Tilt the camera when entering 3D so depth is visible, flatten it on exit."""
+        if view_3d and self.map_params.pitch == 0:
+            self.map_params.pitch = VIEW_3D_PITCH
+        elif not view_3d:
+            self.map_params.pitch = 0
+        self._update_layers()
+
+    def _toggle_live(self, *_):
+        running = self._live_task is not None and not self._live_task.done()
+        if not running and any(ds.live for ds in self._datasets):
+            self._live_task = asyncio.ensure_future(self._watch_runs())
+
+    async def _watch_runs(self):
+        """Re-read the model files of live datasets as celeri rewrites them."""
+        from .io import reload_folder_data
+
+        while any(ds.enabled and ds.live for ds in self._datasets):
+            await asyncio.sleep(WATCH_INTERVAL)
+            for idx, viz in enumerate(self._datasets):
+                watcher = self._watchers.get(idx)
+                if not (viz.enabled and viz.live):
+                    self._watchers.pop(idx, None)
+                    continue
+                if watcher is None or watcher.folder != viz.path:
+                    self._watchers[idx] = RunWatcher(viz.path)
+                    continue
+                changed = watcher.poll()
+                if not changed:
+                    continue
+                data = viz.data
+                try:
+                    reloaded = await asyncio.to_thread(
+                        reload_folder_data, data, viz.path, changed
+                    )
+                except (OSError, ValueError, KeyError):
+                    # Truncated or partial file (missing columns), retried next poll
+                    continue
+                if viz.data is not data:
+                    # Another run was opened in this slot meanwhile
+                    continue
+                watcher.accept()
+                viz.update_data(reloaded)
+                PROFILER.count("live_reloads")
+                self._update_layers()
+        self._watchers.clear()
+
+    def _update_playback(self, *_):
+        """Show the playback bar while a dataset with frames plays them."""
+        playback = next(
+            (
+                ds.data.playback
+                for ds in self._datasets
+                if ds.enabled and ds.fields.get("play") and ds.data.playback
+            ),
+            None,
         )
-        build_fault_lines(ctx)
-        FIELD_REGISTRY.build_layers(ctx)
+        names = [name.lstrip("0") for name in playback.names] if playback else []
+        if names == self._playback.names:
+            return
+        self._playback.playing = False
+        self._playback.frame = 0
+        self._playback.names = names
+
+    def _toggle_playback(self, playing):
+        running = self._play_task is not None and not self._play_task.done()
+        if playing and not running:
+            self._play_task = asyncio.ensure_future(self._play())
+
+    async def _play(self):
+        """Step through the frames, fennil.js swaps the drawn values."""
+        while self._playback.playing and self._playback.names:
+            await asyncio.sleep(self._playback.interval / 1000)
+            if not self._playback.playing:
+                break
+            self._playback.frame = (self._playback.frame + 1) % len(
+                self._playback.names
+            )
 
-        with self.state:
-            self.ctrl.deck_update(build_deck(ctx.all_layers, self.map_params))
+    def export_profile(self, fmt):
+        suffix = "trace.json" if fmt == "trace" else "json"
+        path = self._profile_output / f"fennil-profile.{suffix}"
+        PROFILER.export(path, fmt)
+        self.state.profile_export_path = str(path.resolve())
+
+    def clear_profile(self):
+        PROFILER.clear()
+        self.state.profile_report = PROFILER.report()
 
     def load_dataset(self, directory_path):
         self.state.compact_drawer = False  # Always open when new data
-        dataset = load_folder_data(directory_path)
+        dataset = self._prefetcher.load(directory_path)
         if self._datasets[0].enabled:
             self._datasets[1].attach_data(directory_path, dataset)
         else:
             self._datasets[0].attach_data(directory_path, dataset)
 
+    def load_pair(self, right_path, left_path):
+        """Load two runs side by side, for the comparison fields."""
+        self.state.compact_drawer = False
+        self._datasets[0].attach_data(right_path, self._prefetcher.load(right_path))
+        self._datasets[1].attach_data(left_path, self._prefetcher.load(left_path))
+
+    def open_playback(self, directory_path, data):
+        """Show a dataset with playback frames alone, playing its slip rates."""
+        self.state.compact_drawer = False
+        self._datasets[1].clear()
+        self._datasets[0].attach_data(directory_path, data)
+        self._datasets[0].fields = {**self._datasets[0].fields, "play": "ss"}
+
     def reset_dataset(self, index):
         if index == 0 and self._datasets[1].enabled:
             self._datasets[0].adopt(self._datasets[1])
@@ -80,7 +334,16 @@ class FennilApp(TrameApp):
             # Dialogs
             # -----------------------------------------------------------------
 
-            FileBrowser(ctx_name="file_browser", on_open=self.load_dataset)
+            FileBrowser(
+                ctx_name="file_browser",
+                on_open=self.load_dataset,
+                on_highlight=self._prefetcher.prefetch,
+            )
+            SweepPanel(ctx_name="sweep_panel", on_open_pair=self.load_pair)
+            PlaybackPanel(ctx_name="playback_panel", on_open=self.open_playback)
+
+            if PROFILER.enabled:
+                ProfilePanel(on_export=self.export_profile, on_clear=self.clear_profile)
 
             # -----------------------------------------------------------------
             # Drawer
@@ -117,6 +380,16 @@ class FennilApp(TrameApp):
                         click=self.ctx.file_browser.open,
                         prepend_icon="mdi-database-plus",
                     )
+                    v3.VListItem(
+                        title=["compact_drawer ? null : 'Compare runs'"],
+                        click=self.ctx.sweep_panel.open,
+                        prepend_icon="mdi-table-large",
+                    )
+                    v3.VListItem(
+                        title=["compact_drawer ? null : 'Play runs'"],
+                        click=self.ctx.playback_panel.open,
+                        prepend_icon="mdi-play-box-multiple-outline",
+                    )
 
                 with self._datasets[0].provide_as("right"):
                     with self._datasets[1].provide_as("left"):
@@ -143,6 +416,17 @@ class FennilApp(TrameApp):
                                                     "[left.enabled ? 1 : 0]",
                                                 ),
                                             )
+                                            v3.VBtn(
+                                                icon=[
+                                                    "(left.enabled ? left : right).live ? 'mdi-sync' : 'mdi-sync-off'"
+                                                ],
+                                                density="compact",
+                                                hide_details=True,
+                                                size="small",
+                                                variant="plain",
+                                                title="Live reload",
+                                                click="(left.enabled ? left : right).live = !(left.enabled ? left : right).live",
+                                            )
                                             html.Div(
                                                 "{{ left.enabled ? left.name : right.name }}"
                                             )
@@ -156,6 +440,17 @@ class FennilApp(TrameApp):
                                                 variant="plain",
                                                 click=(self.reset_dataset, "[0]"),
                                             )
+                                            v3.VBtn(
+                                                icon=[
+                                                    "right.live ? 'mdi-sync' : 'mdi-sync-off'"
+                                                ],
+                                                density="compact",
+                                                hide_details=True,
+                                                size="small",
+                                                variant="plain",
+                                                title="Live reload",
+                                                click="right.live = !right.live",
+                                            )
                                             html.Div("{{ right.name }}")
                             with html.Tbody():
                                 with html.Tr(
@@ -281,6 +576,14 @@ class FennilApp(TrameApp):
                                 )
 
                 with v3.Template(v_slot_append=True):
+                    with self._filters.provide_as("filters"):
+                        FilterPanel(
+                            v_if="!compact_drawer && Object.keys(filters.bounds || {}).length"
+                        )
+                    with self._blocks.provide_as("blocks"):
+                        BlockPanel(v_if="!compact_drawer && blocks.items.length")
+                    with self.map_params.provide_as("map"):
+                        View3D(v_if="!compact_drawer")
                     Scale(v_if="!compact_drawer")
                     html.Div(
                         "x {{ scale }}",
@@ -292,48 +595,49 @@ class FennilApp(TrameApp):
             # Map
             # -----------------------------------------------------------------
 
-            with v3.VMain():
-                deck_map = deckgl.Deck(
-                    mapbox_api_key=mapbox.TOKEN,
-                    tooltip=(
-                        "deckgl_tooltip",
-                        {
-                            "html": "{tooltip}",
-                            "style": {
-                                "backgroundColor": "rgba(0, 0, 0, 0.85)",
-                                "color": "white",
-                                "fontSize": "12px",
-                            },
-                        },
+            with (
+                v3.VMain(),
+                self.map_params.provide_as("map"),
+                self._filters.provide_as("filters"),
+                self._colormaps.provide_as("colormaps"),
+                self._playback.provide_as("playback"),
+            ):
+                deck_map = DeckMap(
+                    options=(
+                        "{exaggeration: map.vertical_exaggeration,"
+                        " filters: filters.ranges, colormaps: colormaps.ranges,"
+                        " frame: playback.frame}"
                     ),
+                    mapbox_api_key=mapbox.TOKEN,
+                    tooltip=("deckgl_tooltip", TOOLTIP),
                     style="width: 100%; height: 100%;",
                     classes="fill-height",
                 )
                 self.ctrl.deck_update = deck_map.update
-                self.ctrl.deck_update(build_deck([], self.map_params))
+                PlaybackBar(v_if="playback.names.length")
+                self._deck_key = deck_map.key
 
             # -----------------------------------------------------------------
             # Footer
             # -----------------------------------------------------------------
 
-            with v3.VFooter(app=True, height=35):
-                # Slip rate colorbar placeholder
-                html.Div(
-                    "Slip rate (mm/yr): -100 ←→ +100",
-                    style="font-size: 0.75rem; color: #666;",
-                )
-                # Residual magnitude colorbar placeholder
-                html.Div(
-                    "Resid. mag. (mm/yr): 0 → 5",
-                    style="font-size: 0.75rem; color: #666;",
-                )
-                # Residual diff colorbar placeholder
-                html.Div(
-                    "Resid. diff. (mm/yr): -5 ←→ +5",
-                    style="font-size: 0.75rem; color: #666;",
-                )
-                if self.server.hot_reload:
+            with (
+                v3.VFooter(app=True, height=35, classes="ga-4"),
+                self._colormaps.provide_as("colormaps"),
+            ):
+                for colormap in COLORMAPS.values():
+                    ColormapLegend(colormap)
+                if self.server.hot_reload or PROFILER.enabled:
                     v3.VSpacer()
+                if PROFILER.enabled:
+                    v3.VBtn(
+                        icon="mdi-speedometer",
+                        click="profile_panel = !profile_panel",
+                        density="compact",
+                        classes="rounded",
+                        flat=True,
+                    )
+                if self.server.hot_reload:
                     v3.VBtn(
                         icon="mdi-refresh",
                         click=self.ctrl.on_server_reload,
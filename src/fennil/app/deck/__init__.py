@@ -1,7 +1,8 @@
 from . import mapbox
-from .builder import build_deck
+from .builder import TOOLTIP, build_deck
 
 __all__ = [
+    "TOOLTIP",
     "build_deck",
     "mapbox",
 ]
@@ -1,9 +1,18 @@
-import pydeck as pdk
-
 from . import mapbox
 
+TOOLTIP = {
+    "html": "{tooltip}",
+    "style": {
+        "backgroundColor": "rgba(0, 0, 0, 0.85)",
+        "color": "white",
+        "fontSize": "12px",
+    },
+}
+
+
+def build_deck(layers, map_params, **kwargs):
+    import pydeck as pdk  # slow to import, only needed once layers are drawn
 
-def build_deck(layers, map_params):
     return pdk.Deck(
         map_provider=mapbox.PROVIDER,
         map_style=mapbox.STYLE,
@@ -15,4 +24,5 @@ def build_deck(layers, map_params):
             bearing=map_params.bearing,
         ),
         layers=layers,
+        **kwargs,
     )
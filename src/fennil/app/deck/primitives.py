@@ -1,6 +1,98 @@
 import pydeck as pdk
 
-from fennil.app.geo_projs import shift_longitudes_df, shift_polygon_df
+from fennil.app.geo_projs import SHIFT_LON, shift_longitudes_df, shift_polygon_df
+
+
+def filter_accessor(filters):
+    """``getFilterValue`` of the ``filter_<name>`` columns of ``filters``."""
+    columns = [f"filter_{name}" for name in filters]
+    return columns[0] if len(columns) == 1 else columns
+
+
+def filter_layer(layer, filters):
+    """
+    Wrap ``layer`` in the FennilFilterLayer class of fennil.js, which hides
+    the rows whose ``filters`` values are outside the ranges of the filter
+    panel. ``layer`` reads them with :func:`filter_accessor`.
+    """
+    if not filters:
+        return layer
+    return pdk.Layer(
+        "FennilFilterLayer", id=layer.id, layer=layer, filters=f"'{','.join(filters)}'"
+    )
+
+
+def colormap_layer(layer, colormap):
+    """
+    Wrap ``layer`` in the FennilColormapLayer class of fennil.js, which colors
+    each row from its ``color_value`` through ``colormap`` (a viz.styles
+    Colormap) on the GPU, with the range set in the map legend.
+    """
+    if colormap is None:
+        return layer
+    return pdk.Layer(
+        "FennilColormapLayer",
+        id=layer.id,
+        layer=layer,
+        colormap=f"'{colormap.name}'",
+        palette=colormap.palette,
+        value_range=[colormap.vmin, colormap.vmax],
+    )
+
+
+def level_layer(layer, level_zoom):
+    """
+    Wrap ``layer`` in the FennilLevelLayer class of fennil.js, which hides the
+    rows whose ``level`` column exceeds the map zoom minus ``level_zoom``:
+    level ``k`` rows appear from zoom ``level_zoom + k`` on.
+    """
+    if level_zoom is None:
+        return layer
+    return pdk.Layer(
+        "FennilLevelLayer", id=layer.id, layer=layer, level_zoom=float(level_zoom)
+    )
+
+
+def raster_layer(layer, colormap, raster_range):
+    """
+    Wrap the BitmapLayer ``layer`` in the FennilRasterLayer class of fennil.js,
+    which reads its image as scalars (the red channel spanning
+    ``raster_range``) and colors them through ``colormap`` on the GPU, with
+    the range set in the map legend.
+    """
+    if colormap is None:
+        return layer
+    return pdk.Layer(
+        "FennilRasterLayer",
+        id=layer.id,
+        layer=layer,
+        colormap=f"'{colormap.name}'",
+        palette=colormap.palette,
+        value_range=[colormap.vmin, colormap.vmax],
+        raster_range=[float(bound) for bound in raster_range],
+    )
+
+
+def frame_layer(layer, frames, width_cap=None):
+    """
+    Wrap ``layer`` in the FennilFrameLayer class of fennil.js, which reads the
+    ``color_value`` of each row (and with ``width_cap`` its width, the
+    absolute value capped) from the current playback frame of ``frames`` (see
+    playback.Playback.payload). Rows pick their value with their
+    ``frame_index`` (a list for per-vertex values), or their own index.
+    Stepping frames only updates these attributes on the client.
+    """
+    if frames is None:
+        return layer
+    kwargs = {"width_cap": float(width_cap)} if width_cap is not None else {}
+    return pdk.Layer(
+        "FennilFrameLayer", id=layer.id, layer=layer, frames=frames, **kwargs
+    )
+
+
+def _wrap(layer, filters, colormap, level_zoom=None, frames=None, width_cap=None):
+    layer = frame_layer(colormap_layer(layer, colormap), frames, width_cap)
+    return filter_layer(level_layer(layer, level_zoom), filters)
 
 
 def line_layers(
@@ -14,7 +106,18 @@ def line_layers(
     width_scale=1,
     width_units=None,
     pickable=False,
+    filters=None,
+    colormap=None,
+    level_zoom=None,
 ):
+    """
+    LineLayer of ``data_df`` segments and its copy shifted by 360 degrees.
+
+    ``filters`` names the ``filter_<name>`` columns hiding rows outside the
+    filter ranges; with a ``colormap`` the ``color_value`` column sets the
+    color of each row instead of ``get_color``; with a ``level_zoom`` the
+    ``level`` column sets the zoom each row appears at (see level_layer).
+    """
     layer_kwargs = {
         "data": data_df,
         "get_source_position": ["start_lon", "start_lat"],
@@ -30,6 +133,12 @@ def line_layers(
     if width_units is not None:
         # pydeck expects quoted string literals for enum-like values.
         layer_kwargs["width_units"] = f"'{width_units}'"
+    if filters:
+        layer_kwargs["get_filter_value"] = filter_accessor(filters)
+    if colormap is not None:
+        layer_kwargs["get_color_value"] = "color_value"
+    if level_zoom is not None:
+        layer_kwargs["get_level"] = "level"
 
     layers = [
         pdk.Layer(
@@ -48,6 +157,68 @@ def line_layers(
             **shifted_kwargs,
         )
     )
+    return [_wrap(layer, filters, colormap, level_zoom) for layer in layers]
+
+
+def path_layers(
+    layer_id_prefix,
+    data_df,
+    get_color,
+    get_width,
+    folder_number,
+    width_min_pixels=1,
+    width_scale=1,
+    width_units=None,
+    pickable=False,
+    filters=None,
+    colormap=None,
+    frames=None,
+    width_cap=None,
+):
+    """
+    PathLayers of chained segments, wrapped in the FennilPathLayer class.
+
+    Each ``data_df`` row has a ``path`` vertex list; colors, widths, filter
+    and colormap values are per path or per vertex. Per-segment ``segments`` and
+    ``tooltip`` lists let fennil.js report the segment under the cursor
+    rather than the whole path. ``frames`` and ``width_cap`` animate the
+    colormap values and widths, see :func:`frame_layer`.
+    """
+    layer_kwargs = {
+        "get_path": "path",
+        "get_color": get_color,
+        "get_width": get_width,
+        "width_min_pixels": width_min_pixels,
+        "width_scale": width_scale,
+        "pickable": pickable,
+        # Paths are never closed, deck.gl can skip normalizing them
+        "_path_type": "'open'",
+    }
+    if width_units is not None:
+        layer_kwargs["width_units"] = f"'{width_units}'"
+    if filters:
+        layer_kwargs["get_filter_value"] = filter_accessor(filters)
+    if colormap is not None:
+        layer_kwargs["get_color_value"] = "color_value"
+
+    layers = []
+    for layer_id, layer_df in (
+        (f"{layer_id_prefix}_{folder_number}", data_df),
+        (f"{layer_id_prefix}_shift_{folder_number}", shift_polygon_df(data_df, "path")),
+    ):
+        layers.append(
+            pdk.Layer(
+                "FennilPathLayer",
+                id=layer_id,
+                layer=_wrap(
+                    pdk.Layer("PathLayer", id=layer_id, data=layer_df, **layer_kwargs),
+                    filters,
+                    colormap,
+                    frames=frames,
+                    width_cap=width_cap,
+                ),
+            )
+        )
     return layers
 
 
@@ -97,6 +268,86 @@ def polygon_layers(
     return layers
 
 
+def bitmap_layers(
+    layer_id_prefix,
+    image,
+    bounds,
+    folder_number,
+    opacity=1.0,
+    colormap=None,
+    raster_range=None,
+):
+    """
+    ``image`` (a URL) stretched over ``bounds`` ([west, south, east, north]).
+    With ``colormap`` it holds scalars colored on the client, see
+    :func:`raster_layer`.
+    """
+    west, south, east, north = bounds
+    layers = []
+    for suffix, shift in (("", 0.0), ("_shift", SHIFT_LON)):
+        layer = pdk.Layer(
+            "BitmapLayer",
+            id=f"{layer_id_prefix}{suffix}_{folder_number}",
+            # Quoted, so pydeck does not read the URL as an accessor
+            image=f"'{image}'",
+            bounds=[west + shift, south, east + shift, north],
+            opacity=opacity,
+            pickable=False,
+        )
+        layers.append(raster_layer(layer, colormap, raster_range))
+    return layers
+
+
+def indexed_mesh_layers(
+    layer_id_prefix,
+    mesh,
+    values,
+    colormap,
+    folder_number,
+    pickable=False,
+    frames=None,
+):
+    """
+    Triangle meshes drawn from indexed vertex buffers.
+
+    ``mesh`` holds flat ``positions`` ([lon, lat, ...]), ``triangles``
+    (3 vertex indices per triangle), optional ``depths`` (km per vertex) and a
+    ``key`` naming its geometry and ``values``. The FennilMeshLayer class of
+    fennil.js turns it into float32 position and value buffers, once per key,
+    and hands them to a SolidPolygonLayer as binary data, colored through
+    ``colormap`` on the GPU; the shifted copy only references the first layer.
+    With ``frames`` (see :func:`frame_layer`) the triangle values follow the
+    playback frame instead of ``values``.
+    """
+    layer_id = f"{layer_id_prefix}_{folder_number}"
+    shift_id = f"{layer_id_prefix}_shift_{folder_number}"
+    mesh = {
+        **mesh,
+        "values": values,
+        "colormap": colormap.name,
+        "palette": colormap.palette,
+        "range": [colormap.vmin, colormap.vmax],
+    }
+    if frames is not None:
+        mesh["frames"] = frames
+    return [
+        pdk.Layer(
+            "FennilMeshLayer",
+            id=layer_id,
+            layer=pdk.Layer("SolidPolygonLayer", id=layer_id, pickable=pickable),
+            mesh=mesh,
+            lon_offset=0,
+        ),
+        pdk.Layer(
+            "FennilMeshLayer",
+            id=shift_id,
+            layer=pdk.Layer("SolidPolygonLayer", id=shift_id, pickable=pickable),
+            mesh={"ref": layer_id},
+            lon_offset=SHIFT_LON,
+        ),
+    ]
+
+
 def scatter_layers(
     layer_id_prefix,
     data_df,
@@ -106,18 +357,25 @@ def scatter_layers(
     radius_min_pixels=1,
     radius_max_pixels=10,
     pickable=False,
+    filters=None,
 ):
+    layer_kwargs = {
+        "get_position": ["lon", "lat"],
+        "get_fill_color": fill_color,
+        "get_radius": radius,
+        "radius_min_pixels": radius_min_pixels,
+        "radius_max_pixels": radius_max_pixels,
+        "pickable": pickable,
+    }
+    if filters:
+        layer_kwargs["get_filter_value"] = filter_accessor(filters)
+
     layers = [
         pdk.Layer(
             "ScatterplotLayer",
             data=data_df,
-            get_position=["lon", "lat"],
-            get_fill_color=fill_color,
-            get_radius=radius,
-            radius_min_pixels=radius_min_pixels,
-            radius_max_pixels=radius_max_pixels,
-            pickable=pickable,
             id=f"{layer_id_prefix}_{folder_number}",
+            **layer_kwargs,
         )
     ]
 
@@ -126,15 +384,61 @@ def scatter_layers(
         pdk.Layer(
             "ScatterplotLayer",
             data=shift_df,
-            get_position=["lon", "lat"],
-            get_fill_color=fill_color,
-            get_radius=radius,
-            radius_min_pixels=radius_min_pixels,
-            radius_max_pixels=radius_max_pixels,
-            pickable=pickable,
             id=f"{layer_id_prefix}_shift_{folder_number}",
+            **layer_kwargs,
         )
     )
+    return [filter_layer(layer, filters) for layer in layers]
+
+
+def ellipse_layers(
+    layer_id_prefix,
+    data_df,
+    fill_color,
+    line_color,
+    radius_scale,
+    folder_number,
+    filters=None,
+):
+    """
+    Ellipses centered on ``lon``/``lat``, drawn as instanced ScatterplotLayer
+    circles that the FennilEllipseLayer class of fennil.js stretches and
+    rotates on the GPU. ``radius`` is the semi-major axis in meters (times
+    ``radius_scale``), ``ratio`` the minor/major axis ratio and ``angle`` the
+    major axis direction in degrees counter-clockwise from east.
+    """
+    layer_kwargs = {
+        "get_position": ["lon", "lat"],
+        "get_radius": "radius",
+        "get_fill_color": fill_color,
+        "get_line_color": line_color,
+        "radius_scale": radius_scale,
+        "radius_min_pixels": 0,
+        "radius_max_pixels": 1e6,
+        "line_width_min_pixels": 1,
+        "filled": True,
+        "stroked": True,
+        "get_ellipse_shape": ["ratio", "angle"],
+    }
+    if filters:
+        layer_kwargs["get_filter_value"] = filter_accessor(filters)
+
+    layers = []
+    for layer_id, layer_df in (
+        (f"{layer_id_prefix}_{folder_number}", data_df),
+        (
+            f"{layer_id_prefix}_shift_{folder_number}",
+            shift_longitudes_df(data_df, ["lon"]),
+        ),
+    ):
+        layer = pdk.Layer(
+            "ScatterplotLayer", id=layer_id, data=layer_df, **layer_kwargs
+        )
+        layers.append(
+            filter_layer(
+                pdk.Layer("FennilEllipseLayer", id=layer_id, layer=layer), filters
+            )
+        )
     return layers
 
 
@@ -152,6 +456,10 @@ def icon_layers(
     size_max_pixels=64,
     billboard=True,
     pickable=False,
+    filters=None,
+    colormap=None,
+    level_zoom=None,
+    frames=None,
 ):
     layer_kwargs = {
         "data": data_df,
@@ -167,6 +475,12 @@ def icon_layers(
     }
     if get_angle is not None:
         layer_kwargs["get_angle"] = get_angle
+    if filters:
+        layer_kwargs["get_filter_value"] = filter_accessor(filters)
+    if colormap is not None:
+        layer_kwargs["get_color_value"] = "color_value"
+    if level_zoom is not None:
+        layer_kwargs["get_level"] = "level"
 
     layers = [pdk.Layer("IconLayer", **layer_kwargs)]
 
@@ -176,4 +490,4 @@ def icon_layers(
         "id": f"{layer_id_prefix}_shift_{folder_number}",
     }
     layers.append(pdk.Layer("IconLayer", **shifted_kwargs))
-    return layers
+    return [_wrap(layer, filters, colormap, level_zoom, frames) for layer in layers]
@@ -18,10 +18,15 @@ def wgs84_to_web_mercator(lon, lat):
 def web_mercator_to_wgs84(x, y):
     """Converts Web Mercator (x, y) to WGS84 (longitude, latitude)."""
     lon = np.rad2deg(x / WEB_MERCATOR_RADIUS)
-    lat = np.rad2deg(2.0 * np.arctan(np.exp(y / WEB_MERCATOR_RADIUS)) - np.pi / 2.0)
+    lat = web_mercator_y_to_latitude(y)
     return lon, lat
 
 
+def web_mercator_y_to_latitude(y):
+    """Converts Web Mercator y to WGS84 latitude."""
+    return np.rad2deg(2.0 * np.arctan(np.exp(y / WEB_MERCATOR_RADIUS)) - np.pi / 2.0)
+
+
 def normalize_longitude_difference(start_lon, end_lon):
     """
     Normalize end longitude to be in the same 360-degree range as start longitude.
@@ -1,9 +1,14 @@
-from dataclasses import dataclass
-from pathlib import Path
+import hashlib
+import tarfile
+import zipfile
+from dataclasses import dataclass, field, replace
 
 import numpy as np
 import pandas as pd
 
+from fennil.app.blocks import BlockIndex, build_block_index
+from fennil.app.cache import DerivedCache
+from fennil.app.catalog import OPTIONAL_RUN_FILES, REQUIRED_RUN_FILES
 from fennil.app.geo_projs import (
     DIP_EPS,
     KM2M,
@@ -14,9 +19,60 @@ from fennil.app.geo_projs import (
     wgs84_to_web_mercator,
     wrap2360,
 )
+from fennil.app.mesh import TdeMesh, index_vertices, perimeter_edges
+from fennil.app.sources import ArchiveSource, run_source
+from fennil.app.topology import SegmentPaths, chain_segments
 
 PROJ_MESH_DIP_THRESHOLD_DEG = 75.0
 
+TDE_GEOMETRY_COLUMNS = [
+    "lon1",
+    "lat1",
+    "dep1",
+    "lon2",
+    "lat2",
+    "dep2",
+    "lon3",
+    "lat3",
+    "dep3",
+    "mesh_idx",
+]
+TDE_RATE_COLUMNS = ["strike_slip_rate", "dip_slip_rate"]
+# Columns station_data and segment_data read
+STATION_COLUMNS = [
+    "lon",
+    "lat",
+    "model_east_vel_residual",
+    "model_north_vel_residual",
+]
+SEGMENT_COLUMNS = ["lon1", "lat1", "lon2", "lat2"]
+
+# DerivedCache kinds computed from each model file, dropped when it is re-read
+DERIVED_KINDS = {
+    "model_station.csv": (
+        "vector_geometry",
+        "vector_endpoints",
+        "station_filters",
+        "station_ellipses",
+        "block_subset",
+        "block_items",
+        "euler_grid",
+        "residual_raster",
+        "strain_operator",
+        "strain_rates",
+        "strain_mesh_payload",
+    ),
+    "model_segment.csv": (
+        "segment_tooltips",
+        "fault_paths",
+        "segment_filters",
+        "block_subset",
+        "block_items",
+    ),
+    "model_meshes.csv": ("tde_mesh_payload", "tde_compare_keys", "tde_match"),
+    "model_block.csv": ("block_subset", "block_items", "euler_grid"),
+}
+
 
 @dataclass
 class Dataset:
@@ -31,15 +87,44 @@ class Dataset:
     x2_seg: np.ndarray
     y2_seg: np.ndarray
     tde_available: bool
-    tde_df: pd.DataFrame | None
+    tde_mesh: TdeMesh | None
     tde_perim_df: pd.DataFrame | None
     fault_proj_available: bool
     fault_proj_df: pd.DataFrame | None
+    segment_paths: SegmentPaths
+    # model_block.csv (None when the run has none) and the stations and
+    # segments of each block (None without station block labels)
+    block: pd.DataFrame | None
+    block_index: BlockIndex | None
+    # Value frames of a sweep drawn on this run's geometry (see playback.py)
+    playback: object | None = field(default=None, repr=False, compare=False)
+    derived: DerivedCache = field(
+        default_factory=DerivedCache, repr=False, compare=False
+    )
 
 
 def is_valid_data_folder(folder_path):
-    required = {"model_station.csv", "model_segment.csv", "model_meshes.csv"}
-    return all((folder_path / name).is_file() for name in required)
+    """Whether the run folder (or archive member folder) has all model files."""
+    try:
+        source = run_source(folder_path)
+        return all(source.find(name) is not None for name in REQUIRED_RUN_FILES)
+    except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile):
+        return False
+
+
+def read_model_csv(source, name):
+    """Parse a model file of a run source, decompressing it if needed."""
+    buffer, compression = source.csv_input(name)
+    return pd.read_csv(buffer, compression=compression)
+
+
+def check_columns(frame, columns, name):
+    """Raise ValueError when the ``name`` table lacks some of ``columns``."""
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        msg = f"{name} is missing columns: {', '.join(missing)}"
+        raise ValueError(msg)
+    return frame
 
 
 def build_fault_proj_data(segment):
@@ -108,202 +193,296 @@ def build_fault_proj_data(segment):
 
 
 def build_tde_data(meshes):
-    tde_required = {
-        "lon1",
-        "lat1",
-        "dep1",
-        "lon2",
-        "lat2",
-        "dep2",
-        "lon3",
-        "lat3",
-        "dep3",
-        "mesh_idx",
-        "strike_slip_rate",
-        "dip_slip_rate",
-    }
-    tde_available = tde_required.issubset(meshes.columns)
+    tde_available = {*TDE_GEOMETRY_COLUMNS, *TDE_RATE_COLUMNS}.issubset(meshes.columns)
     if not tde_available:
         return False, None, None
+    if meshes.empty:
+        return True, None, None
 
-    lon1_mesh = meshes["lon1"].to_numpy().copy()
-    lat1_mesh = meshes["lat1"].to_numpy()
-    dep1_mesh = meshes["dep1"].to_numpy()
-    lon2_mesh = meshes["lon2"].to_numpy().copy()
-    lat2_mesh = meshes["lat2"].to_numpy()
-    dep2_mesh = meshes["dep2"].to_numpy()
-    lon3_mesh = meshes["lon3"].to_numpy().copy()
-    lat3_mesh = meshes["lat3"].to_numpy()
-    dep3_mesh = meshes["dep3"].to_numpy()
-    mesh_idx = meshes["mesh_idx"].to_numpy()
-
-    lon1_mesh[lon1_mesh < 0] += 360
-    lon2_mesh[lon2_mesh < 0] += 360
-    lon3_mesh[lon3_mesh < 0] += 360
+    # (n_triangles, 3) corner arrays
+    lon = meshes[["lon1", "lon2", "lon3"]].to_numpy(dtype=float)
+    lat = meshes[["lat1", "lat2", "lat3"]].to_numpy(dtype=float)
+    dep = meshes[["dep1", "dep2", "dep3"]].to_numpy(dtype=float)
+    mesh_idx = meshes["mesh_idx"].to_numpy().astype(np.int64)
+    lon[lon < 0] += 360
 
+    radial = 1 + KM2M * dep / RADIUS_EARTH
     tri_leg1 = np.transpose(
         [
-            np.deg2rad(lon2_mesh - lon1_mesh),
-            np.deg2rad(lat2_mesh - lat1_mesh),
-            (1 + KM2M * dep2_mesh / RADIUS_EARTH)
-            - (1 + KM2M * dep1_mesh / RADIUS_EARTH),
+            np.deg2rad(lon[:, 1] - lon[:, 0]),
+            np.deg2rad(lat[:, 1] - lat[:, 0]),
+            radial[:, 1] - radial[:, 0],
         ]
     )
     tri_leg2 = np.transpose(
         [
-            np.deg2rad(lon3_mesh - lon1_mesh),
-            np.deg2rad(lat3_mesh - lat1_mesh),
-            (1 + KM2M * dep3_mesh / RADIUS_EARTH)
-            - (1 + KM2M * dep1_mesh / RADIUS_EARTH),
+            np.deg2rad(lon[:, 2] - lon[:, 0]),
+            np.deg2rad(lat[:, 2] - lat[:, 0]),
+            radial[:, 2] - radial[:, 0],
         ]
     )
     norm_vec = np.cross(tri_leg1, tri_leg2)
     tri_area = np.linalg.norm(norm_vec, axis=1)
-    azimuth, elevation, r = cart2sph(norm_vec[:, 0], norm_vec[:, 1], norm_vec[:, 2])
+    azimuth, elevation, _ = cart2sph(norm_vec[:, 0], norm_vec[:, 1], norm_vec[:, 2])
     strike = wrap2360(-np.rad2deg(azimuth))
     dip = 90 - np.rad2deg(elevation)
     dip[dip > 90] = 180.0 - dip[dip > 90]
 
-    mesh_list = np.unique(mesh_idx)
-    proj_mesh_flag = np.zeros_like(mesh_list)
-    mesh_area = np.zeros_like(mesh_list, dtype=float)
-    for i in mesh_list:
-        this_mesh_els = mesh_idx == i
-        mesh_area[i] = np.mean(tri_area[this_mesh_els])
-        this_mesh_dip = np.mean(dip[this_mesh_els])
-        if this_mesh_dip > PROJ_MESH_DIP_THRESHOLD_DEG:
-            proj_mesh_flag[i] = 1
-            dip_dir = np.mean(np.deg2rad(strike[this_mesh_els] + 90))
-            lon1_mesh[this_mesh_els] += np.sin(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep1_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-            lat1_mesh[this_mesh_els] += np.cos(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep1_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-            lon2_mesh[this_mesh_els] += np.sin(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep2_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-            lat2_mesh[this_mesh_els] += np.cos(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep2_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-            lon3_mesh[this_mesh_els] += np.sin(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep3_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-            lat3_mesh[this_mesh_els] += np.cos(dip_dir) * np.rad2deg(
-                np.abs(KM2M * dep3_mesh[this_mesh_els] / RADIUS_EARTH)
-            )
-
-    proj_mesh_idx = np.where(proj_mesh_flag)[0]
-
-    edge1_lon = np.array((lon1_mesh, lon2_mesh))
-    edge1_lat = np.array((lat1_mesh, lat2_mesh))
-    edge1_array = np.vstack(
-        (np.sort(edge1_lon, axis=0), np.sort(edge1_lat, axis=0), mesh_idx)
-    )
-    edge2_lon = np.array((lon2_mesh, lon3_mesh))
-    edge2_lat = np.array((lat2_mesh, lat3_mesh))
-    edge2_array = np.vstack(
-        (np.sort(edge2_lon, axis=0), np.sort(edge2_lat, axis=0), mesh_idx)
+    # Per-mesh means, mesh_idx runs from 0 to n_meshes - 1
+    n_meshes = mesh_idx.max() + 1
+    count = np.maximum(np.bincount(mesh_idx, minlength=n_meshes), 1)
+    mesh_area = np.bincount(mesh_idx, tri_area, n_meshes) / count
+    mesh_dip = np.bincount(mesh_idx, dip, n_meshes) / count
+    dip_dir = np.bincount(mesh_idx, np.deg2rad(strike + 90), n_meshes) / count
+    proj_mesh_flag = (mesh_dip > PROJ_MESH_DIP_THRESHOLD_DEG).astype(int)
+
+    first_corner, triangles = index_vertices(lon, lat, dep, mesh_idx)
+    vertex_mesh = np.repeat(mesh_idx, 3)[first_corner]
+    vertex_lon = lon.ravel()[first_corner]
+    vertex_lat = lat.ravel()[first_corner]
+    vertex_dep = dep.ravel()[first_corner]
+
+    # Steep meshes are projected along their mean dip direction by their depth.
+    offset = proj_mesh_flag[vertex_mesh] * np.rad2deg(
+        np.abs(KM2M * vertex_dep / RADIUS_EARTH)
     )
-    edge3_lon = np.array((lon3_mesh, lon1_mesh))
-    edge3_lat = np.array((lat3_mesh, lat1_mesh))
-    edge3_array = np.vstack(
-        (np.sort(edge3_lon, axis=0), np.sort(edge3_lat, axis=0), mesh_idx)
+    proj_lon = vertex_lon + np.sin(dip_dir[vertex_mesh]) * offset
+    proj_lat = vertex_lat + np.cos(dip_dir[vertex_mesh]) * offset
+
+    perim_edges, perim_triangle = perimeter_edges(triangles, len(first_corner))
+    perim_proj = proj_mesh_flag[mesh_idx[perim_triangle]]
+
+    plot_order = np.argsort(-mesh_area[mesh_idx], kind="stable")
+    tde_mesh = TdeMesh(
+        lon=proj_lon,
+        lat=proj_lat,
+        dep=vertex_dep,
+        source_lon=vertex_lon,
+        source_lat=vertex_lat,
+        triangles=triangles[plot_order],
+        mesh_idx=mesh_idx[plot_order],
+        ss_rate=meshes["strike_slip_rate"].to_numpy()[plot_order],
+        ds_rate=meshes["dip_slip_rate"].to_numpy()[plot_order],
+        perimeter=perim_edges,
+        perimeter_proj=perim_proj,
+        order=plot_order,
     )
-    all_edge_array = np.concatenate((edge1_array, edge2_array, edge3_array), axis=1)
-
-    edge1_array_unsorted = np.vstack((edge1_lon, edge1_lat, mesh_idx))
-    edge2_array_unsorted = np.vstack((edge2_lon, edge2_lat, mesh_idx))
-    edge3_array_unsorted = np.vstack((edge3_lon, edge3_lat, mesh_idx))
-    all_edge_array_unsorted = np.concatenate(
-        (edge1_array_unsorted, edge2_array_unsorted, edge3_array_unsorted), axis=1
-    )
-
-    unique_edges, unique_edge_index, edge_count = np.unique(
-        all_edge_array, return_index=True, return_counts=True, axis=1
-    )
-    unique_edges_unsorted = all_edge_array_unsorted[:, unique_edge_index]
-    perim_edges = unique_edges_unsorted[:, edge_count == 1]
-    proj_mesh_edge_flag = np.isin(perim_edges[-1, :], proj_mesh_idx).astype(int)
-
-    mesh_plot_order = np.argsort(-mesh_area)
-    mesh_plot_order_index = []
-    for i in mesh_plot_order:
-        mesh_plot_order_index.extend(np.argwhere(mesh_idx == i).flatten().tolist())
-    mesh_plot_order_index = np.array(mesh_plot_order_index, dtype=int)
-
-    tde_df = None
-    if mesh_plot_order_index.size:
-        tde_df = pd.DataFrame(
-            {
-                "polygon": [
-                    [
-                        [lon1_mesh[j], lat1_mesh[j]],
-                        [lon2_mesh[j], lat2_mesh[j]],
-                        [lon3_mesh[j], lat3_mesh[j]],
-                    ]
-                    for j in mesh_plot_order_index
-                ],
-                "ss_rate": meshes["strike_slip_rate"].to_numpy()[mesh_plot_order_index],
-                "ds_rate": meshes["dip_slip_rate"].to_numpy()[mesh_plot_order_index],
-            }
-        )
 
     tde_perim_df = None
-    if perim_edges.size:
+    if len(perim_edges):
         tde_perim_df = pd.DataFrame(
             {
-                "start_lon": perim_edges[0, :],
-                "start_lat": perim_edges[2, :],
-                "end_lon": perim_edges[1, :],
-                "end_lat": perim_edges[3, :],
-                "proj_col": proj_mesh_edge_flag,
+                "start_lon": proj_lon[perim_edges[:, 0]],
+                "start_lat": proj_lat[perim_edges[:, 0]],
+                "end_lon": proj_lon[perim_edges[:, 1]],
+                "end_lat": proj_lat[perim_edges[:, 1]],
+                "proj_col": perim_proj,
             }
         )
 
-    return True, tde_df, tde_perim_df
-
-
-def load_folder_data(folder_path):
-    folder_path = Path(folder_path)
+    return True, tde_mesh, tde_perim_df
+
+
+def mesh_digest(folder_path):
+    """Content hash of a run's mesh file, used to share derived TDE geometry."""
+    digest = hashlib.blake2b(digest_size=16)
+    with run_source(folder_path).open("model_meshes.csv") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_meshes(folder_path, mesh_cache=None):
+    """
+    Read model_meshes.csv and derive the TDE geometry.
+
+    When a ``mesh_cache`` dict is given, runs with byte-identical mesh files
+    share the parsed table and the derived geometry.
+    """
+    source = run_source(folder_path)
+    if mesh_cache is None:
+        meshes = read_model_csv(source, "model_meshes.csv")
+        return (meshes, *build_tde_data(meshes))
+
+    key = mesh_digest(source)
+    if key not in mesh_cache:
+        mesh_cache[key] = load_meshes(source)
+    return mesh_cache[key]
+
+
+def update_tde_rates(previous, tde_mesh, meshes):
+    """
+    ``tde_mesh`` with the slip rates of ``meshes``, or None when its triangles
+    differ from the ``previous`` table (the geometry must be derived again).
+    """
+    columns = {*TDE_GEOMETRY_COLUMNS, *TDE_RATE_COLUMNS}
+    if tde_mesh is None or not columns.issubset(meshes.columns):
+        return None
+    if not set(TDE_GEOMETRY_COLUMNS).issubset(previous.columns):
+        return None
+    if not meshes[TDE_GEOMETRY_COLUMNS].equals(previous[TDE_GEOMETRY_COLUMNS]):
+        return None
+    return replace(
+        tde_mesh,
+        ss_rate=meshes["strike_slip_rate"].to_numpy()[tde_mesh.order],
+        ds_rate=meshes["dip_slip_rate"].to_numpy()[tde_mesh.order],
+    )
 
-    station = pd.read_csv(folder_path / "model_station.csv")
-    segment = pd.read_csv(folder_path / "model_segment.csv")
-    meshes = pd.read_csv(folder_path / "model_meshes.csv")
 
+def station_data(station):
+    """Dataset fields derived from model_station.csv."""
     resmag = np.sqrt(
         np.power(station.model_east_vel_residual, 2)
         + np.power(station.model_north_vel_residual, 2)
     )
+    x_station, y_station = wgs84_to_web_mercator(
+        station.lon.to_numpy(), station.lat.to_numpy()
+    )
+    return {
+        "station": station,
+        "resmag": resmag,
+        "x_station": x_station,
+        "y_station": y_station,
+    }
 
-    lon_station = station.lon.to_numpy()
-    lat_station = station.lat.to_numpy()
-    x_station, y_station = wgs84_to_web_mercator(lon_station, lat_station)
 
+def segment_data(segment):
+    """Dataset fields derived from model_segment.csv."""
     lon1_seg = segment.lon1.to_numpy()
     lat1_seg = segment.lat1.to_numpy()
     lon2_seg = segment.lon2.to_numpy()
     lat2_seg = segment.lat2.to_numpy()
     x1_seg, y1_seg = wgs84_to_web_mercator(lon1_seg, lat1_seg)
     x2_seg, y2_seg = wgs84_to_web_mercator(lon2_seg, lat2_seg)
-
     fault_proj_available, fault_proj_df = build_fault_proj_data(segment)
-    tde_available, tde_df, tde_perim_df = build_tde_data(meshes)
+    return {
+        "segment": segment,
+        "x1_seg": x1_seg,
+        "y1_seg": y1_seg,
+        "x2_seg": x2_seg,
+        "y2_seg": y2_seg,
+        "fault_proj_available": fault_proj_available,
+        "fault_proj_df": fault_proj_df,
+        "segment_paths": chain_segments(lon1_seg, lat1_seg, lon2_seg, lat2_seg),
+    }
+
+
+def block_index(station, segment, block):
+    """:class:`BlockIndex` of a run, None without station block labels."""
+    if "block_label" not in station.columns:
+        return None
+    labels = names = None
+    if block is not None and len(block):
+        labels = (
+            block["block_label"].to_numpy()
+            if "block_label" in block.columns
+            else np.arange(len(block))
+        )
+        if "name" in block.columns:
+            names = block["name"].astype(str).tolist()
+    sides = [
+        segment[column].to_numpy() if column in segment.columns else None
+        for column in ("west_labels", "east_labels")
+    ]
+    return build_block_index(station["block_label"].to_numpy(), *sides, labels, names)
+
+
+def block_subset(data, labels):
+    """
+    Memoized Dataset restricted to the stations of the blocks ``labels`` and
+    the segments bordering them, found through ``data.block_index``. TDE
+    meshes are kept whole. Playback frames keep the same rows.
+    """
+    labels = tuple(sorted(int(label) for label in labels))
+
+    def _build():
+        index = data.block_index
+        station_rows = index.stations(labels)
+        segment_rows = index.segments(labels)
+        station = data.station.iloc[station_rows].reset_index(drop=True)
+        segment = data.segment.iloc[segment_rows].reset_index(drop=True)
+        return replace(
+            data,
+            **station_data(station),
+            **segment_data(segment),
+            block_index=block_index(station, segment, data.block),
+            playback=None
+            if data.playback is None
+            else data.playback.subset(station_rows, segment_rows),
+            derived=DerivedCache(),
+        )
+
+    return data.derived.get(("block_subset", labels), _build)
+
+
+def load_folder_data(folder_path, mesh_cache=None):
+    source = run_source(folder_path)
+    optional = [name for name in OPTIONAL_RUN_FILES if source.find(name) is not None]
+    if isinstance(source, ArchiveSource):
+        # One pass over the archive for all the model files
+        source.read([*REQUIRED_RUN_FILES, *optional])
+
+    station = read_model_csv(source, "model_station.csv")
+    segment = read_model_csv(source, "model_segment.csv")
+    block = read_model_csv(source, "model_block.csv") if optional else None
+    meshes, tde_available, tde_mesh, tde_perim_df = load_meshes(source, mesh_cache)
 
     return Dataset(
-        station=station,
-        segment=segment,
+        **station_data(station),
+        **segment_data(segment),
+        block=block,
+        block_index=block_index(station, segment, block),
         meshes=meshes,
-        resmag=resmag,
-        x_station=x_station,
-        y_station=y_station,
-        x1_seg=x1_seg,
-        y1_seg=y1_seg,
-        x2_seg=x2_seg,
-        y2_seg=y2_seg,
         tde_available=tde_available,
-        tde_df=tde_df,
+        tde_mesh=tde_mesh,
         tde_perim_df=tde_perim_df,
-        fault_proj_available=fault_proj_available,
-        fault_proj_df=fault_proj_df,
     )
+
+
+def reload_folder_data(data, folder_path, changed):
+    """
+    New Dataset with the model files in ``changed`` read again.
+
+    Only what derives from those files is recomputed; derived cache entries of
+    the other files carry over. A mesh file whose triangles did not move only
+    updates the slip rates and keeps the TDE geometry.
+    """
+    source = run_source(folder_path)
+    updates = {}
+    dropped = []
+    # A file celeri is still writing may lack columns, ValueError is retried
+    if "model_station.csv" in changed:
+        station = read_model_csv(source, "model_station.csv")
+        check_columns(station, STATION_COLUMNS, "model_station.csv")
+        updates.update(station_data(station))
+        dropped.extend(DERIVED_KINDS["model_station.csv"])
+    if "model_segment.csv" in changed:
+        segment = read_model_csv(source, "model_segment.csv")
+        check_columns(segment, SEGMENT_COLUMNS, "model_segment.csv")
+        updates.update(segment_data(segment))
+        dropped.extend(DERIVED_KINDS["model_segment.csv"])
+    if "model_block.csv" in changed:
+        updates["block"] = (
+            read_model_csv(source, "model_block.csv")
+            if source.find("model_block.csv") is not None
+            else None
+        )
+        dropped.extend(DERIVED_KINDS["model_block.csv"])
+    if updates:
+        updates["block_index"] = block_index(
+            updates.get("station", data.station),
+            updates.get("segment", data.segment),
+            updates.get("block", data.block),
+        )
+    if "model_meshes.csv" in changed:
+        meshes = read_model_csv(source, "model_meshes.csv")
+        tde_mesh = update_tde_rates(data.meshes, data.tde_mesh, meshes)
+        if tde_mesh is None:
+            tde_available, tde_mesh, tde_perim_df = build_tde_data(meshes)
+            updates.update(tde_available=tde_available, tde_perim_df=tde_perim_df)
+            dropped.extend(DERIVED_KINDS["model_meshes.csv"])
+        updates.update(meshes=meshes, tde_mesh=tde_mesh)
+    if any(name in changed for name in REQUIRED_RUN_FILES):
+        # Frames are aligned on the rows the run had when they were loaded
+        updates["playback"] = None
+    return replace(data, **updates, derived=data.derived.copy(exclude=dropped))
@@ -1,7 +1,24 @@
+import sys
+
 from .core import FennilApp
 
 
 def main(server=None, **kwargs):
+    if len(sys.argv) > 1 and sys.argv[1] == "render":
+        from .render import main as render_main
+
+        sys.exit(render_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        from .catalog import main as catalog_main
+
+        sys.exit(catalog_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        from .sweep import main as sweep_main
+
+        sys.exit(sweep_main(sys.argv[2:]))
+
     app = FennilApp(server)
     app.server.start(**kwargs)
 
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class TdeMesh:
+    """Indexed triangle meshes: a unique vertex table plus int32 corner indices.
+
+    Triangles are stored in plot order (largest meshes first) and vertices are
+    shared between the triangles of a mesh, never across meshes.
+    """
+
+    lon: np.ndarray  # (n_vertices,) after projection of steep meshes
+    lat: np.ndarray
+    dep: np.ndarray  # km, negative below the surface
+    source_lon: np.ndarray  # (n_vertices,) before projection
+    source_lat: np.ndarray
+    triangles: np.ndarray  # (n_triangles, 3) int32
+    mesh_idx: np.ndarray  # (n_triangles,)
+    ss_rate: np.ndarray  # (n_triangles,)
+    ds_rate: np.ndarray
+    perimeter: np.ndarray  # (n_edges, 2) int32 vertex pairs
+    perimeter_proj: np.ndarray  # (n_edges,) 1 where the mesh was projected
+    order: np.ndarray  # (n_triangles,) model_meshes.csv row of each triangle
+
+    def __len__(self):
+        return len(self.triangles)
+
+    @property
+    def empty(self):
+        return len(self.triangles) == 0
+
+    def slip(self, kind):
+        return self.ss_rate if kind == "ss" else self.ds_rate
+
+    def positions(self, projected=True):
+        """
+        Interleaved [lon0, lat0, lon1, lat1, ...] vertex positions.
+
+        ``projected=False`` gives the true surface positions, which is what
+        a 3D view pairs with ``dep``.
+        """
+        if projected:
+            return np.column_stack((self.lon, self.lat)).ravel()
+        return np.column_stack((self.source_lon, self.source_lat)).ravel()
+
+    def polygons(self):
+        """Expanded [[lon, lat] x 3] triangle list, one entry per triangle."""
+        corners = np.stack((self.lon[self.triangles], self.lat[self.triangles]), -1)
+        return corners.tolist()
+
+
+def index_vertices(lon, lat, dep, mesh_idx):
+    """
+    Deduplicate triangle corners into a vertex table.
+
+    ``lon``, ``lat`` and ``dep`` are (n_triangles, 3) corner arrays. Corners are
+    the same vertex when they belong to the same mesh and have identical
+    coordinates; the grouping is hash based, so it is linear in the corner count.
+    Returns the vertex row of the first corner of each vertex and the
+    (n_triangles, 3) int32 triangle array.
+    """
+    corners = pd.DataFrame(
+        {
+            "mesh_idx": np.repeat(mesh_idx, 3),
+            "lon": lon.ravel(),
+            "lat": lat.ravel(),
+            "dep": dep.ravel(),
+        }
+    )
+    vertex_ids = (
+        corners.groupby(list(corners.columns), sort=False, dropna=False)
+        .ngroup()
+        .to_numpy()
+    )
+    # ngroup(sort=False) numbers vertices by first appearance.
+    first_corner = pd.Series(vertex_ids).drop_duplicates().index.to_numpy()
+    return first_corner, vertex_ids.reshape(-1, 3).astype(np.int32)
+
+
+def perimeter_edges(triangles, n_vertices):
+    """
+    Edges used by exactly one triangle.
+
+    Each undirected edge is hashed to one int64 key (``lo * n_vertices + hi``)
+    and boundary edges are the keys that occur once. Returns the (n_edges, 2)
+    vertex pairs, in triangle winding order, and the triangle of each edge.
+    """
+    edges = triangles[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    lo = np.minimum(edges[:, 0], edges[:, 1]).astype(np.int64)
+    hi = np.maximum(edges[:, 0], edges[:, 1]).astype(np.int64)
+    boundary = ~pd.Series(lo * n_vertices + hi).duplicated(keep=False).to_numpy()
+    triangle_of_edge = np.repeat(np.arange(len(triangles)), 3)
+    return edges[boundary], triangle_of_edge[boundary]
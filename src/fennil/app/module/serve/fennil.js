@@ -0,0 +1,736 @@
+// Client-side helpers for the fennil deck.gl map.
+//
+// The server sends compact layer descriptions (indexed TDE meshes, chained
+// fault segments, filter, colormap and playback frame values). expandDeck()
+// resolves references between layers and adds client-only options (vertical
+// exaggeration, filter and colormap ranges, playback frame) before the pydeck
+// converter sees the JSON, and FennilClasses holds the layer classes the
+// converter instantiates. Results are memoized, so re-rendering the page or
+// moving the camera does not rebuild layers that did not change.
+(function () {
+  const KM2M = 1000;
+  const MESH_DATA_CACHE_SIZE = 8;
+  const FRAME_DATA_CACHE_SIZE = 8;
+  // Bound of a filter without a range, so every value passes
+  const FILTER_OFF = 1e30;
+  // Longest colormap palette, the size of the palette uniform array
+  const MAX_PALETTE = 16;
+  const WHITE = [255, 255, 255, 255];
+
+  const expandedDecks = new WeakMap();
+  const meshData = new Map();
+  // Filter and colormap ranges by name, read by the extensions at every draw
+  let filterRanges = {};
+  let filterKey = "{}";
+  let colormapRanges = {};
+  let colormapKey = "{}";
+  // Decks drawing filtered or colormapped layers, redrawn when ranges change
+  const uniformDecks = new Set();
+  const filterExtensions = new Map();
+  const paletteUniforms = new Map();
+  // Playback frame shown by the frame layers, and those layers
+  let playbackFrame = 0;
+  const frameLayers = new Set();
+  const frameData = new Map();
+
+  function toRaw(value) {
+    return window.Vue && window.Vue.toRaw ? window.Vue.toRaw(value) : value;
+  }
+
+  // Indexed triangle mesh -> pre-triangulated SolidPolygonLayer binary data:
+  // float32 corner positions (z in meters when the mesh has depths), float32
+  // slip values repeated per corner (colored by the colormap extension) and
+  // the index buffer, so deck.gl skips tessellation (which would also drop
+  // vertical triangles in 3D). Meshes with playback frames get their values
+  // from the frame accessor instead.
+  function buildMeshData(mesh, lonOffset, zScale) {
+    const { positions, triangles, depths, values } = mesh;
+    const count = triangles.length / 3;
+    const size = depths ? 3 : 2;
+    const polygons = new Float32Array(triangles.length * size);
+    const colorValues = mesh.frames ? null : new Float32Array(triangles.length);
+    const startIndices = new Uint32Array(count);
+    const indices = new Uint32Array(triangles.length);
+
+    let p = 0;
+    for (let i = 0; i < triangles.length; i++) {
+      const v = triangles[i];
+      polygons[p++] = positions[2 * v] + lonOffset;
+      polygons[p++] = positions[2 * v + 1];
+      if (depths) {
+        polygons[p++] = depths[v] * zScale;
+      }
+      if (colorValues) {
+        colorValues[i] = values[(i / 3) | 0];
+      }
+      indices[i] = i;
+    }
+    for (let t = 0; t < count; t++) {
+      startIndices[t] = 3 * t;
+    }
+
+    const attributes = { indices, getPolygon: { value: polygons, size } };
+    if (colorValues) {
+      attributes.getColorValue = { value: colorValues, size: 1 };
+    }
+    return { length: count, startIndices, attributes };
+  }
+
+  // Same key -> same data object, so deck.gl neither re-tessellates nor
+  // re-uploads the buffers when the rest of the deck changes.
+  function cachedMeshData(mesh, lonOffset, zScale) {
+    const key = `${mesh.key}|${lonOffset}|${zScale}`;
+    let data = meshData.get(key);
+    if (data) {
+      meshData.delete(key);
+    } else {
+      data = buildMeshData(mesh, lonOffset, zScale);
+    }
+    meshData.set(key, data);
+    if (meshData.size > MESH_DATA_CACHE_SIZE) {
+      meshData.delete(meshData.keys().next().value);
+    }
+    return data;
+  }
+
+  // deck.gl JSON classes, registered through the Deck customLibraries prop.
+  // The converter cannot carry typed arrays, so FennilMeshLayer receives the
+  // already converted SolidPolygonLayer and returns a clone of it that draws
+  // the binary mesh data, colored through the mesh colormap.
+  function FennilMeshLayer({ layer, mesh, lonOffset = 0, exaggeration = 1 }) {
+    if (!mesh) {
+      return layer.clone({ data: [] });
+    }
+    const zScale = mesh.depths ? KM2M * exaggeration : 0;
+    const meshLayer = layer.clone({
+      data: cachedMeshData(mesh, lonOffset, zScale),
+      positionFormat: mesh.depths ? "XYZ" : "XY",
+      _normalize: false,
+      _full3d: Boolean(mesh.depths),
+      getFillColor: WHITE,
+      ...colormapProps(layer, mesh.colormap, mesh.palette, mesh.range),
+    });
+    return mesh.frames
+      ? FennilFrameLayer({ layer: meshLayer, frames: mesh.frames })
+      : meshLayer;
+  }
+
+  // Index of the path segment closest to a picked [lon, lat] coordinate.
+  // Longitudes are compared modulo 360 so shifted copies pick the same way.
+  function nearestSegment(path, coordinate) {
+    const wrap = (dx) => ((((dx + 180) % 360) + 360) % 360) - 180;
+    let best = 0;
+    let bestDistance = Infinity;
+    for (let k = 0; k + 1 < path.length; k++) {
+      const [x0, y0] = path[k];
+      const dx = wrap(path[k + 1][0] - x0);
+      const dy = path[k + 1][1] - y0;
+      const px = wrap(coordinate[0] - x0);
+      const py = coordinate[1] - y0;
+      const length2 = dx * dx + dy * dy;
+      const t =
+        length2 > 0
+          ? Math.min(Math.max((px * dx + py * dy) / length2, 0), 1)
+          : 0;
+      const distance = (px - t * dx) ** 2 + (py - t * dy) ** 2;
+      if (distance < bestDistance) {
+        best = k;
+        bestDistance = distance;
+      }
+    }
+    return best;
+  }
+
+  // Chained fault segments: a pick reports the original segment under the
+  // cursor (its index and tooltip) instead of the whole path.
+  function FennilPathLayer({ layer }) {
+    const getPathPickingInfo = layer.getPickingInfo;
+    layer.getPickingInfo = function (params) {
+      const info = getPathPickingInfo.call(this, params);
+      const row = info.object;
+      if (row && row.segments && info.coordinate) {
+        const k = nearestSegment(row.path, info.coordinate);
+        info.object = {
+          ...row,
+          segment: row.segments[k],
+          tooltip: row.tooltip ? row.tooltip[k] : undefined,
+        };
+      }
+      return info;
+    };
+    return layer;
+  }
+
+  // Value filtering on the GPU, in the manner of deck.gl's
+  // DataFilterExtension (not part of the deck.gl bundled with trame-deckgl).
+  // Each row carries one value per filter in the getFilterValue attribute;
+  // the ranges are uniforms, so changing them costs a redraw and no upload.
+  function filterShaders(size) {
+    const type = size === 1 ? "float" : `vec${size}`;
+    // Product of the per filter tests (scalars have no swizzles in GLSL ES)
+    const all =
+      size === 1
+        ? "s"
+        : ["s.x", "s.y", "s.z", "s.w"].slice(0, size).join(" * ");
+    return {
+      modules: [
+        {
+          name: `fennil-filter-${size}`,
+          vs: `
+#ifdef NON_INSTANCED_MODEL
+attribute ${type} filterValues;
+#define FENNIL_FILTER_VALUES filterValues
+#else
+attribute ${type} instanceFilterValues;
+#define FENNIL_FILTER_VALUES instanceFilterValues
+#endif
+uniform ${type} fennil_filterMin;
+uniform ${type} fennil_filterMax;
+varying float fennil_filterVisible;
+
+float fennil_inRange(${type} value) {
+  ${type} s = step(fennil_filterMin, value) * step(value, fennil_filterMax);
+  return ${all};
+}
+`,
+          fs: `
+varying float fennil_filterVisible;
+`,
+        },
+      ],
+      inject: {
+        "vs:DECKGL_FILTER_GL_POSITION": `
+  fennil_filterVisible = fennil_inRange(FENNIL_FILTER_VALUES);
+  if (fennil_filterVisible < 0.5) {
+    position = vec4(0.0);
+  }
+`,
+        "fs:DECKGL_FILTER_COLOR": `
+  if (fennil_filterVisible < 0.5) discard;
+`,
+      },
+    };
+  }
+
+  // Layer extension (duck typed, deck.gl only calls these methods) adding
+  // the filter attribute and uniforms to primitive layers.
+  function filterExtension(size) {
+    let extension = filterExtensions.get(size);
+    if (extension) {
+      return extension;
+    }
+    extension = {
+      getShaders() {
+        return filterShaders(size);
+      },
+      initializeState() {
+        this.getAttributeManager().add({
+          filterValues: {
+            size,
+            accessor: "getFilterValue",
+            shaderAttributes: {
+              filterValues: { divisor: 0 },
+              instanceFilterValues: { divisor: 1 },
+            },
+          },
+        });
+      },
+      updateState() {},
+      draw({ uniforms }) {
+        uniformDecks.add(this.context.deck);
+        const ranges = this.props.fennilFilters.map(
+          (name) => filterRanges[name] || [-FILTER_OFF, FILTER_OFF],
+        );
+        const min = ranges.map((range) => range[0]);
+        const max = ranges.map((range) => range[1]);
+        uniforms.fennil_filterMin = size === 1 ? min[0] : min;
+        uniforms.fennil_filterMax = size === 1 ? max[0] : max;
+      },
+      finalizeState() {},
+      getSubLayerProps() {
+        return {};
+      },
+      equals(other) {
+        return other === this;
+      },
+    };
+    filterExtensions.set(size, extension);
+    return extension;
+  }
+
+  // Rows whose filter values (one per name of the comma separated
+  // ``filters``) fall outside the filter panel ranges are not drawn.
+  function FennilFilterLayer({ layer, filters }) {
+    const names = filters.split(",");
+    return layer.clone({
+      extensions: [...layer.props.extensions, filterExtension(names.length)],
+      fennilFilters: names,
+    });
+  }
+
+  // Colormaps on the GPU: each row carries a scalar in the getColorValue
+  // attribute, mapped through a discrete palette (a uniform array) spread
+  // over the legend range. Like filters, moving the range only redraws.
+  const colormapFunction = `
+uniform vec4 fennil_palette[${MAX_PALETTE}];
+uniform float fennil_paletteSize;
+uniform vec2 fennil_colorRange;
+
+vec4 fennil_colormap(float value) {
+  float span = fennil_colorRange.y - fennil_colorRange.x;
+  float t = span > 0.0 ? (value - fennil_colorRange.x) / span : 0.5;
+  float index = clamp(floor(t * fennil_paletteSize), 0.0, fennil_paletteSize - 1.0);
+  vec4 color = fennil_palette[0];
+  for (int i = 1; i < ${MAX_PALETTE}; i++) {
+    if (float(i) <= index) {
+      color = fennil_palette[i];
+    }
+  }
+  return color;
+}
+`;
+  const colormapShaders = {
+    modules: [
+      {
+        name: "fennil-colormap",
+        vs: `
+#ifdef NON_INSTANCED_MODEL
+attribute float colorValues;
+#define FENNIL_COLOR_VALUE colorValues
+#else
+attribute float instanceColorValues;
+#define FENNIL_COLOR_VALUE instanceColorValues
+#endif
+${colormapFunction}`,
+      },
+    ],
+    inject: {
+      "vs:DECKGL_FILTER_COLOR": `
+  vec4 fennil_color = fennil_colormap(FENNIL_COLOR_VALUE);
+  color = vec4(fennil_color.rgb, fennil_color.a * color.a);
+`,
+    },
+  };
+
+  const colormapExtension = {
+    getShaders() {
+      return colormapShaders;
+    },
+    initializeState() {
+      this.getAttributeManager().add({
+        colorValues: {
+          size: 1,
+          accessor: "getColorValue",
+          shaderAttributes: {
+            colorValues: { divisor: 0 },
+            instanceColorValues: { divisor: 1 },
+          },
+        },
+      });
+    },
+    updateState() {},
+    draw({ uniforms }) {
+      colormapUniforms(this, uniforms);
+    },
+    finalizeState() {},
+    getSubLayerProps() {
+      return {};
+    },
+    equals(other) {
+      return other === this;
+    },
+  };
+
+  // [[r, g, b, a], ...] -> normalized vec4 array, shared between layers
+  function paletteUniform(palette) {
+    const key = JSON.stringify(palette);
+    let uniform = paletteUniforms.get(key);
+    if (!uniform) {
+      const value = new Float32Array(4 * MAX_PALETTE);
+      const size = Math.min(palette.length, MAX_PALETTE);
+      for (let i = 0; i < size; i++) {
+        const color = palette[i];
+        value[4 * i] = color[0] / 255;
+        value[4 * i + 1] = color[1] / 255;
+        value[4 * i + 2] = color[2] / 255;
+        value[4 * i + 3] = (color.length > 3 ? color[3] : 255) / 255;
+      }
+      uniform = { value, size };
+      paletteUniforms.set(key, uniform);
+    }
+    return uniform;
+  }
+
+  function colormapUniforms(layer, uniforms) {
+    uniformDecks.add(layer.context.deck);
+    const { fennilColormap, fennilPalette, fennilRange } = layer.props;
+    uniforms.fennil_palette = fennilPalette.value;
+    uniforms.fennil_paletteSize = fennilPalette.size;
+    uniforms.fennil_colorRange = colormapRanges[fennilColormap] || fennilRange;
+  }
+
+  // Rasters hold scalars in their red channel, spanning fennil_rasterRange,
+  // mapped per pixel through the same palettes and legend ranges.
+  const rasterExtension = {
+    getShaders() {
+      return {
+        modules: [
+          {
+            name: "fennil-raster",
+            fs: `
+${colormapFunction}
+uniform vec2 fennil_rasterRange;
+`,
+          },
+        ],
+        inject: {
+          "fs:DECKGL_FILTER_COLOR": `
+  float fennil_value = mix(fennil_rasterRange.x, fennil_rasterRange.y, color.r);
+  vec4 fennil_color = fennil_colormap(fennil_value);
+  color = vec4(fennil_color.rgb, fennil_color.a * color.a);
+`,
+        },
+      };
+    },
+    initializeState() {},
+    updateState() {},
+    draw({ uniforms }) {
+      colormapUniforms(this, uniforms);
+      uniforms.fennil_rasterRange = this.props.fennilRasterRange;
+    },
+    finalizeState() {},
+    getSubLayerProps() {
+      return {};
+    },
+    equals(other) {
+      return other === this;
+    },
+  };
+
+  function colormapProps(
+    layer,
+    colormap,
+    palette,
+    range,
+    extension = colormapExtension,
+  ) {
+    return {
+      extensions: [...layer.props.extensions, extension],
+      fennilColormap: colormap,
+      fennilPalette: paletteUniform(palette),
+      fennilRange: range,
+    };
+  }
+
+  // Rows are colored from their getColorValue through the ``colormap``
+  // palette, over the legend range of that colormap (``valueRange`` until
+  // the legend sets one).
+  function FennilColormapLayer({ layer, colormap, palette, valueRange }) {
+    return layer.clone(colormapProps(layer, colormap, palette, valueRange));
+  }
+
+  // BitmapLayer whose image holds scalars (red channel over ``rasterRange``),
+  // colored like FennilColormapLayer.
+  function FennilRasterLayer({
+    layer,
+    colormap,
+    palette,
+    valueRange,
+    rasterRange,
+  }) {
+    return layer.clone({
+      ...colormapProps(layer, colormap, palette, valueRange, rasterExtension),
+      fennilRasterRange: rasterRange,
+    });
+  }
+
+  // Station uncertainty ellipses: ScatterplotLayer circles whose corner
+  // offsets are stretched by the minor/major axis ratio and rotated to the
+  // major axis angle (degrees counter-clockwise from east) of each instance.
+  // The fragment shader still sees a unit circle, so fill, stroke and
+  // picking work unchanged.
+  const ellipseExtension = {
+    getShaders() {
+      return {
+        modules: [
+          {
+            name: "fennil-ellipse",
+            vs: `
+attribute vec2 instanceEllipseShapes;
+`,
+          },
+        ],
+        inject: {
+          "vs:DECKGL_FILTER_SIZE": `
+  float fennil_angle = radians(instanceEllipseShapes.y);
+  float fennil_cos = cos(fennil_angle);
+  float fennil_sin = sin(fennil_angle);
+  size.xy = mat2(fennil_cos, fennil_sin, -fennil_sin, fennil_cos) *
+    (size.xy * vec2(1.0, instanceEllipseShapes.x));
+`,
+        },
+      };
+    },
+    initializeState() {
+      this.getAttributeManager().addInstanced({
+        instanceEllipseShapes: { size: 2, accessor: "getEllipseShape" },
+      });
+    },
+    updateState() {},
+    draw() {},
+    finalizeState() {},
+    getSubLayerProps() {
+      return {};
+    },
+    equals(other) {
+      return other === this;
+    },
+  };
+
+  function FennilEllipseLayer({ layer }) {
+    return layer.clone({
+      extensions: [...layer.props.extensions, ellipseExtension],
+    });
+  }
+
+  // Zoom levels: rows of level k are drawn from zoom ``levelZoom + k`` on,
+  // so nested grids get denser as the map zooms in, without a server trip.
+  const levelExtension = {
+    getShaders() {
+      return {
+        modules: [
+          {
+            name: "fennil-level",
+            vs: `
+#ifdef NON_INSTANCED_MODEL
+attribute float levels;
+#define FENNIL_LEVEL levels
+#else
+attribute float instanceLevels;
+#define FENNIL_LEVEL instanceLevels
+#endif
+uniform float fennil_levelMax;
+`,
+          },
+        ],
+        inject: {
+          "vs:DECKGL_FILTER_GL_POSITION": `
+  if (FENNIL_LEVEL > fennil_levelMax) {
+    position = vec4(0.0);
+  }
+`,
+        },
+      };
+    },
+    initializeState() {
+      this.getAttributeManager().add({
+        levels: {
+          size: 1,
+          accessor: "getLevel",
+          shaderAttributes: {
+            levels: { divisor: 0 },
+            instanceLevels: { divisor: 1 },
+          },
+        },
+      });
+    },
+    updateState() {},
+    draw({ uniforms }) {
+      uniforms.fennil_levelMax =
+        this.context.viewport.zoom - this.props.fennilLevelZoom;
+    },
+    finalizeState() {},
+    getSubLayerProps() {
+      return {};
+    },
+    equals(other) {
+      return other === this;
+    },
+  };
+
+  function FennilLevelLayer({ layer, levelZoom }) {
+    return layer.clone({
+      extensions: [...layer.props.extensions, levelExtension],
+      fennilLevelZoom: levelZoom,
+    });
+  }
+
+  // Playback frames: the values of every frame of a sweep are sent once as a
+  // flat (count x size) list, kept as a Float32Array per frames key. Rows read
+  // the current frame through the accessors of FennilFrameLayer, so stepping
+  // frames only recomputes these attributes, the geometry buffers stay.
+  function cachedFrames(frames) {
+    let values = frameData.get(frames.key);
+    if (values) {
+      frameData.delete(frames.key);
+    } else {
+      values = Float32Array.from(frames.values);
+    }
+    frameData.set(frames.key, values);
+    if (frameData.size > FRAME_DATA_CACHE_SIZE) {
+      frameData.delete(frameData.keys().next().value);
+    }
+    return values;
+  }
+
+  // Value of a row in the current frame: rows pick it with their frame_index
+  // (a list for per-vertex values), rows without one (binary meshes) with
+  // their own index.
+  function frameAccessor(frames) {
+    const values = cachedFrames(frames);
+    const { count, size } = frames;
+    return (row, { index }) => {
+      const offset = Math.min(Math.max(playbackFrame, 0), count - 1) * size;
+      const rows =
+        row && row.frame_index !== undefined ? row.frame_index : index;
+      return Array.isArray(rows)
+        ? rows.map((k) => values[offset + k])
+        : values[offset + rows];
+    };
+  }
+
+  // Registers the frame layers so setFrame() can invalidate their attributes
+  const frameExtension = {
+    getShaders() {
+      return {};
+    },
+    initializeState() {
+      frameLayers.add(this);
+    },
+    updateState() {},
+    draw() {},
+    finalizeState() {
+      frameLayers.delete(this);
+    },
+    getSubLayerProps() {
+      return {};
+    },
+    equals(other) {
+      return other === this;
+    },
+  };
+
+  // Colormap values (and with ``widthCap`` widths, their capped absolute
+  // values) read from the current playback frame of ``frames``.
+  function FennilFrameLayer({ layer, frames, widthCap }) {
+    const getColorValue = frameAccessor(frames);
+    const props = {
+      extensions: [...layer.props.extensions, frameExtension],
+      getColorValue,
+      fennilFrameAccessors: ["getColorValue"],
+      updateTriggers: {
+        ...layer.props.updateTriggers,
+        getColorValue: frames.key,
+      },
+    };
+    if (widthCap !== undefined) {
+      const width = (value) => Math.min(Math.abs(value), widthCap);
+      props.getWidth = (row, info) => {
+        const value = getColorValue(row, info);
+        return Array.isArray(value) ? value.map(width) : width(value);
+      };
+      props.fennilFrameAccessors.push("getWidth");
+      props.updateTriggers.getWidth = frames.key;
+    }
+    return layer.clone(props);
+  }
+
+  function setFrame(frame) {
+    const next = Number(frame) || 0;
+    if (next === playbackFrame) {
+      return;
+    }
+    playbackFrame = next;
+    for (const layer of frameLayers) {
+      if (!layer.internalState) {
+        frameLayers.delete(layer);
+        continue;
+      }
+      const attributes = layer.getAttributeManager();
+      for (const accessor of layer.props.fennilFrameAccessors) {
+        attributes.invalidate(accessor);
+      }
+      layer.setNeedsUpdate();
+    }
+  }
+
+  function redrawDecks(reason) {
+    for (const deck of uniformDecks) {
+      if (deck.layerManager) {
+        deck.redraw(reason);
+      } else {
+        uniformDecks.delete(deck);
+      }
+    }
+  }
+
+  function setFilters(filters) {
+    const key = JSON.stringify(filters || {});
+    if (key === filterKey) {
+      return;
+    }
+    filterKey = key;
+    filterRanges = JSON.parse(key);
+    redrawDecks("fennil filters");
+  }
+
+  function setColormaps(colormaps) {
+    const key = JSON.stringify(colormaps || {});
+    if (key === colormapKey) {
+      return;
+    }
+    colormapKey = key;
+    colormapRanges = JSON.parse(key);
+    redrawDecks("fennil colormaps");
+  }
+
+  function expandLayer(layer, meshes, options) {
+    if (layer["@@type"] !== "FennilMeshLayer") {
+      return layer;
+    }
+    const mesh =
+      layer.mesh && layer.mesh.ref ? meshes[layer.mesh.ref] : layer.mesh;
+    return { ...layer, mesh, exaggeration: options.exaggeration || 1 };
+  }
+
+  function expandDeck(json, options = {}) {
+    if (!json || !json.layers) {
+      return json;
+    }
+    // Filter and colormap ranges only change uniforms and the playback frame
+    // a few attributes, the expanded deck stays the same
+    setFilters(options.filters);
+    setColormaps(options.colormaps);
+    setFrame(options.frame);
+    const raw = toRaw(json);
+    const memo = expandedDecks.get(raw);
+    if (memo && memo.exaggeration === options.exaggeration) {
+      return memo.expanded;
+    }
+
+    const meshes = {};
+    for (const layer of raw.layers) {
+      if (layer["@@type"] === "FennilMeshLayer" && !layer.mesh.ref) {
+        meshes[layer.id] = layer.mesh;
+      }
+    }
+    const expanded = {
+      ...raw,
+      layers: raw.layers.map((layer) => expandLayer(layer, meshes, options)),
+    };
+    expandedDecks.set(raw, { exaggeration: options.exaggeration, expanded });
+    return expanded;
+  }
+
+  window.fennil = { expandDeck };
+  window.FennilClasses = {
+    FennilMeshLayer,
+    FennilPathLayer,
+    FennilFilterLayer,
+    FennilColormapLayer,
+    FennilRasterLayer,
+    FennilEllipseLayer,
+    FennilLevelLayer,
+    FennilFrameLayer,
+  };
+})();
@@ -0,0 +1,199 @@
+"""
+Value frames of an ordered list of runs (a sweep) on the geometry of the first.
+
+The first run is loaded in full and its stations, segments and TDE triangles
+are the geometry every frame is drawn on. The other runs only contribute value
+columns: they are read on a process pool, without deriving any geometry, and
+their values are aligned onto the first run rows through the station and
+segment keys of the sweep comparison, and their TDE rates through the triangle
+matching of the TDE comparison. Frames are kept as float32 arrays, one row
+per run.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from fennil.app.sweep import point_keys, segment_keys, summarize_frames
+from fennil.app.viz.tde_compare import (
+    match_triangles,
+    tde_triangle_keys,
+    triangle_keys,
+)
+
+# Frame values shipped to the client, 0.001 mm/yr is plenty
+PLAYBACK_DECIMALS = 3
+
+
+@dataclass(frozen=True)
+class RunValues:
+    """Value columns of a run, keyed to be aligned on another run."""
+
+    summary: object  # sweep.RunSummary
+    tde_keys: object | None  # tde_compare.TriangleKeys, model_meshes.csv rows
+    tde_ss: np.ndarray | None
+    tde_ds: np.ndarray | None
+
+
+@dataclass(frozen=True)
+class Playback:
+    """
+    Values of each run (``frames[kind]``, (n_frames, n_rows) float32) on the
+    rows of the first run: ``resmag`` per station, ``segment_ss`` and
+    ``segment_ds`` per segment, ``tde_ss`` and ``tde_ds`` per TDE triangle.
+    Rows a run lacks are 0.
+    """
+
+    names: tuple
+    folders: tuple
+    frames: dict
+    # Names the frames for the client buffers
+    key: str = field(default_factory=lambda: uuid4().hex)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.frames.values())
+
+    def subset(self, station_rows, segment_rows):
+        """Frames of the given station and segment rows, TDE frames are whole."""
+        rows = {"resmag": station_rows}
+        rows.update(segment_ss=segment_rows, segment_ds=segment_rows)
+        return replace(
+            self,
+            frames={
+                kind: values[:, rows[kind]] if kind in rows else values
+                for kind, values in self.frames.items()
+            },
+            key=uuid4().hex,
+        )
+
+    def payload(self, kind):
+        """Flat frame values of ``kind`` for fennil.js (FennilFrameLayer)."""
+        values = self.frames[kind]
+        return {
+            "key": f"{self.key}-{kind}",
+            "count": len(values),
+            "size": values.shape[1],
+            "values": np.round(values.astype(float), PLAYBACK_DECIMALS)
+            .ravel()
+            .tolist(),
+        }
+
+
+def run_values(folder):
+    """:class:`RunValues` of a run folder."""
+    from fennil.app.io import TDE_GEOMETRY_COLUMNS, TDE_RATE_COLUMNS, read_model_csv
+    from fennil.app.sources import run_source
+
+    source = run_source(folder)
+    summary = summarize_frames(
+        Path(folder).name,
+        folder,
+        read_model_csv(source, "model_station.csv"),
+        read_model_csv(source, "model_segment.csv"),
+    )
+    meshes = read_model_csv(source, "model_meshes.csv")
+    if meshes.empty or not {*TDE_GEOMETRY_COLUMNS, *TDE_RATE_COLUMNS}.issubset(
+        meshes.columns
+    ):
+        return RunValues(summary, None, None, None)
+    lon = meshes[["lon1", "lon2", "lon3"]].to_numpy(dtype=float)
+    # As the TDE mesh corners (see io.build_tde_data)
+    lon[lon < 0] += 360
+    return RunValues(
+        summary,
+        triangle_keys(
+            lon,
+            meshes[["lat1", "lat2", "lat3"]].to_numpy(dtype=float),
+            meshes[["dep1", "dep2", "dep3"]].to_numpy(dtype=float),
+        ),
+        meshes["strike_slip_rate"].to_numpy(dtype=np.float32),
+        meshes["dip_slip_rate"].to_numpy(dtype=np.float32),
+    )
+
+
+def aligned(rows, keys, values):
+    """
+    ``values`` (one per unique key of ``keys``) on the ``rows`` keys, 0 where
+    the run lacks the key.
+    """
+    axis = 0 if rows.ndim > 1 else None
+    _, inverse = np.unique(np.concatenate((rows, keys)), axis=axis, return_inverse=True)
+    inverse = inverse.ravel()
+    table = np.zeros(int(inverse.max()) + 1 if len(inverse) else 0, np.float32)
+    table[inverse[len(rows) :]] = values
+    return table[inverse[: len(rows)]]
+
+
+def base_frames(data, runs):
+    """Frames of ``runs`` (:class:`RunValues`) on the rows of the Dataset ``data``."""
+    station_rows = point_keys(data.station.lon, data.station.lat)
+    segment = data.segment
+    segment_rows = segment_keys(
+        segment.lon1, segment.lat1, segment.lon2, segment.lat2
+    ).reshape(-1, 2)
+    values = {
+        "resmag": [
+            aligned(station_rows, run.summary.station_keys, run.summary.resmag)
+            for run in runs
+        ],
+        "segment_ss": [
+            aligned(segment_rows, run.summary.segment_keys, run.summary.ss_rate)
+            for run in runs
+        ],
+        "segment_ds": [
+            aligned(segment_rows, run.summary.segment_keys, run.summary.ds_rate)
+            for run in runs
+        ],
+    }
+
+    mesh = data.tde_mesh
+    if mesh is not None and not mesh.empty:
+        keys = tde_triangle_keys(data)
+        for run in runs:
+            if run.tde_keys is None:
+                matched = np.zeros(len(mesh), dtype=bool)
+            else:
+                match = match_triangles(keys, run.tde_keys)
+                matched, source = match.matched, match.source
+            for kind in ("ss", "ds"):
+                frame = np.zeros(len(mesh), dtype=np.float32)
+                if matched.any():
+                    frame[matched] = getattr(run, f"tde_{kind}")[source[matched]]
+                values.setdefault(f"tde_{kind}", []).append(frame)
+    return {
+        kind: np.stack(frames).astype(np.float32, copy=False)
+        for kind, frames in values.items()
+    }
+
+
+def load_playback(folders, workers=None):
+    """
+    The first of ``folders`` as a Dataset whose ``playback`` holds the
+    frames of all of them, read in parallel unless ``workers`` is 1.
+    """
+    from fennil.app.io import load_folder_data
+
+    folders = list(folders)
+    if workers == 1 or len(folders) <= 1:
+        runs = [run_values(folder) for folder in folders]
+        data = load_folder_data(folders[0])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = executor.map(run_values, folders)
+            # The geometry of the first run is derived while the pool reads
+            data = load_folder_data(folders[0])
+            runs = list(pending)
+
+    playback = Playback(
+        names=tuple(run.summary.name for run in runs),
+        folders=tuple(str(folder) for folder in folders),
+        frames=base_frames(data, runs),
+    )
+    return replace(data, playback=playback)
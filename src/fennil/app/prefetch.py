@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from fennil.app.catalog import REQUIRED_RUN_FILES
+from fennil.app.profiling import PROFILER
+from fennil.app.sources import run_source
+
+PREFETCH_WORKERS = 2
+# Parsed datasets kept in memory, in bytes (estimated, see dataset_nbytes)
+PREFETCH_MEMORY_BYTES = 2 * 1024**3
+# Runs on each side of the highlighted one that are loaded as well
+PREFETCH_NEIGHBOURS = 1
+
+
+def dataset_nbytes(data):
+    """Approximate memory held by a loaded ``Dataset``."""
+    total = 0
+    values = list(vars(data).values())
+    if data.tde_mesh is not None:
+        values.extend(vars(data.tde_mesh).values())
+    for value in values:
+        if hasattr(value, "memory_usage"):
+            # DataFrame (per column) or Series (a single number)
+            usage = value.memory_usage(index=True, deep=True)
+            total += int(usage.sum() if hasattr(usage, "sum") else usage)
+        elif hasattr(value, "nbytes"):
+            total += int(value.nbytes)
+    return total
+
+
+def folder_signature(folder):
+    """
+    Resolved run path and model file versions, so rewritten runs are reloaded.
+    Runs inside archives are versioned by the archive file.
+    """
+    try:
+        return run_source(folder).signature(REQUIRED_RUN_FILES)
+    except OSError:
+        return str(folder), None
+
+
+class DatasetCache:
+    """LRU of loaded datasets bounded by their estimated size in bytes."""
+
+    def __init__(self, max_bytes=PREFETCH_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, data):
+        size = dataset_nbytes(data)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (data, size)
+            self.nbytes += size
+            # Keep the newest entry even when it alone exceeds the budget
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+
+class Prefetcher:
+    """
+    Load run folders in the background before they are opened.
+
+    :meth:`prefetch` is called with the folders the user is likely to open
+    next (the highlighted run and its neighbours); loads that did not start
+    yet for folders no longer in that list are cancelled. :meth:`load`
+    returns a prefetched dataset, waits for a prefetch in flight or loads the
+    folder itself.
+    """
+
+    def __init__(
+        self, loader=None, workers=PREFETCH_WORKERS, max_bytes=PREFETCH_MEMORY_BYTES
+    ):
+        self._loader = loader
+        self._workers = workers
+        self._executor = None
+        self._pending = {}  # signature -> Future
+        # Reentrant: cancelling a future runs its done callback in this thread
+        self._lock = threading.RLock()
+        self.cache = DatasetCache(max_bytes)
+
+    def prefetch(self, folders):
+        keys = [folder_signature(folder) for folder in folders]
+        with self._lock:
+            for key, future in list(self._pending.items()):
+                if key not in keys and future.cancel():
+                    PROFILER.count("prefetch_cancelled")
+            for folder, key in zip(folders, keys, strict=True):
+                if key[1] is None or key in self._pending or key in self.cache:
+                    continue
+                future = self._pool().submit(self._load, folder, key)
+                self._pending[key] = future
+                future.add_done_callback(lambda done, key=key: self._done(key, done))
+
+    def cancel(self):
+        self.prefetch([])
+
+    def load(self, folder):
+        key = folder_signature(folder)
+        data = self.cache.get(key)
+        if data is not None:
+            PROFILER.count("prefetch_hit")
+            return data
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                data = future.result()
+            except CancelledError:
+                pass
+            else:
+                PROFILER.count("prefetch_wait")
+                return data
+        PROFILER.count("prefetch_miss")
+        return self._load(folder, key)
+
+    def _load(self, folder, key):
+        loader = self._loader
+        if loader is None:
+            from fennil.app.io import load_folder_data  # pandas, imported on demand
+
+            loader = load_folder_data
+        data = loader(folder)
+        if key[1] is not None:
+            self.cache.put(key, data)
+        return data
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="fennil-prefetch"
+            )
+        return self._executor
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from fennil.app.cache import CACHE_STATS
+
+PROFILE_HISTORY = 50
+
+
+class Profiler:
+    """
+    Record per-stage timings of the render pipeline.
+
+    Every ``_update_layers`` call is wrapped in :meth:`update` and the
+    pipeline stages inside it in :meth:`stage`. When the profiler is
+    disabled both are no-ops so they can stay in the hot path.
+    """
+
+    def __init__(self, history=PROFILE_HISTORY):
+        self.enabled = False
+        self.updates = deque(maxlen=history)
+        self.counters = {}
+        self._current = None
+        self._next_id = 0
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def update(self, **args):
+        if not self.enabled:
+            yield None
+            return
+
+        record = {
+            "id": self._next_id,
+            "start": self._now(),
+            "duration": 0.0,
+            "tid": threading.get_ident(),
+            "args": args,
+            "stages": [],
+            "layer_fields": {},
+            "payload_bytes": 0,
+            "field_payload_bytes": {},
+        }
+        self._next_id += 1
+        self._current = record
+        try:
+            yield record
+        finally:
+            record["duration"] = self._now() - record["start"]
+            self._current = None
+            self.updates.append(record)
+
+    @contextmanager
+    def stage(self, name, **args):
+        record = self._current
+        if record is None:
+            yield
+            return
+
+        start = self._now()
+        try:
+            yield
+        finally:
+            record["stages"].append(
+                {
+                    "name": name,
+                    "start": start,
+                    "duration": self._now() - start,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def attribute_layers(self, field_name, layers):
+        """Remember which field produced which layer ids."""
+        record = self._current
+        if record is None:
+            return
+        for layer in layers:
+            record["layer_fields"][layer.id] = field_name
+
+    def record_payload(self, deck_data):
+        """Store the compact JSON size of the deck, split by producing field."""
+        record = self._current
+        if record is None:
+            return
+        per_field = record["field_payload_bytes"]
+        for layer in deck_data.get("layers", []):
+            field_name = record["layer_fields"].get(layer.get("id"), "other")
+            size = len(json.dumps(layer, separators=(",", ":")))
+            per_field[field_name] = per_field.get(field_name, 0) + size
+        record["payload_bytes"] = sum(per_field.values())
+
+    def clear(self):
+        self.updates.clear()
+        self.counters.clear()
+        CACHE_STATS.reset()
+
+    def report(self, last=10):
+        """Compact summary of the most recent updates for the UI panel."""
+        updates = []
+        for record in list(self.updates)[-last:][::-1]:
+            updates.append(
+                {
+                    "id": record["id"],
+                    "total_ms": round(record["duration"] * 1e3, 2),
+                    "payload_kb": round(record["payload_bytes"] / 1024, 1),
+                    "stages": [
+                        {
+                            "name": stage["name"],
+                            "label": _stage_label(stage),
+                            "ms": round(stage["duration"] * 1e3, 2),
+                        }
+                        for stage in sorted(
+                            record["stages"], key=lambda stage: stage["start"]
+                        )
+                    ],
+                    "fields_kb": {
+                        name: round(size / 1024, 1)
+                        for name, size in sorted(
+                            record["field_payload_bytes"].items(),
+                            key=lambda item: -item[1],
+                        )
+                    },
+                }
+            )
+        return {
+            "updates": updates,
+            "counters": dict(self.counters),
+            "cache": CACHE_STATS.summary(),
+        }
+
+    def to_json(self):
+        return {
+            "updates": list(self.updates),
+            "counters": dict(self.counters),
+            "cache": CACHE_STATS.summary(),
+        }
+
+    def to_chrome_trace(self):
+        """Chrome trace event format (chrome://tracing, Perfetto)."""
+        events = []
+        for record in self.updates:
+            events.append(
+                {
+                    "name": "update_layers",
+                    "cat": "update",
+                    "ph": "X",
+                    "ts": record["start"] * 1e6,
+                    "dur": record["duration"] * 1e6,
+                    "pid": 1,
+                    "tid": record["tid"],
+                    "args": {
+                        **record["args"],
+                        "id": record["id"],
+                        "payload_bytes": record["payload_bytes"],
+                    },
+                }
+            )
+            for stage in record["stages"]:
+                events.append(
+                    {
+                        "name": _stage_label(stage),
+                        "cat": stage["name"],
+                        "ph": "X",
+                        "ts": stage["start"] * 1e6,
+                        "dur": stage["duration"] * 1e6,
+                        "pid": 1,
+                        "tid": stage["tid"],
+                        "args": stage["args"],
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path, fmt="json"):
+        path = Path(path)
+        content = self.to_chrome_trace() if fmt == "trace" else self.to_json()
+        path.write_text(json.dumps(content, indent=1, default=str))
+        return path
+
+    def _now(self):
+        return time.perf_counter() - self._origin
+
+
+def _stage_label(stage):
+    args = stage["args"]
+    parts = [stage["name"]]
+    if "field" in args:
+        parts.append(str(args["field"]))
+    if "dataset" in args:
+        parts.append(str(args["dataset"]))
+    return " / ".join(parts)
+
+
+PROFILER = Profiler()
@@ -1,8 +1,56 @@
+import importlib
+import os
+import threading
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fennil.app.io import Dataset
+from fennil.app.profiling import PROFILER
+
+if TYPE_CHECKING:
+    from fennil.app.io import Dataset
+
+# Threads building fields concurrently; 1 builds them one after the other
+FIELD_BUILD_WORKERS = min(8, os.cpu_count() or 1)
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor():
+    global _EXECUTOR  # noqa: PLW0603
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=FIELD_BUILD_WORKERS, thread_name_prefix="fennil-field"
+            )
+        return _EXECUTOR
+
+
+def _run_all(ctx, calls):
+    """
+    Run ``calls`` on the field pool and wait for them in order, so the first
+    failure (or cancellation) in list order is the one raised. Calls not yet
+    started are dropped once one fails.
+    """
+
+    def _checked(call):
+        ctx.raise_if_cancelled()
+        call()
+
+    if FIELD_BUILD_WORKERS <= 1 or len(calls) <= 1:
+        for call in calls:
+            _checked(call)
+        return
+
+    futures = [_executor().submit(_checked, call) for call in calls]
+    try:
+        for future in futures:
+            future.result()
+    finally:
+        for future in futures:
+            future.cancel()
 
 
 @dataclass(frozen=True)
@@ -28,10 +76,25 @@ class FieldSpec:
 
 
 class LayerContext:
-    def __init__(self, specs, datasets, velocity_scale):
+    def __init__(
+        self,
+        specs,
+        datasets,
+        velocity_scale,
+        client_layers=True,
+        view_3d=False,
+        cancel_token=None,
+    ):
         self.specs = specs
         self.datasets = datasets
         self.velocity_scale = velocity_scale
+        # The browser runs fennil.js: TDE meshes ship indexed and fault
+        # segments as chained paths, both turned into deck.gl layers client side
+        self.client_layers = client_layers
+        # Draw TDE meshes at their true depth (needs the client layers)
+        self.view_3d = view_3d and client_layers
+        # Set by the render scheduler, checked between field builders
+        self.cancel_token = cancel_token
         self.tde_layers = []
         self.layers = []
         self.vector_layers = []
@@ -44,15 +107,29 @@ class LayerContext:
     def all_layers(self):
         return self.tde_layers + self.layers + self.vector_layers
 
+    def fork(self):
+        """Context with the same inputs and empty layer lists."""
+        return LayerContext(
+            self.specs,
+            self.datasets,
+            self.velocity_scale,
+            client_layers=self.client_layers,
+            view_3d=self.view_3d,
+            cancel_token=self.cancel_token,
+        )
+
+    def raise_if_cancelled(self):
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
     def skip(self, name):
         return all(not (ds.enabled and ds.fields.get(name)) for ds in self.datasets)
 
     def enabled_datasets(self, name):
-        return (
-            (i, ds)
-            for i, ds in enumerate(self.datasets)
-            if ds.enabled and ds.fields.get(name) and name in ds.available_fields
-        )
+        for i, ds in enumerate(self.datasets):
+            if ds.enabled and ds.fields.get(name) and name in ds.available_fields:
+                with PROFILER.stage("dataset", field=name, dataset=ds.name):
+                    yield i, ds
 
 
 class FieldRegistry:
@@ -60,11 +137,49 @@ class FieldRegistry:
         self._specs: dict[str, FieldSpec] = {}
         self._builders: dict[str, Callable[[str, LayerContext], None]] = {}
         self._can_render: dict[str, Callable[[Dataset], bool]] = {}
-
-    def register(self, field_name: str, spec: FieldSpec, builder, can_render):
+        # Functions of the loaded data a field reads; computed ahead of the builders
+        self._derived: dict[str, tuple] = {}
+        self._modules: dict[str, str] = {}
+        # Builders resolve from the render thread and from the event loop
+        self._resolve_lock = threading.Lock()
+
+    def register(
+        self, field_name: str, spec: FieldSpec, builder, can_render, derived=()
+    ):
         self._specs[field_name] = spec
         self._builders[field_name] = builder
         self._can_render[field_name] = can_render
+        self._derived[field_name] = tuple(derived)
+
+    def register_lazy(self, field_name: str, spec: FieldSpec, module: str):
+        """Register a field whose builder is imported from ``module`` on first use."""
+        self._specs[field_name] = spec
+        self._modules[field_name] = module
+        self._builders.pop(field_name, None)
+        self._can_render.pop(field_name, None)
+        self._derived.pop(field_name, None)
+
+    def _resolve(self, field_name: str):
+        if field_name not in self._modules:
+            return
+        with self._resolve_lock:
+            module_name = self._modules.get(field_name)
+            if module_name is None:
+                return
+            with PROFILER.stage("import", field=field_name):
+                module = importlib.import_module(module_name)
+            self._builders[field_name] = module.builder
+            self._can_render[field_name] = module.can_render
+            self._derived[field_name] = tuple(getattr(module, "DERIVED", ()))
+            del self._modules[field_name]
+
+    def builder(self, field_name: str):
+        self._resolve(field_name)
+        return self._builders.get(field_name)
+
+    def can_render(self, field_name: str, dataset) -> bool:
+        self._resolve(field_name)
+        return self._can_render[field_name](dataset)
 
     def field_defaults(self):
         return {name: spec.default for name, spec in self._specs.items()}
@@ -73,18 +188,63 @@ class FieldRegistry:
         name_priority = [
             (name, spec.priority)
             for name, spec in self._specs.items()
-            if self._can_render[name](dataset)
+            if self.can_render(name, dataset)
         ]
         return [name for name, _ in sorted(name_priority, key=lambda tup: tup[1])]
 
     def export_specs(self):
         return {name: spec.to_dict() for name, spec in self._specs.items()}
 
+    def derived_jobs(self, ctx: LayerContext, names):
+        """Unique ``(function, data)`` pairs declared by the enabled ``names``."""
+        jobs = {}
+        for name in names:
+            for func in self._derived.get(name, ()):
+                for ds in ctx.datasets:
+                    if (
+                        ds.enabled
+                        and ds.fields.get(name)
+                        and name in ds.available_fields
+                    ):
+                        jobs.setdefault((func, id(ds.data)), (func, ds.data))
+        return list(jobs.values())
+
     def build_layers(self, ctx: LayerContext):
+        """
+        Run the field builders concurrently, each on a fork of ``ctx``.
+
+        The derived data the fields declare is computed first, once per
+        dataset, so builders sharing it do not race to compute it. Layers are
+        then merged back in field order, the same order as a sequential build.
+        """
+        builders = []
         for name in ctx.field_names:
-            builder = self._builders.get(name)
-            if builder is None:
-                continue
+            builder = self.builder(name)
+            if builder is not None:
+                builders.append((name, builder, ctx.fork()))
+
+        derived = self.derived_jobs(ctx, [name for name, _, _ in builders])
+        with PROFILER.stage("derived"):
+            _run_all(ctx, [lambda f=func, d=data: f(d) for func, data in derived])
+
+        _run_all(
+            ctx,
+            [
+                lambda n=name, b=builder, c=child: self._build_field(n, b, c)
+                for name, builder, child in builders
+            ],
+        )
+
+        for name, _, child in builders:
+            ctx.tde_layers.extend(child.tde_layers)
+            ctx.layers.extend(child.layers)
+            ctx.vector_layers.extend(child.vector_layers)
+            if PROFILER.enabled:
+                PROFILER.attribute_layers(name, child.all_layers)
+
+    @staticmethod
+    def _build_field(name, builder, ctx):
+        with PROFILER.stage("field", field=name):
             builder(name, ctx)
 
 
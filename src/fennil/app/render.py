@@ -0,0 +1,206 @@
+"""Headless batch export of map snapshots (``fennil render``)."""
+
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.deck import TOOLTIP, build_deck, mapbox
+from fennil.app.io import (
+    is_valid_data_folder,
+    load_folder_data,
+    load_meshes,
+    mesh_digest,
+)
+from fennil.app.registry import FIELD_REGISTRY, LayerContext
+from fennil.app.state import DatasetSnapshot, StaticMapSettings
+from fennil.app.viz import load_all_viz
+from fennil.app.viz.fault_lines import build_fault_lines
+
+# Parsed meshes and TDE geometry shared by the runs rendered in one process,
+# seeded by the parent with the meshes several runs share (see shared_meshes).
+_MESH_CACHE = {}
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    folder: Path
+    output: Path
+    fields: dict = field(default_factory=dict)
+    views: tuple = (None,)
+    velocity_scale: float = 1.0
+    fmt: str = "html"
+    offline: bool = True
+
+
+def parse_fields(values):
+    """``["obs", "tde=ss"]`` -> ``{"obs": True, "tde": "ss"}``"""
+    fields = {}
+    for value in values:
+        name, _, option = value.partition("=")
+        fields[name] = option or True
+    return fields
+
+
+def parse_view(value):
+    """``"lat,lon,zoom[,pitch,bearing]"`` or ``"auto"`` (fit to stations)."""
+    if value == "auto":
+        return None
+    numbers = [float(item) for item in value.split(",")]
+    if not 3 <= len(numbers) <= 5:
+        msg = f"Invalid view '{value}', expected lat,lon,zoom[,pitch,bearing]"
+        raise argparse.ArgumentTypeError(msg)
+    keys = ("latitude", "longitude", "zoom", "pitch", "bearing")
+    return StaticMapSettings(**dict(zip(keys, numbers, strict=False)))
+
+
+def fit_view(data):
+    """View centered on the stations, zoomed to their extent."""
+    lon = data.station.lon.to_numpy()
+    lat = data.station.lat.to_numpy()
+    span = max(np.ptp(lon), np.ptp(lat), 1e-3)
+    return StaticMapSettings(
+        latitude=float(np.mean(lat)),
+        longitude=float(np.mean(lon)),
+        zoom=float(np.clip(np.log2(360.0 / span), 0, 20)),
+    )
+
+
+def build_snapshot_layers(folder, data, fields, velocity_scale):
+    ctx = LayerContext(
+        specs=FIELD_REGISTRY.export_specs(),
+        datasets=[DatasetSnapshot.from_data(folder, data, fields), DatasetSnapshot()],
+        velocity_scale=velocity_scale,
+        client_layers=False,
+    )
+    build_fault_lines(ctx)
+    FIELD_REGISTRY.build_layers(ctx)
+    return ctx.all_layers
+
+
+def render_job(job, mesh_cache=None):
+    data = load_folder_data(job.folder, mesh_cache=mesh_cache)
+    layers = build_snapshot_layers(job.folder, data, job.fields, job.velocity_scale)
+    api_keys = {"mapbox": mapbox.TOKEN} if mapbox.HAS_MAPBOX_TOKEN else None
+
+    outputs = []
+    for idx, view in enumerate(job.views):
+        deck = build_deck(
+            layers,
+            view or fit_view(data),
+            tooltip=TOOLTIP,
+            api_keys=api_keys,
+        )
+        suffix = f"_{idx}" if len(job.views) > 1 else ""
+        extension = "json" if job.fmt == "json" else "html"
+        path = job.output / f"{Path(job.folder).name}{suffix}.{extension}"
+        if job.fmt == "json":
+            path.write_text(deck.to_json())
+        else:
+            deck.to_html(
+                str(path),
+                open_browser=False,
+                notebook_display=False,
+                offline=job.offline,
+            )
+        outputs.append(path)
+    return outputs
+
+
+def render_one(job):
+    """Render a job, reusing the TDE geometry of the runs sharing its mesh file."""
+    if not FIELD_REGISTRY.export_specs():
+        load_all_viz()
+    return render_job(job, _MESH_CACHE)
+
+
+def shared_meshes(jobs):
+    """Meshes parsed once, by digest, for the mesh files several jobs share."""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(mesh_digest(job.folder), []).append(job)
+    return {
+        digest: load_meshes(group[0].folder)
+        for digest, group in groups.items()
+        if len(group) > 1
+    }
+
+
+def init_worker(mesh_cache):
+    _MESH_CACHE.update(mesh_cache)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="fennil render",
+        description="Write standalone HTML (or deck JSON) snapshots of run folders.",
+    )
+    parser.add_argument("folders", nargs="+", type=Path, help="Run folders")
+    parser.add_argument(
+        "--fields",
+        nargs="*",
+        default=[],
+        help="Fields to enable, e.g. obs mod slip=ss tde=ds",
+    )
+    parser.add_argument(
+        "--view",
+        dest="views",
+        action="append",
+        type=parse_view,
+        help="lat,lon,zoom[,pitch,bearing] or auto; repeat for several views",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="Velocity scale")
+    parser.add_argument(
+        "--format", dest="fmt", choices=["html", "json"], default="html"
+    )
+    parser.add_argument("--output", type=Path, default=Path())
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--cdn",
+        action="store_true",
+        help="Load deck.gl from a CDN instead of embedding it in every HTML file",
+    )
+    args = parser.parse_args(argv)
+
+    load_all_viz()
+    fields = parse_fields(args.fields)
+    unknown = set(fields) - set(FIELD_REGISTRY.field_defaults())
+    if unknown:
+        parser.error(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for folder in args.folders:
+        if not is_valid_data_folder(folder):
+            sys.stderr.write(f"skipping {folder}: missing model_*.csv files\n")
+            continue
+        jobs.append(
+            RenderJob(
+                folder=folder,
+                output=args.output,
+                fields=fields,
+                views=tuple(args.views or [None]),
+                velocity_scale=args.scale,
+                fmt=args.fmt,
+                offline=not args.cdn,
+            )
+        )
+
+    if args.workers == 1 or len(jobs) <= 1:
+        results = [render_one(job) for job in jobs]
+    else:
+        # One task per run, the shared meshes are parsed here once and handed
+        # to every worker instead of serializing their runs in one task
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=init_worker,
+            initargs=(shared_meshes(jobs),),
+        ) as executor:
+            results = list(executor.map(render_one, jobs))
+
+    for path in (path for paths in results for path in paths):
+        sys.stdout.write(f"{path}\n")
+    return 0 if jobs else 1
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+
+from fennil.app.profiling import PROFILER
+
+# Quiet period before a requested render starts, in seconds
+RENDER_DEBOUNCE = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class BuildCancelled(Exception):
+    """Raised inside a render that a newer request has superseded."""
+
+
+class CancelToken:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise BuildCancelled
+
+
+class RenderScheduler:
+    """
+    Debounce, coalesce and cancel layer rebuilds.
+
+    ``request()`` can be called for every UI change; once no request arrived
+    for ``delay`` seconds, ``render(token)`` (a coroutine function) runs for
+    the latest state (right away when no event loop runs, e.g. in scripts).
+    A request made while a render is in flight cancels its token, the render
+    stops at its next checkpoint by raising :class:`BuildCancelled`, and the
+    newest state is rendered after it, so stale results are never pushed and
+    at most one render runs at a time. A render that fails is logged and the
+    next request is served as usual.
+    """
+
+    def __init__(self, render, delay=RENDER_DEBOUNCE):
+        self._render = render
+        self.delay = delay
+        self._generation = 0
+        self._timer = None
+        self._task = None
+        self._token = None
+        self.stats = {"requested": 0, "rendered": 0, "coalesced": 0, "cancelled": 0}
+
+    @property
+    def busy(self):
+        return self._timer is not None or (
+            self._task is not None and not self._task.done()
+        )
+
+    def request(self):
+        self._generation += 1
+        self._count("requested")
+        if self._timer is not None:
+            # Merged into the render that is already waiting
+            self._timer.cancel()
+            self._count("coalesced")
+        if self._token is not None:
+            self._token.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of the server: nothing to debounce, render now
+            self._timer = None
+            asyncio.run(self._run())
+            return
+        self._timer = loop.call_later(self.delay, self._start)
+
+    async def wait(self):
+        """Return once every request made so far has been rendered."""
+        while self.busy:
+            if self._task is not None and not self._task.done():
+                await asyncio.shield(self._task)
+            else:
+                await asyncio.sleep(self.delay)
+
+    def _start(self):
+        self._timer = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        # Otherwise the running task renders the new state once it stops
+
+    async def _run(self):
+        rendered = None
+        while rendered != self._generation and self._timer is None:
+            generation = self._generation
+            self._token = token = CancelToken()
+            try:
+                await self._render(token)
+            except BuildCancelled:
+                self._count("cancelled")
+                continue
+            except Exception:
+                # Keep serving later requests, this state is not retried
+                logger.exception("Layer render failed")
+                rendered = generation
+                continue
+            finally:
+                self._token = None
+            rendered = generation
+            self._count("rendered")
+
+    def _count(self, name):
+        self.stats[name] += 1
+        PROFILER.count(f"render_{name}")
@@ -0,0 +1,211 @@
+"""
+Where the model files of a run are read from.
+
+A run is a folder, or a folder inside a ``.zip``/``.tar[.gz|.bz2|.xz]``
+archive addressed as ``sweep.tar.gz/0000000343``. Each csv file may also be
+stored compressed on its own (``model_station.csv.gz``, ``.csv.zst``).
+"""
+
+import io
+import tarfile
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+
+# Per-file compression suffixes, as named by pandas.read_csv
+COMPRESSION = {".gz": "gzip", ".zst": "zstd", ".bz2": "bz2", ".xz": "xz"}
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# Member listings of the archives seen so far, by (path, mtime, size)
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def is_archive(path):
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_compression(name):
+    """``"model_station.csv.gz"`` -> ``("model_station.csv", "gzip")``"""
+    for suffix, compression in COMPRESSION.items():
+        if name.endswith(suffix):
+            return name[: -len(suffix)], compression
+    return name, None
+
+
+def stored_names(name):
+    """File names ``name`` may be stored under, plain first."""
+    return [name, *(name + suffix for suffix in COMPRESSION)]
+
+
+def archive_index(archive):
+    """``{member name: size}`` of the files in ``archive``, cached per version."""
+    archive = Path(archive).resolve()
+    stat = archive.stat()
+    key = (str(archive), stat.st_mtime_ns, stat.st_size)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+    if index is not None:
+        return index
+
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            index = {
+                info.filename: info.file_size
+                for info in zf.infolist()
+                if not info.is_dir()
+            }
+    else:
+        # Streaming mode: compressed tars are read once, front to back
+        with tarfile.open(archive, "r|*") as tar:
+            index = {
+                _member_name(member): member.size for member in tar if member.isfile()
+            }
+    with _INDEXES_LOCK:
+        _INDEXES[key] = index
+    return index
+
+
+def archive_runs(archive):
+    """``{run folder: {file name: size}}`` of the folders inside ``archive``."""
+    runs = {}
+    for member, size in archive_index(archive).items():
+        path = PurePosixPath(member)
+        folder = "" if path.parent == PurePosixPath() else str(path.parent)
+        runs.setdefault(folder, {})[path.name] = size
+    return runs
+
+
+def _member_name(member):
+    name = member.name
+    return name.removeprefix("./")
+
+
+class FolderSource:
+    def __init__(self, folder):
+        self.folder = Path(folder)
+
+    def __str__(self):
+        return str(self.folder)
+
+    def find(self, name):
+        """Stored file name of ``name`` (maybe compressed), None if missing."""
+        for stored in stored_names(name):
+            if (self.folder / stored).is_file():
+                return stored
+        return None
+
+    def signature(self, names):
+        """Identity and version of the ``names`` files, None if one is missing."""
+        versions = []
+        for name in names:
+            stored = self.find(name)
+            if stored is None:
+                return str(self.folder.resolve()), None
+            stat = (self.folder / stored).stat()
+            versions.append((stored, stat.st_mtime_ns, stat.st_size))
+        return str(self.folder.resolve()), tuple(versions)
+
+    def open(self, name):
+        """Binary file object of the stored (not decompressed) bytes."""
+        stored = self._stored(name)
+        return (self.folder / stored).open("rb")
+
+    def csv_input(self, name):
+        """``(path or buffer, compression)`` arguments for ``pandas.read_csv``."""
+        return self.folder / self._stored(name), "infer"
+
+    def _stored(self, name):
+        stored = self.find(name)
+        if stored is None:
+            raise FileNotFoundError(self.folder / name)
+        return stored
+
+
+class ArchiveSource:
+    """
+    Run folder ``prefix`` inside ``archive``.
+
+    Members are read without extracting the archive. Zip members are read
+    directly; tar archives are streamed once for all the requested members.
+    Read members are kept, so parsing a file after hashing it does not
+    decompress it again.
+    """
+
+    def __init__(self, archive, prefix=""):
+        self.archive = Path(archive)
+        self.prefix = prefix.strip("/")
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return str(self.archive / self.prefix)
+
+    def _member(self, stored):
+        return f"{self.prefix}/{stored}" if self.prefix else stored
+
+    def find(self, name):
+        index = archive_index(self.archive)
+        for stored in stored_names(name):
+            if self._member(stored) in index:
+                return stored
+        return None
+
+    def signature(self, names):
+        stat = self.archive.stat()
+        identity = f"{self.archive.resolve()}/{self.prefix}"
+        if any(self.find(name) is None for name in names):
+            return identity, None
+        return identity, ((stat.st_mtime_ns, stat.st_size),)
+
+    def read(self, names):
+        """``{name: stored bytes}`` of ``names``, reading the archive at most once."""
+        stored = {}
+        for name in names:
+            found = self.find(name)
+            if found is None:
+                raise FileNotFoundError(self.archive / self._member(name))
+            stored[name] = self._member(found)
+
+        with self._lock:
+            missing = set(stored.values()) - set(self._members)
+            if missing:
+                self._members.update(self._read_members(missing))
+            return {name: self._members[member] for name, member in stored.items()}
+
+    def _read_members(self, members):
+        if zipfile.is_zipfile(self.archive):
+            with zipfile.ZipFile(self.archive) as zf:
+                return {member: zf.read(member) for member in members}
+
+        found = {}
+        with tarfile.open(self.archive, "r|*") as tar:
+            for member in tar:
+                name = _member_name(member)
+                if name in members:
+                    found[name] = tar.extractfile(member).read()
+                    if len(found) == len(members):
+                        break
+        return found
+
+    def open(self, name):
+        return io.BytesIO(self.read([name])[name])
+
+    def csv_input(self, name):
+        data = self.read([name])[name]
+        _, compression = split_compression(self.find(name))
+        return io.BytesIO(data), compression
+
+
+def run_source(path):
+    """FolderSource or ArchiveSource for a run path."""
+    if isinstance(path, FolderSource | ArchiveSource):
+        return path
+    path = Path(path)
+    if path.is_dir():
+        return FolderSource(path)
+    for parent in (path, *path.parents):
+        if is_archive(parent.name) and parent.is_file():
+            prefix = "" if parent == path else path.relative_to(parent).as_posix()
+            return ArchiveSource(parent, prefix)
+    return FolderSource(path)
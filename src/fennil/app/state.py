@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from trame_dataclass.core import StateDataModel
@@ -19,6 +20,39 @@ class MapSettings(StateDataModel):
     zoom: float = DEFAULT_VIEW_STATE["zoom"]
     pitch: float = DEFAULT_VIEW_STATE["pitch"]
     bearing: float = DEFAULT_VIEW_STATE["bearing"]
+    # TDE meshes at their true depth, exaggeration is applied client side
+    view_3d: bool = False
+    vertical_exaggeration: float = 10
+
+
+class FilterSettings(StateDataModel):
+    # Data range of each filter over the loaded datasets (see viz.filters)
+    bounds: dict[str, list[float]]
+    # Range kept by each filter that is set, applied on the client only
+    ranges: dict[str, list[float]]
+
+
+class ColormapSettings(StateDataModel):
+    # Value range of each colormap (see viz.styles.COLORMAPS), applied on the
+    # client only
+    ranges: dict[str, list[float]]
+
+
+class BlockSettings(StateDataModel):
+    # Selector entries (value: block label, title, subtitle with statistics)
+    items: list[dict[str, str]]
+    # Labels of the isolated blocks, every block is drawn when empty
+    selected: list[str]
+
+
+class PlaybackSettings(StateDataModel):
+    # Run of each frame of the played dataset, empty when nothing is played
+    names: list[str]
+    # Frame drawn, the layers are recolored for it on the client
+    frame: int = 0
+    playing: bool = False
+    # Milliseconds between frames while playing
+    interval: int = 500
 
 
 class DatasetVisualization(StateDataModel):
@@ -26,10 +60,14 @@ class DatasetVisualization(StateDataModel):
     name: str
     fields: dict[str, bool | str | None]
     available_fields: list[str]
+    # Re-read the run folder when celeri rewrites its model files
+    live: bool = False
 
     def attach_data(self, directory_path, data):
         self._data = data
+        self._path = Path(directory_path)
         self.name = ""
+        self.live = False
         self.enabled = bool(data)
         if data:
             self.name = Path(directory_path).stem.lstrip("0")
@@ -40,14 +78,83 @@ class DatasetVisualization(StateDataModel):
     def data(self):
         return getattr(self, "_data", None)
 
+    @property
+    def path(self):
+        return getattr(self, "_path", None)
+
+    def update_data(self, data):
+        """Swap in a reloaded Dataset of the same run, keeping the field choices."""
+        self._data = data
+        self.available_fields = FIELD_REGISTRY.available_fields(data)
+
     def clear(self):
         self.enabled = False
+        self.live = False
         self.fields = {}
         self.available_fields = []
 
     def adopt(self, other):
         self._data = other.data
+        self._path = other.path
         self.name = other.name
+        self.live = other.live
         self.enabled = other.enabled
         self.fields = dict(other.fields)
         self.available_fields = list(other.available_fields)
+
+
+@dataclass
+class StaticMapSettings:
+    """Plain counterpart of MapSettings for rendering without a trame server."""
+
+    latitude: float = DEFAULT_VIEW_STATE["latitude"]
+    longitude: float = DEFAULT_VIEW_STATE["longitude"]
+    zoom: float = DEFAULT_VIEW_STATE["zoom"]
+    pitch: float = DEFAULT_VIEW_STATE["pitch"]
+    bearing: float = DEFAULT_VIEW_STATE["bearing"]
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            latitude=settings.latitude,
+            longitude=settings.longitude,
+            zoom=settings.zoom,
+            pitch=settings.pitch,
+            bearing=settings.bearing,
+        )
+
+
+@dataclass
+class DatasetSnapshot:
+    """Plain counterpart of DatasetVisualization for headless layer builds."""
+
+    data: object = None
+    name: str = ""
+    enabled: bool = False
+    fields: dict = field(default_factory=dict)
+    available_fields: list = field(default_factory=list)
+
+    @classmethod
+    def from_data(cls, directory_path, data, fields=None):
+        if not data:
+            return cls()
+        return cls(
+            data=data,
+            name=Path(directory_path).stem.lstrip("0"),
+            enabled=True,
+            fields={**FIELD_REGISTRY.field_defaults(), **(fields or {})},
+            available_fields=FIELD_REGISTRY.available_fields(data),
+        )
+
+    @classmethod
+    def from_visualization(cls, viz):
+        """Copy of a DatasetVisualization that layer builds can read off-thread."""
+        if not viz.enabled:
+            return cls()
+        return cls(
+            data=viz.data,
+            name=viz.name,
+            enabled=True,
+            fields=dict(viz.fields),
+            available_fields=list(viz.available_fields),
+        )
@@ -0,0 +1,302 @@
+"""
+Pairwise comparison of the runs of a parameter sweep (``fennil sweep``).
+
+Each run is reduced on a process pool to what the comparisons need: its
+station keys (quantized lon/lat) with the residual magnitudes, and its
+segment keys (quantized unordered endpoints, as the slip comparison) with the
+strike and dip slip rates. The keys of all runs are then indexed once, so
+every run becomes a row of one (n_runs, n_keys) array, NaN where it lacks a
+station or segment, and each metric is computed for all the pairs at once
+from these aligned rows.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.viz.styles import RES_MAG_PALETTE, SLIP_COMPARE_MATCH_TOL_DEG
+
+# name -> (label, unit), every metric is symmetric
+SWEEP_METRICS = {
+    "res_rms": ("RMS residual difference", "mm/yr"),
+    "ss_rms": ("RMS strike slip difference", "mm/yr"),
+    "ds_rms": ("RMS dip slip difference", "mm/yr"),
+    "station_coverage": ("Shared stations", "fraction"),
+    "segment_coverage": ("Shared segments", "fraction"),
+}
+# Coverages are fractions of the stations (segments) of either run
+SWEEP_COVERAGE_METRICS = ("station_coverage", "segment_coverage")
+SWEEP_DECIMALS = 3
+# Offsets making quantized coordinates positive before packing them
+_LON_OFFSET = 2**31
+_LAT_OFFSET = 2**30
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    """Station and segment keys of a run and the values compared on them."""
+
+    name: str
+    folder: str
+    station_keys: np.ndarray  # (n_stations,) int64, unique
+    resmag: np.ndarray  # (n_stations,)
+    segment_keys: np.ndarray  # (n_segments, 2) int64 sorted endpoint keys, unique
+    ss_rate: np.ndarray  # (n_segments,)
+    ds_rate: np.ndarray  # (n_segments,)
+
+
+@dataclass(frozen=True)
+class SweepMatrix:
+    """Metrics of every pair of runs, as (n_runs, n_runs) arrays."""
+
+    names: tuple
+    folders: tuple
+    metrics: dict
+    shared_stations: np.ndarray  # (n_runs, n_runs) int
+    shared_segments: np.ndarray  # (n_runs, n_runs) int
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_dict(self):
+        """JSON-ready content, metrics of pairs sharing nothing are None."""
+        return {
+            "names": list(self.names),
+            "folders": list(self.folders),
+            "metrics": {
+                name: np.where(
+                    np.isfinite(values), np.round(values, SWEEP_DECIMALS), None
+                ).tolist()
+                for name, values in self.metrics.items()
+            },
+            "shared_stations": self.shared_stations.tolist(),
+            "shared_segments": self.shared_segments.tolist(),
+        }
+
+    def cell_colors(self, metric):
+        """
+        CSS color of each cell, through the residual magnitude palette: the
+        more the two runs differ (the less they share), the redder.
+        """
+        values = self.metrics[metric]
+        if metric in SWEEP_COVERAGE_METRICS:
+            values = 1.0 - values
+        finite = np.isfinite(values)
+        high = values[finite].max() if finite.any() else 0.0
+        position = np.where(finite, values, 0.0) / (high if high > 0 else 1.0)
+        index = np.clip(
+            np.floor(position * len(RES_MAG_PALETTE)).astype(int),
+            0,
+            len(RES_MAG_PALETTE) - 1,
+        )
+        colors = np.array(
+            [f"rgb({r}, {g}, {b})" for r, g, b, _ in RES_MAG_PALETTE], dtype=object
+        )[index]
+        colors[~finite] = "transparent"
+        return colors.tolist()
+
+
+def quantized(values):
+    return np.rint(np.asarray(values, dtype=float) / SLIP_COMPARE_MATCH_TOL_DEG)
+
+
+def point_keys(lon, lat):
+    """int64 key of each lon/lat point, equal for points within the tolerance."""
+    lon_q = quantized(lon).astype(np.int64) + _LON_OFFSET
+    lat_q = quantized(lat).astype(np.int64) + _LAT_OFFSET
+    return (lon_q << 32) | lat_q
+
+
+def segment_keys(lon1, lat1, lon2, lat2):
+    """(n_segments, 2) endpoint keys, in the same order whatever the direction."""
+    return np.sort(
+        np.column_stack((point_keys(lon1, lat1), point_keys(lon2, lat2))), axis=1
+    )
+
+
+def _unique_mean(keys, *values):
+    """Unique ``keys`` and the mean of each of ``values`` over duplicate keys."""
+    unique, inverse, counts = np.unique(
+        keys, axis=0 if keys.ndim > 1 else None, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    means = [
+        np.bincount(inverse, weights=value, minlength=len(unique)) / counts
+        for value in values
+    ]
+    return unique, *means
+
+
+def summarize_frames(name, folder, station, segment):
+    """:class:`RunSummary` of the station and segment tables of a run."""
+    resmag = np.hypot(
+        station.model_east_vel_residual.to_numpy(dtype=float),
+        station.model_north_vel_residual.to_numpy(dtype=float),
+    )
+    lon = station.lon.to_numpy(dtype=float)
+    lat = station.lat.to_numpy(dtype=float)
+    keep = np.isfinite(lon) & np.isfinite(lat) & np.isfinite(resmag)
+    station_keys, resmag = _unique_mean(point_keys(lon[keep], lat[keep]), resmag[keep])
+
+    ends = [
+        segment[column].to_numpy(dtype=float)
+        for column in ("lon1", "lat1", "lon2", "lat2")
+    ]
+    ss = segment.model_strike_slip_rate.to_numpy(dtype=float)
+    # Dip slip as the slip comparison draws it
+    ds = segment.model_dip_slip_rate.to_numpy(
+        dtype=float
+    ) - segment.model_tensile_slip_rate.to_numpy(dtype=float)
+    keep = np.all(np.isfinite(np.column_stack((*ends, ss, ds))), axis=1)
+    seg_keys, ss, ds = _unique_mean(
+        segment_keys(*(end[keep] for end in ends)), ss[keep], ds[keep]
+    )
+    return RunSummary(
+        name=name,
+        folder=str(folder),
+        station_keys=station_keys,
+        resmag=resmag,
+        segment_keys=seg_keys.reshape(-1, 2),
+        ss_rate=ss,
+        ds_rate=ds,
+    )
+
+
+def summarize_run(folder):
+    """:class:`RunSummary` of a run folder, read without its meshes."""
+    from fennil.app.io import read_model_csv
+    from fennil.app.sources import run_source
+
+    source = run_source(folder)
+    return summarize_frames(
+        Path(folder).name,
+        folder,
+        read_model_csv(source, "model_station.csv"),
+        read_model_csv(source, "model_segment.csv"),
+    )
+
+
+def summarize_runs(folders, workers=None):
+    """Summaries of ``folders``, read in parallel unless ``workers`` is 1."""
+    folders = list(folders)
+    if workers == 1 or len(folders) <= 1:
+        return [summarize_run(folder) for folder in folders]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(summarize_run, folders))
+
+
+def aligned_values(keys, values):
+    """
+    Index the ``keys`` of all runs once and place each run's ``values`` in
+    the columns of its keys: returns ``(n_runs, n_keys)`` values (NaN where a
+    run lacks the key) and the presence mask.
+    """
+    counts = [len(run_keys) for run_keys in keys]
+    stacked = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+    _, columns = np.unique(
+        stacked, axis=0 if stacked.ndim > 1 else None, return_inverse=True
+    )
+    columns = columns.ravel()
+    rows = np.repeat(np.arange(len(keys)), counts)
+    n_keys = int(columns.max()) + 1 if len(columns) else 0
+    present = np.zeros((len(keys), n_keys), dtype=bool)
+    present[rows, columns] = True
+    aligned = []
+    for run_values in values:
+        table = np.full((len(keys), n_keys), np.nan)
+        table[rows, columns] = np.concatenate(run_values) if run_values else []
+        aligned.append(table)
+    return aligned, present
+
+
+def pairwise_rms(values, present):
+    """(n_runs, n_runs) RMS difference of ``values`` on the keys both runs have."""
+    result = np.full((len(values), len(values)), np.nan)
+    filled = np.where(present, values, 0.0)
+    for i in range(len(values)):
+        shared = present & present[i]
+        count = shared.sum(axis=1)
+        squares = np.where(shared, (filled - filled[i]) ** 2, 0.0).sum(axis=1)
+        result[i, count > 0] = np.sqrt(squares[count > 0] / count[count > 0])
+    return result
+
+
+def pairwise_shared(present):
+    """Keys shared by each pair of runs, and their fraction of either run's keys."""
+    counts = present.astype(np.int64)
+    shared = counts @ counts.T
+    totals = counts.sum(axis=1)
+    union = totals[:, None] + totals[None, :] - shared
+    coverage = np.where(union > 0, shared / np.maximum(union, 1), np.nan)
+    return shared, coverage
+
+
+def sweep_matrix(summaries):
+    """:class:`SweepMatrix` of the runs of ``summaries``."""
+    (resmag,), stations = aligned_values(
+        [run.station_keys for run in summaries], [[run.resmag for run in summaries]]
+    )
+    (ss, ds), segments = aligned_values(
+        [run.segment_keys for run in summaries],
+        [[run.ss_rate for run in summaries], [run.ds_rate for run in summaries]],
+    )
+    shared_stations, station_coverage = pairwise_shared(stations)
+    shared_segments, segment_coverage = pairwise_shared(segments)
+    return SweepMatrix(
+        names=tuple(run.name for run in summaries),
+        folders=tuple(run.folder for run in summaries),
+        metrics={
+            "res_rms": pairwise_rms(resmag, stations),
+            "ss_rms": pairwise_rms(ss, segments),
+            "ds_rms": pairwise_rms(ds, segments),
+            "station_coverage": station_coverage,
+            "segment_coverage": segment_coverage,
+        },
+        shared_stations=shared_stations,
+        shared_segments=shared_segments,
+    )
+
+
+def compute_sweep(folders, workers=None):
+    return sweep_matrix(summarize_runs(folders, workers))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="fennil sweep",
+        description="Compare every pair of runs of a parameter sweep.",
+    )
+    parser.add_argument("folders", nargs="+", type=Path, help="Run folders")
+    parser.add_argument(
+        "--metric", choices=list(SWEEP_METRICS), default="res_rms", help="Printed"
+    )
+    parser.add_argument("--output", type=Path, help="Write all the metrics as JSON")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from fennil.app.io import is_valid_data_folder
+
+    folders = []
+    for folder in args.folders:
+        if not is_valid_data_folder(folder):
+            sys.stderr.write(f"skipping {folder}: missing model_*.csv files\n")
+            continue
+        folders.append(folder)
+    if not folders:
+        return 1
+
+    matrix = compute_sweep(folders, args.workers)
+    if args.output is not None:
+        args.output.write_text(json.dumps(matrix.to_dict()))
+
+    values = matrix.metrics[args.metric]
+    sys.stdout.write("\t".join(("", *matrix.names)) + "\n")
+    for name, row in zip(matrix.names, values, strict=True):
+        cells = (f"{value:.{SWEEP_DECIMALS}f}" for value in row)
+        sys.stdout.write("\t".join((name, *cells)) + "\n")
+    return 0
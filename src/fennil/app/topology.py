@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Endpoints closer than this are shared, as for the slip rate comparison.
+ENDPOINT_TOL_DEG = 1.0e-4
+
+
+@dataclass(frozen=True)
+class SegmentPaths:
+    """Fault segments chained into polylines through shared endpoints.
+
+    ``segments`` lists segment rows path after path, in drawing order, and
+    ``starts`` holds the offset of each path in it (plus the total count).
+    Paths only continue through endpoints shared by exactly two segments.
+    """
+
+    segments: np.ndarray  # (n_segments,) segment row indices
+    flipped: np.ndarray  # (n_segments,) True when drawn from end to start
+    starts: np.ndarray  # (n_paths + 1,)
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def split(self, values):
+        """Per-segment ``values`` (in row order) as one list per path."""
+        if not len(self):
+            return []
+        ordered = np.asarray(values)[self.segments]
+        return [part.tolist() for part in np.split(ordered, self.starts[1:-1])]
+
+    def vertex_values(self, values):
+        """
+        Per-segment ``values`` repeated on the vertices of each path.
+
+        Vertex ``k`` carries the value of the segment starting at it, the last
+        vertex repeats the last segment, matching how deck.gl's PathLayer
+        colors and sizes each segment from its first vertex.
+        """
+        if not len(self):
+            return []
+        ordered = np.asarray(values)[self.segments]
+        last = ordered[self.starts[1:] - 1]
+        ordered = np.insert(ordered, self.starts[1:], last, axis=0)
+        vertex_starts = self.starts + np.arange(len(self.starts))
+        return [part.tolist() for part in np.split(ordered, vertex_starts[1:-1])]
+
+    def positions(self, lon1, lat1, lon2, lat2):
+        """[[lon, lat], ...] vertex list of each path."""
+        if not len(self):
+            return []
+        start = np.column_stack((lon1, lat1))[self.segments]
+        end = np.column_stack((lon2, lat2))[self.segments]
+        start[self.flipped], end[self.flipped] = end[self.flipped], start[self.flipped]
+        first = start[self.starts[:-1]]
+        vertices = np.insert(end, self.starts[:-1], first, axis=0)
+        vertex_starts = self.starts + np.arange(len(self.starts))
+        return [part.tolist() for part in np.split(vertices, vertex_starts[1:-1])]
+
+
+def endpoint_nodes(lon1, lat1, lon2, lat2, tolerance):
+    """
+    (n_segments, 2) node id of the start and end of each segment.
+
+    Endpoints closer than ``tolerance`` (degrees, on a quantized grid) are the
+    same node; non-finite endpoints get a node of their own.
+    """
+    ends = np.column_stack((lon1, lat1, lon2, lat2)).reshape(-1, 2)
+    finite = np.isfinite(ends).all(axis=1)
+    quantized = np.zeros(ends.shape, dtype=np.int64)
+    quantized[finite] = np.rint(ends[finite] / tolerance)
+    _, nodes = np.unique(quantized, axis=0, return_inverse=True)
+    nodes = nodes.reshape(-1)
+    nodes[~finite] = nodes.max(initial=-1) + 1 + np.arange(np.count_nonzero(~finite))
+    return nodes.reshape(-1, 2)
+
+
+def chain_segments(lon1, lat1, lon2, lat2, tolerance=ENDPOINT_TOL_DEG):
+    """Chain segments sharing endpoints into :class:`SegmentPaths`."""
+    nodes = endpoint_nodes(lon1, lat1, lon2, lat2, tolerance)
+    n_segments = len(nodes)
+    degree = np.bincount(nodes.ravel(), minlength=1)
+
+    # Segment ends (2 * segment + side) grouped by node
+    ends_by_node = np.argsort(nodes.ravel(), kind="stable")
+    node_start = np.concatenate(([0], np.cumsum(degree)))
+
+    def next_end(end):
+        """The other segment end at the node of ``end``, if the path goes on."""
+        node = nodes.flat[end]
+        if degree[node] != 2:
+            return None
+        first, second = ends_by_node[node_start[node] : node_start[node] + 2]
+        return second if first == end else first
+
+    visited = np.zeros(n_segments, dtype=bool)
+    segments = []
+    flipped = []
+    starts = [0]
+    for seed in range(n_segments):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        path = [(seed, False)]
+
+        # Forward from the seed's end, then backward from its start
+        for end, forward in ((2 * seed + 1, True), (2 * seed, False)):
+            entry = next_end(end)
+            while entry is not None and not visited[entry // 2]:
+                segment, side = divmod(int(entry), 2)
+                visited[segment] = True
+                if forward:
+                    # Entering a segment at its end means drawing it reversed
+                    path.append((segment, side == 1))
+                else:
+                    path.insert(0, (segment, side == 0))
+                entry = next_end(entry ^ 1)
+
+        segments.extend(segment for segment, _ in path)
+        flipped.extend(flip for _, flip in path)
+        starts.append(len(segments))
+
+    return SegmentPaths(
+        segments=np.asarray(segments, dtype=np.int64),
+        flipped=np.asarray(flipped, dtype=bool),
+        starts=np.asarray(starts, dtype=np.int64),
+    )
@@ -1,27 +1,10 @@
-import importlib.util
-from pathlib import Path
-
 from fennil.app.registry import FIELD_REGISTRY
-
-FIELDS_DIRECTORY = Path(__file__).parent / "fields"
+from fennil.app.viz.manifest import FIELDS_PACKAGE, MANIFEST
 
 
 def load_all_viz():
-    for f in sorted(FIELDS_DIRECTORY.glob("*.py")):
-        if f.name.startswith("_"):
-            continue
-
-        name = f.stem
-        spec = importlib.util.spec_from_file_location(name, f)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        FIELD_REGISTRY.register(
-            name,
-            module.SPEC,
-            module.builder,
-            module.can_render,
-        )
+    for name, spec in MANIFEST.items():
+        FIELD_REGISTRY.register_lazy(name, spec, f"{FIELDS_PACKAGE}.{name}")
 
 
 __all__ = [
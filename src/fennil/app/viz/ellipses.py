@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.deck.primitives import ellipse_layers, polygon_layers
+from fennil.app.geo_projs import web_mercator_to_wgs84, wgs84_to_web_mercator
+
+from .styles import (
+    ELLIPSE_FILL_ALPHA,
+    ELLIPSE_POLYGON_POINTS,
+    ELLIPSE_SIGMA,
+    VELOCITY_SCALE,
+)
+from .vectors import station_vector_endpoints
+
+REQUIRED_ELLIPSE_COLS = {"east_sig", "north_sig"}
+
+
+@dataclass(frozen=True)
+class EllipseShapes:
+    """Velocity uncertainty ellipses, axes in mm/yr (see ELLIPSE_SIGMA)."""
+
+    major: np.ndarray
+    minor: np.ndarray
+    # Major axis direction, degrees counter-clockwise from east
+    angle: np.ndarray
+
+    def __len__(self):
+        return len(self.major)
+
+
+def ellipse_shapes(east_sig, north_sig, corr=None):
+    """
+    Axes and orientation of the ellipses of the 2x2 velocity covariances,
+    from the eigen decomposition of all of them at once.
+    """
+    east_sig = np.nan_to_num(np.asarray(east_sig, dtype=float), nan=0.0)
+    north_sig = np.nan_to_num(np.asarray(north_sig, dtype=float), nan=0.0)
+    corr = (
+        np.zeros_like(east_sig)
+        if corr is None
+        else np.clip(np.nan_to_num(np.asarray(corr, dtype=float)), -1.0, 1.0)
+    )
+    cov_ee = east_sig**2
+    cov_nn = north_sig**2
+    cov_en = corr * east_sig * north_sig
+
+    mean = (cov_ee + cov_nn) / 2
+    spread = np.hypot((cov_ee - cov_nn) / 2, cov_en)
+    major = np.sqrt(mean + spread)
+    minor = np.sqrt(np.maximum(mean - spread, 0.0))
+    angle = np.degrees(0.5 * np.arctan2(2 * cov_en, cov_ee - cov_nn))
+    return EllipseShapes(ELLIPSE_SIGMA * major, ELLIPSE_SIGMA * minor, angle)
+
+
+def station_ellipse_shapes(data):
+    """Memoized :class:`EllipseShapes` of the observed station velocities."""
+
+    def _build():
+        station = data.station
+        return ellipse_shapes(
+            station.east_sig.to_numpy(),
+            station.north_sig.to_numpy(),
+            station["corr"].to_numpy() if "corr" in station.columns else None,
+        )
+
+    return data.derived.get(("station_ellipses",), _build)
+
+
+def ellipse_polygons(lon, lat, shapes, velocity_scale):
+    """Ellipse outlines as lon/lat rings, for consumers without fennil.js."""
+    t = np.linspace(0.0, 2 * np.pi, ELLIPSE_POLYGON_POINTS, endpoint=False)
+    scale = VELOCITY_SCALE * velocity_scale
+    # Axis frame -> east/north offsets in Web Mercator meters, (stations, points)
+    a = scale * shapes.major[:, None] * np.cos(t)
+    b = scale * shapes.minor[:, None] * np.sin(t)
+    theta = np.radians(shapes.angle)[:, None]
+    dx = a * np.cos(theta) - b * np.sin(theta)
+    dy = a * np.sin(theta) + b * np.cos(theta)
+
+    x, y = wgs84_to_web_mercator(np.asarray(lon), np.asarray(lat))
+    ring_lon, ring_lat = web_mercator_to_wgs84(x[:, None] + dx, y[:, None] + dy)
+    return np.stack((ring_lon, ring_lat), axis=-1).tolist()
+
+
+def station_ellipse_layers(
+    folder_number,
+    data,
+    color,
+    velocity_scale,
+    client_layers=True,
+    filters=None,
+):
+    """
+    Uncertainty ellipses at the tips of the observed velocity vectors, scaled
+    like the vectors. With ``client_layers`` they are instanced circles
+    stretched on the GPU, otherwise plain polygons.
+    """
+    shapes = station_ellipse_shapes(data)
+    if not len(shapes):
+        return []
+    velocity_scale = 1.0 if velocity_scale is None else float(velocity_scale)
+    lon, lat = station_vector_endpoints(data, "east_vel", "north_vel", velocity_scale)
+    fill = [*color[:3], ELLIPSE_FILL_ALPHA]
+
+    if not client_layers:
+        ellipse_df = pd.DataFrame(
+            {"polygon": ellipse_polygons(lon, lat, shapes, velocity_scale)}
+        )
+        return polygon_layers(
+            "ellipses", ellipse_df, fill, list(color), 1, folder_number, pickable=False
+        )
+
+    major = np.where(shapes.major > 0, shapes.major, 1.0)
+    ellipse_df = pd.DataFrame(
+        {
+            "lon": lon,
+            "lat": lat,
+            # Meters at the ellipse latitude, matching the Web Mercator
+            # lengths of the vectors
+            "radius": VELOCITY_SCALE * shapes.major * np.cos(np.radians(lat)),
+            "ratio": shapes.minor / major,
+            "angle": shapes.angle,
+        }
+    )
+    filters = filters or {}
+    for name, values in filters.items():
+        ellipse_df[f"filter_{name}"] = values
+    return ellipse_layers(
+        "ellipses",
+        ellipse_df,
+        fill,
+        list(color),
+        velocity_scale,
+        folder_number,
+        filters=tuple(filters),
+    )
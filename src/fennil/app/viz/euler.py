@@ -0,0 +1,194 @@
+"""
+Block rotation velocities evaluated on a regular lon/lat grid.
+
+The continuous counterpart of the ``rot`` station field: each grid node takes
+the block of its nearest station and the velocity ``omega x r`` of that
+block's Euler pole (model_block.csv). Nodes farther than
+:data:`EULER_GRID_MAX_STATION_DEG` from every station are dropped.
+
+The grid is nested: nodes of level ``k`` lie on a grid twice as fine as level
+``k - 1``, and fennil.js shows each level from its own zoom on, so the arrow
+density follows the zoom without going back to the server.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from fennil.app.geo_projs import RADIUS_EARTH, sph2cart, wgs84_to_web_mercator
+
+from .vectors import VectorGeometry, build_vector_geometry, vector_layers
+
+REQUIRED_BLOCK_COLS = {"euler_lon", "euler_lat", "euler_rate"}
+
+# Grid nodes of the finest level over the station extent (plus the padding)
+EULER_GRID_MAX_POINTS = 20000
+EULER_GRID_PAD_DEG = 1.0
+EULER_GRID_MAX_STATION_DEG = 2.0
+# Levels of the nested grid, and the spacing on screen each one targets
+EULER_GRID_LEVELS = 4
+EULER_GRID_PIXELS = 48
+# Levels drawn without fennil.js, which cannot follow the zoom
+EULER_GRID_STATIC_LEVEL = 2
+# Grid nodes matched to stations at once (bounds the distance matrix)
+_NEAREST_CHUNK = 2048
+# Euler rates are in degrees per million years, velocities in mm/yr
+_RATE_TO_RAD_PER_YR = np.pi / 180.0 / 1.0e6
+_M_TO_MM = 1.0e3
+
+
+@dataclass(frozen=True)
+class EulerGrid:
+    geometry: VectorGeometry
+    level: np.ndarray  # (n_nodes,) nested grid level of each node
+    block_label: np.ndarray  # (n_nodes,)
+    spacing: float  # finest level spacing, degrees
+
+    def __len__(self):
+        return len(self.level)
+
+    @property
+    def level_zoom(self):
+        """Zoom from which the coarsest level spaces arrows EULER_GRID_PIXELS apart."""
+        degrees_per_pixel = 360.0 / 512.0
+        finest_zoom = np.log2(EULER_GRID_PIXELS * degrees_per_pixel / self.spacing)
+        return float(finest_zoom - EULER_GRID_LEVELS)
+
+
+def grid_spacing(lon_span, lat_span, max_points=EULER_GRID_MAX_POINTS):
+    """Power of two spacing (degrees) keeping the finest grid under ``max_points``."""
+    area = max(lon_span, 1e-6) * max(lat_span, 1e-6)
+    return float(2.0 ** np.ceil(np.log2(np.sqrt(area / max_points))))
+
+
+def grid_levels(i, j, levels=EULER_GRID_LEVELS):
+    """
+    Nested grid level of the integer nodes ``(i, j)``: the coarsest level
+    ``k`` whose grid (every ``2 ** (levels - k)`` nodes) contains them.
+    """
+    level = np.full(np.shape(i), levels, dtype=np.int64)
+    for k in range(levels - 1, -1, -1):
+        step = 2 ** (levels - k)
+        level[(i % step == 0) & (j % step == 0)] = k
+    return level
+
+
+def rotation_velocities(lon, lat, pole_lon, pole_lat, pole_rate):
+    """
+    East and north velocities (mm/yr) at ``lon``/``lat`` of rotations about
+    the given Euler poles (one per point), from ``omega x r`` in Cartesian
+    space.
+    """
+    omega = np.column_stack(sph2cart(pole_lon, pole_lat, 1.0))
+    omega *= (_RATE_TO_RAD_PER_YR * np.asarray(pole_rate, dtype=float))[:, None]
+    position = np.column_stack(sph2cart(lon, lat, RADIUS_EARTH))
+    velocity = _M_TO_MM * np.cross(omega, position)
+
+    lon_rad = np.deg2rad(lon)
+    lat_rad = np.deg2rad(lat)
+    east = -np.sin(lon_rad) * velocity[:, 0] + np.cos(lon_rad) * velocity[:, 1]
+    north = (
+        -np.sin(lat_rad) * np.cos(lon_rad) * velocity[:, 0]
+        - np.sin(lat_rad) * np.sin(lon_rad) * velocity[:, 1]
+        + np.cos(lat_rad) * velocity[:, 2]
+    )
+    return east, north
+
+
+def nearest_station(lon, lat, station_lon, station_lat):
+    """Index of the nearest station of each point, and its distance (degrees)."""
+    stations = np.column_stack(sph2cart(station_lon, station_lat, 1.0))
+    points = np.column_stack(sph2cart(lon, lat, 1.0))
+    nearest = np.empty(len(points), dtype=np.int64)
+    cosine = np.empty(len(points))
+    for start in range(0, len(points), _NEAREST_CHUNK):
+        dots = points[start : start + _NEAREST_CHUNK] @ stations.T
+        nearest[start : start + len(dots)] = np.argmax(dots, axis=1)
+        cosine[start : start + len(dots)] = np.max(dots, axis=1)
+    return nearest, np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def euler_grid(data, max_points=EULER_GRID_MAX_POINTS):
+    """Memoized :class:`EulerGrid` of a dataset, keyed by its grid spacing."""
+    station = data.station
+    lon = station.lon.to_numpy(dtype=float)
+    lat = station.lat.to_numpy(dtype=float)
+    lon_min, lon_max = lon.min() - EULER_GRID_PAD_DEG, lon.max() + EULER_GRID_PAD_DEG
+    lat_min = max(lat.min() - EULER_GRID_PAD_DEG, -85.0)
+    lat_max = min(lat.max() + EULER_GRID_PAD_DEG, 85.0)
+    spacing = grid_spacing(lon_max - lon_min, lat_max - lat_min, max_points)
+
+    def _build():
+        # Integer node indices, aligned on multiples of the spacing so the
+        # levels nest the same way whatever the extent
+        i, j = np.meshgrid(
+            np.arange(np.floor(lon_min / spacing), np.ceil(lon_max / spacing) + 1),
+            np.arange(np.floor(lat_min / spacing), np.ceil(lat_max / spacing) + 1),
+        )
+        i = i.ravel().astype(np.int64)
+        j = j.ravel().astype(np.int64)
+        node_lon = i * spacing
+        node_lat = j * spacing
+
+        nearest, distance = nearest_station(node_lon, node_lat, lon, lat)
+        labels = station.block_label.to_numpy()[nearest]
+        poles = data.block.set_index(
+            data.block["block_label"]
+            if "block_label" in data.block.columns
+            else np.arange(len(data.block))
+        )
+        keep = (distance <= EULER_GRID_MAX_STATION_DEG) & np.isin(labels, poles.index)
+        node_lon, node_lat, labels = node_lon[keep], node_lat[keep], labels[keep]
+        pole = poles.loc[labels]
+
+        east, north = rotation_velocities(
+            node_lon,
+            node_lat,
+            pole.euler_lon.to_numpy(dtype=float),
+            pole.euler_lat.to_numpy(dtype=float),
+            pole.euler_rate.to_numpy(dtype=float),
+        )
+        _, node_y = wgs84_to_web_mercator(node_lon, node_lat)
+        return EulerGrid(
+            geometry=build_vector_geometry(node_lon, node_lat, node_y, east, north),
+            level=grid_levels(i[keep], j[keep]),
+            block_label=labels,
+            spacing=spacing,
+        )
+
+    return data.derived.get(("euler_grid", spacing), _build)
+
+
+def euler_grid_layers(
+    folder_number, data, color, line_width, velocity_scale, client_layers=True
+):
+    """
+    Rotation velocity arrows on the grid, through the batched vector path.
+    With ``client_layers`` every level is sent once and fennil.js shows the
+    ones matching the zoom; otherwise the levels up to
+    :data:`EULER_GRID_STATIC_LEVEL` are drawn.
+    """
+    grid = euler_grid(data)
+    if not len(grid):
+        return []
+    velocity_scale = 1.0 if velocity_scale is None else float(velocity_scale)
+    geometry = grid.geometry
+    levels = grid.level
+    if not client_layers:
+        keep = levels <= EULER_GRID_STATIC_LEVEL
+        geometry = VectorGeometry(
+            **{name: value[keep] for name, value in vars(geometry).items()}
+        )
+        levels = None
+    end_lon, end_lat = geometry.endpoints(velocity_scale)
+    return vector_layers(
+        "euler_vel",
+        geometry,
+        end_lon,
+        end_lat,
+        color,
+        line_width,
+        folder_number,
+        levels=levels,
+        level_zoom=grid.level_zoom if client_layers else None,
+    )
@@ -1,3 +1,5 @@
+from fennil.app.profiling import PROFILER
+
 from .faults import fault_line_layers
 
 # Keep base fault colors stable and distinct per dataset.
@@ -15,11 +17,13 @@ def build_fault_lines(ctx):
 
         folder_number = idx + 1
         seg_tooltip_enabled = True
-        fault_layers, _ = fault_line_layers(
-            folder_number,
-            dataset.data.segment,
-            seg_tooltip_enabled,
-            FAULT_LINE_COLORS[idx],
-            FAULT_LINE_WIDTHS[idx],
-        )
+        with PROFILER.stage("dataset", field="fault_lines", dataset=dataset.name):
+            fault_layers, _ = fault_line_layers(
+                folder_number,
+                dataset.data,
+                seg_tooltip_enabled,
+                FAULT_LINE_COLORS[idx],
+                FAULT_LINE_WIDTHS[idx],
+                chained=ctx.client_layers,
+            )
         ctx.layers.extend(fault_layers)
@@ -1,14 +1,11 @@
 import numpy as np
 import pandas as pd
 
-from fennil.app.deck.primitives import line_layers, polygon_layers
+from fennil.app.deck.primitives import line_layers, path_layers, polygon_layers
 
 from .styles import (
     FAULT_PROJ_LINE_WIDTH,
-    SLIP_NEGATIVE_COLOR,
-    SLIP_NEGATIVE_EXTREME_COLOR,
-    SLIP_POSITIVE_COLOR,
-    SLIP_POSITIVE_EXTREME_COLOR,
+    SLIP_COLORMAP,
     SLIP_WIDTH_CAP_MM_PER_YR,
     SLIP_WIDTH_MIN_PIXELS,
     SLIP_WIDTH_SCALE,
@@ -22,7 +19,75 @@ REQUIRED_SEG_COLS = {
 }
 
 
-def fault_line_dataframe(segment, seg_tooltip_enabled):
+def segment_tooltips(segment):
+    return [
+        format_segment_tooltip(
+            name,
+            lon1,
+            lat1,
+            lon2,
+            lat2,
+            ss_rate,
+            ds_rate,
+            ts_rate,
+        )
+        for name, lon1, lat1, lon2, lat2, ss_rate, ds_rate, ts_rate in zip(
+            segment.name.to_numpy(),
+            segment.lon1.to_numpy(),
+            segment.lat1.to_numpy(),
+            segment.lon2.to_numpy(),
+            segment.lat2.to_numpy(),
+            segment.model_strike_slip_rate.to_numpy(),
+            segment.model_dip_slip_rate.to_numpy(),
+            segment.model_tensile_slip_rate.to_numpy(),
+            strict=False,
+        )
+    ]
+
+
+def dataset_segment_tooltips(data):
+    """Memoized per-segment tooltips, None without the slip rate columns."""
+
+    def _build():
+        if not REQUIRED_SEG_COLS.issubset(data.segment.columns):
+            return None
+        return segment_tooltips(data.segment)
+
+    return data.derived.get(("segment_tooltips",), _build)
+
+
+def dataset_fault_paths(data):
+    """Memoized vertex lists and segment indices of the chained segment paths."""
+
+    def _build():
+        segment = data.segment
+        paths = data.segment_paths
+        return {
+            "path": paths.positions(
+                segment.lon1.to_numpy(),
+                segment.lat1.to_numpy(),
+                segment.lon2.to_numpy(),
+                segment.lat2.to_numpy(),
+            ),
+            "segments": paths.split(np.arange(len(segment))),
+        }
+
+    return data.derived.get(("fault_paths",), _build)
+
+
+def fault_line_dataframe(data, seg_tooltip_enabled, chained=False):
+    """
+    One row per segment, or per chained path (``data.segment_paths``) when
+    ``chained``; path rows keep per-segment indices and tooltips.
+    """
+    tooltips = dataset_segment_tooltips(data) if seg_tooltip_enabled else None
+    if chained:
+        fault_paths_df = pd.DataFrame(dataset_fault_paths(data))
+        if tooltips is not None:
+            fault_paths_df["tooltip"] = data.segment_paths.split(tooltips)
+        return fault_paths_df
+
+    segment = data.segment
     fault_lines_df = pd.DataFrame(
         {
             "start_lon": segment.lon1.to_numpy(),
@@ -31,37 +96,29 @@ def fault_line_dataframe(segment, seg_tooltip_enabled):
             "end_lat": segment.lat2.to_numpy(),
         }
     )
-
-    if seg_tooltip_enabled and REQUIRED_SEG_COLS.issubset(segment.columns):
-        fault_lines_df["tooltip"] = [
-            format_segment_tooltip(
-                name,
-                lon1,
-                lat1,
-                lon2,
-                lat2,
-                ss_rate,
-                ds_rate,
-                ts_rate,
-            )
-            for name, lon1, lat1, lon2, lat2, ss_rate, ds_rate, ts_rate in zip(
-                segment.name.to_numpy(),
-                segment.lon1.to_numpy(),
-                segment.lat1.to_numpy(),
-                segment.lon2.to_numpy(),
-                segment.lat2.to_numpy(),
-                segment.model_strike_slip_rate.to_numpy(),
-                segment.model_dip_slip_rate.to_numpy(),
-                segment.model_tensile_slip_rate.to_numpy(),
-                strict=False,
-            )
-        ]
+    if tooltips is not None:
+        fault_lines_df["tooltip"] = tooltips
 
     return fault_lines_df
 
 
-def fault_line_layers(folder_number, segment, seg_tooltip_enabled, color, line_width):
-    fault_lines_df = fault_line_dataframe(segment, seg_tooltip_enabled)
+def fault_line_layers(
+    folder_number, data, seg_tooltip_enabled, color, line_width, chained=False
+):
+    fault_lines_df = fault_line_dataframe(data, seg_tooltip_enabled, chained)
+
+    if chained:
+        layers = path_layers(
+            "fault",
+            fault_lines_df,
+            color,
+            line_width,
+            folder_number,
+            width_min_pixels=1,
+            width_units="pixels",
+            pickable=seg_tooltip_enabled,
+        )
+        return layers, fault_lines_df
 
     layers = line_layers(
         "fault",
@@ -82,7 +139,15 @@ def segment_slip_layers(
     seg_tooltip_enabled,
     fault_lines_df,
     velocity_scale=1.0,
+    paths=None,
+    filters=None,
 ):
+    """
+    Slip rate colored and sized segments. With ``paths``, ``fault_lines_df``
+    holds the path rows of :func:`fault_line_dataframe`, widths and the
+    per-segment ``filters`` values are set per vertex and the slip rates are
+    colored on the client through :data:`SLIP_COLORMAP`.
+    """
     velocity_scale = 1.0 if velocity_scale is None else float(velocity_scale)
 
     if seg_slip_type == "ss":
@@ -95,6 +160,33 @@ def segment_slip_layers(
 
     slip_values = np.asarray(slip_values)
     slip_values = np.nan_to_num(slip_values, nan=0.0, posinf=0.0, neginf=0.0)
+    line_width = np.clip(np.abs(slip_values), 0.0, SLIP_WIDTH_CAP_MM_PER_YR)
+
+    layer_kwargs = {
+        "width_min_pixels": SLIP_WIDTH_MIN_PIXELS,
+        "width_scale": SLIP_WIDTH_SCALE * velocity_scale,
+        "width_units": "pixels",
+        "pickable": seg_tooltip_enabled,
+    }
+    filters = filters or {}
+    if filters:
+        layer_kwargs["filters"] = tuple(filters)
+
+    if paths is not None:
+        seg_paths_df = fault_lines_df.copy()
+        seg_paths_df["color_value"] = paths.vertex_values(slip_values)
+        seg_paths_df["line_width"] = paths.vertex_values(line_width)
+        for name, values in filters.items():
+            seg_paths_df[f"filter_{name}"] = paths.vertex_values(values)
+        return path_layers(
+            "segments",
+            seg_paths_df,
+            [255, 255, 255, 255],
+            "line_width",
+            folder_number,
+            colormap=SLIP_COLORMAP,
+            **layer_kwargs,
+        )
 
     seg_lines_df = pd.DataFrame(
         {
@@ -103,20 +195,12 @@ def segment_slip_layers(
             "end_lon": segment.lon2.to_numpy(),
             "end_lat": segment.lat2.to_numpy(),
             "slip_rate": slip_values,
-            "line_width": np.clip(np.abs(slip_values), 0.0, SLIP_WIDTH_CAP_MM_PER_YR),
+            "line_width": line_width,
         }
     )
-
-    def _slip_color(value):
-        if value < -SLIP_WIDTH_CAP_MM_PER_YR:
-            return SLIP_NEGATIVE_EXTREME_COLOR
-        if value > SLIP_WIDTH_CAP_MM_PER_YR:
-            return SLIP_POSITIVE_EXTREME_COLOR
-        if value < 0:
-            return SLIP_NEGATIVE_COLOR
-        return SLIP_POSITIVE_COLOR
-
-    seg_lines_df["color"] = [_slip_color(value) for value in slip_values]
+    seg_lines_df["color"] = SLIP_COLORMAP.colors(slip_values)
+    for name, values in filters.items():
+        seg_lines_df[f"filter_{name}"] = values
     if seg_tooltip_enabled and "tooltip" in fault_lines_df.columns:
         seg_lines_df["tooltip"] = fault_lines_df["tooltip"].to_numpy()
 
@@ -126,10 +210,7 @@ def segment_slip_layers(
         "color",
         "line_width",
         folder_number,
-        width_min_pixels=SLIP_WIDTH_MIN_PIXELS,
-        width_scale=SLIP_WIDTH_SCALE * velocity_scale,
-        width_units="pixels",
-        pickable=seg_tooltip_enabled,
+        **layer_kwargs,
     )
 
 
@@ -0,0 +1,33 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.euler import REQUIRED_BLOCK_COLS, euler_grid, euler_grid_layers
+
+# Shared derived data, computed once per dataset before the builders run
+DERIVED = (euler_grid,)
+
+
+def builder(name: str, ctx: LayerContext):
+    if ctx.skip(name):
+        return
+
+    for idx, dataset in ctx.enabled_datasets(name):
+        ctx.vector_layers.extend(
+            euler_grid_layers(
+                dataset.name,
+                dataset.data,
+                ctx.specs[name]["styles"]["colors"][idx],
+                ctx.specs[name]["styles"]["line_width"][idx],
+                ctx.velocity_scale,
+                client_layers=ctx.client_layers,
+            )
+        )
+
+
+def can_render(dataset: Dataset) -> bool:
+    return (
+        dataset is not None
+        and dataset.block is not None
+        and REQUIRED_BLOCK_COLS.issubset(dataset.block.columns)
+        and "block_label" in dataset.station.columns
+        and len(dataset.station) > 0
+    )
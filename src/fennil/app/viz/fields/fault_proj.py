@@ -1,31 +1,7 @@
 from fennil.app.io import Dataset
-from fennil.app.registry import FieldSpec, LayerContext
+from fennil.app.registry import LayerContext
 from fennil.app.viz.faults import fault_projection_layers
 
-SPEC = FieldSpec(
-    priority=30,
-    label="Fault Proj",
-    icon="mdi-bandage",
-    ui_type="VCheckbox",
-    options=None,
-    default=False,
-    styles={
-        "colors": [
-            (128, 128, 128, 255),
-            (128, 128, 128, 255),
-        ],
-        "line_width": (1, 2),
-        "fill": [
-            (173, 216, 230, 77),
-            (144, 238, 144, 77),
-        ],
-        "line": [
-            (0, 0, 255, 255),
-            (0, 128, 0, 255),
-        ],
-    },
-)
-
 
 def builder(name: str, ctx: LayerContext):
     if ctx.skip(name):
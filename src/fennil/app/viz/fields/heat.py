@@ -0,0 +1,34 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.heatmap import (
+    REQUIRED_HEATMAP_COLS,
+    RESIDUAL_COMPONENTS,
+    residual_heatmap_layers,
+)
+
+
+def builder(name: str, ctx: LayerContext):
+    if ctx.skip(name):
+        return
+
+    for idx, dataset in ctx.enabled_datasets(name):
+        component = dataset.fields[name]
+        if component not in RESIDUAL_COMPONENTS:
+            continue
+        # Surface layers, drawn beneath the lines and vectors
+        ctx.tde_layers.extend(
+            residual_heatmap_layers(
+                idx + 1,
+                dataset.data,
+                component,
+                client_colors=ctx.client_layers,
+            )
+        )
+
+
+def can_render(dataset: Dataset) -> bool:
+    return (
+        dataset is not None
+        and REQUIRED_HEATMAP_COLS.issubset(dataset.station.columns)
+        and len(dataset.station) > 0
+    )
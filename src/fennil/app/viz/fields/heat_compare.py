@@ -0,0 +1,37 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.heatmap import (
+    REQUIRED_HEATMAP_COLS,
+    RESIDUAL_COMPONENTS,
+    residual_heatmap_compare_layers,
+)
+
+
+def builder(name: str, ctx: LayerContext):
+    right = ctx.datasets[0]
+    left = ctx.datasets[1]
+    if not (right.enabled and left.enabled):
+        return
+    if right.data is None or left.data is None:
+        return
+
+    component = left.fields.get(name)
+    if component not in RESIDUAL_COMPONENTS:
+        return
+
+    ctx.tde_layers.extend(
+        residual_heatmap_compare_layers(
+            right.data,
+            left.data,
+            component,
+            client_colors=ctx.client_layers,
+        )
+    )
+
+
+def can_render(dataset: Dataset) -> bool:
+    return (
+        dataset is not None
+        and REQUIRED_HEATMAP_COLS.issubset(dataset.station.columns)
+        and len(dataset.station) > 0
+    )
@@ -1,24 +1,8 @@
 from fennil.app.io import Dataset
-from fennil.app.registry import FieldSpec, LayerContext
+from fennil.app.registry import LayerContext
+from fennil.app.viz.filters import station_filter_values
 from fennil.app.viz.stations import station_layers
 
-SPEC = FieldSpec(
-    priority=0,
-    label="Locs",
-    icon="mdi-circle-medium",
-    ui_type="VCheckbox",
-    options=None,
-    default=False,
-    styles={
-        "icon_color": "black",
-        "colors": [
-            (0, 0, 0, 220),
-            (0, 0, 0, 220),
-        ],
-        "line_width": (1, 2),
-    },
-)
-
 
 def builder(name: str, ctx: LayerContext):
     if ctx.skip(name):
@@ -30,6 +14,7 @@ def builder(name: str, ctx: LayerContext):
                 dataset.name,
                 dataset.data.station,
                 ctx.specs[name]["styles"]["colors"][idx],
+                station_filter_values(dataset.data) if ctx.client_layers else None,
             )
         )
 
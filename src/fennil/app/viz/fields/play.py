@@ -0,0 +1,24 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.playback import playback_layers
+
+
+def builder(name: str, ctx: LayerContext):
+    # Frames are stepped by fennil.js, there is nothing to draw without it
+    if ctx.skip(name) or not ctx.client_layers:
+        return
+
+    for idx, dataset in ctx.enabled_datasets(name):
+        surface, layers = playback_layers(
+            idx + 1,
+            dataset.data,
+            dataset.fields[name],
+            ctx.velocity_scale,
+            view_3d=ctx.view_3d,
+        )
+        ctx.tde_layers.extend(surface)
+        ctx.layers.extend(layers)
+
+
+def can_render(dataset: Dataset) -> bool:
+    return dataset is not None and dataset.playback is not None
@@ -1,25 +1,7 @@
 from fennil.app.io import Dataset
-from fennil.app.registry import FieldSpec, LayerContext
+from fennil.app.registry import LayerContext
 from fennil.app.viz.res_compare import residual_compare_layers
 
-SPEC = FieldSpec(
-    priority=50,
-    label="Res compare",
-    icon="mdi-circle-multiple",
-    ui_type="VCheckbox",
-    options=None,
-    default=False,
-    styles={
-        "icon_color": "rgba(205, 0, 205, 0.78)",
-        "colors": [
-            (205, 0, 205, 200),
-            (205, 0, 205, 200),
-        ],
-        "line_width": (1, 2),
-    },
-    multiple=False,
-)
-
 
 def builder(name: str, ctx: LayerContext):
     right = ctx.datasets[0]
@@ -36,6 +18,7 @@ def builder(name: str, ctx: LayerContext):
             right.data,
             left.data,
             ctx.velocity_scale,
+            client_colors=ctx.client_layers,
         )
     )
 
@@ -0,0 +1,36 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.ellipses import (
+    REQUIRED_ELLIPSE_COLS,
+    station_ellipse_layers,
+    station_ellipse_shapes,
+)
+from fennil.app.viz.filters import station_filter_values
+
+# Shared derived data, computed once per dataset before the builders run
+DERIVED = (station_ellipse_shapes,)
+
+
+def builder(name: str, ctx: LayerContext):
+    if ctx.skip(name):
+        return
+
+    for idx, dataset in ctx.enabled_datasets(name):
+        ctx.vector_layers.extend(
+            station_ellipse_layers(
+                dataset.name,
+                dataset.data,
+                ctx.specs[name]["styles"]["colors"][idx],
+                ctx.velocity_scale,
+                client_layers=ctx.client_layers,
+                filters=(
+                    station_filter_values(dataset.data) if ctx.client_layers else None
+                ),
+            )
+        )
+
+
+def can_render(dataset: Dataset) -> bool:
+    return dataset is not None and REQUIRED_ELLIPSE_COLS.issubset(
+        dataset.station.columns
+    )
@@ -1,37 +1,25 @@
 from fennil.app.io import Dataset
-from fennil.app.registry import FieldSpec, LayerContext
+from fennil.app.registry import LayerContext
 from fennil.app.viz.faults import (
     REQUIRED_SEG_COLS,
+    dataset_fault_paths,
+    dataset_segment_tooltips,
     fault_line_dataframe,
     segment_slip_layers,
 )
+from fennil.app.viz.filters import segment_filter_values
 
-SPEC = FieldSpec(
-    priority=20,
-    label="Slip",
-    icon="mdi-chart-line-variant",
-    ui_type="VBtnToggle",
-    options=[
-        {"text": "SS", "value": "ss"},
-        {"text": "DS", "value": "ds"},
-    ],
-    default=None,
-    styles={
-        "icon_color": "#1976D2",
-        "colors": [
-            (0, 0, 255, 255),
-            (0, 128, 0, 255),
-        ],
-        "line_width": (1, 1),
-    },
-)
+# Shared derived data, computed once per dataset before the builders run
+DERIVED = (dataset_segment_tooltips, dataset_fault_paths, segment_filter_values)
 
 
 def builder(name: str, ctx: LayerContext):
     for idx, dataset in ctx.enabled_datasets(name):
         folder_number = idx + 1
         seg_tooltip_enabled = True
-        fault_lines_df = fault_line_dataframe(dataset.data.segment, seg_tooltip_enabled)
+        fault_lines_df = fault_line_dataframe(
+            dataset.data, seg_tooltip_enabled, chained=ctx.client_layers
+        )
         ctx.layers.extend(
             segment_slip_layers(
                 folder_number,
@@ -40,6 +28,8 @@ def builder(name: str, ctx: LayerContext):
                 seg_tooltip_enabled,
                 fault_lines_df,
                 ctx.velocity_scale,
+                dataset.data.segment_paths if ctx.client_layers else None,
+                segment_filter_values(dataset.data) if ctx.client_layers else None,
             )
         )
 
@@ -1,23 +1,7 @@
 from fennil.app.io import Dataset
-from fennil.app.registry import FieldSpec, LayerContext
+from fennil.app.registry import LayerContext
 from fennil.app.viz.slip_compare import REQUIRED_SLIP_COMPARE_COLS, slip_compare_layers
 
-SPEC = FieldSpec(
-    priority=51,
-    label="Slip compare",
-    icon="mdi-align-vertical-center",
-    ui_type="VBtnToggle",
-    options=[
-        {"text": "SS", "value": "ss"},
-        {"text": "DS", "value": "ds"},
-    ],
-    default=None,
-    styles={
-        "icon_color": "rgba(44, 160, 44, 0.78)",
-    },
-    multiple=False,
-)
-
 
 def builder(name: str, ctx: LayerContext):
     right = ctx.datasets[0]
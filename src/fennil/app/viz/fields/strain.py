@@ -0,0 +1,42 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.strain import (
+    SCIPY_AVAILABLE,
+    STRAIN_VELOCITIES,
+    strain_operator,
+    strain_rate_layers,
+)
+
+# Shared derived data, computed once per dataset before the builders run
+DERIVED = (strain_operator,)
+
+
+def builder(name: str, ctx: LayerContext):
+    if ctx.skip(name):
+        return
+
+    for idx, dataset in ctx.enabled_datasets(name):
+        source = dataset.fields[name]
+        if source not in STRAIN_VELOCITIES:
+            continue
+        surface, axes = strain_rate_layers(
+            idx + 1,
+            dataset.data,
+            source,
+            ctx.velocity_scale,
+            client_layers=ctx.client_layers,
+        )
+        ctx.tde_layers.extend(surface)
+        ctx.layers.extend(axes)
+
+
+def can_render(dataset: Dataset) -> bool:
+    return (
+        SCIPY_AVAILABLE
+        and dataset is not None
+        and all(
+            set(columns).issubset(dataset.station.columns)
+            for columns in STRAIN_VELOCITIES.values()
+        )
+        and len(dataset.station) >= 3
+    )
@@ -0,0 +1,35 @@
+from fennil.app.io import Dataset
+from fennil.app.registry import LayerContext
+from fennil.app.viz.tde_compare import tde_compare_layers, tde_triangle_keys
+
+# Shared derived data, computed once per dataset before the builders run
+DERIVED = (tde_triangle_keys,)
+
+
+def builder(name: str, ctx: LayerContext):
+    right = ctx.datasets[0]
+    left = ctx.datasets[1]
+    if not (right.enabled and left.enabled):
+        return
+    if right.data is None or left.data is None:
+        return
+    if not (right.data.tde_available and left.data.tde_available):
+        return
+
+    slip_kind = left.fields.get(name)
+    if slip_kind not in {"ss", "ds"}:
+        return
+
+    ctx.tde_layers.extend(
+        tde_compare_layers(
+            right.data,
+            left.data,
+            slip_kind,
+            client_colors=ctx.client_layers,
+            view_3d=ctx.view_3d,
+        )
+    )
+
+
+def can_render(dataset: Dataset) -> bool:
+    return dataset is not None and dataset.tde_available
@@ -0,0 +1,82 @@
+"""
+Value filters applied on the GPU by fennil.js.
+
+Layers drawn at stations carry the :data:`STATION_FILTERS` values of their
+stations, slip layers the :data:`SEGMENT_FILTERS` values of their segments,
+as ``filter_<name>`` columns shipped once with the layer data. The ranges set
+in the filter panel are shader uniforms: moving a slider redraws the map on
+the client without any server work.
+"""
+
+import numpy as np
+
+FILTERS = {
+    "resmag": {"label": "Residual", "unit": "mm/yr", "step": 0.1},
+    "velocity": {"label": "Velocity", "unit": "mm/yr", "step": 0.1},
+    "block": {"label": "Block", "unit": "label", "step": 1},
+    "slip": {"label": "Slip rate", "unit": "mm/yr", "step": 0.1},
+}
+STATION_FILTERS = ("resmag", "velocity", "block")
+SEGMENT_FILTERS = ("slip",)
+
+SLIP_RATE_COLUMNS = (
+    "model_strike_slip_rate",
+    "model_dip_slip_rate",
+    "model_tensile_slip_rate",
+)
+
+
+def _finite(values):
+    # NaN fails every range test in the shader and is not valid JSON
+    return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+
+
+def station_filter_values(data):
+    """Memoized ``{filter: per-station values}`` of :data:`STATION_FILTERS`."""
+
+    def _build():
+        station = data.station
+        block = (
+            station.block_label.to_numpy()
+            if "block_label" in station.columns
+            else np.zeros(len(station))
+        )
+        return {
+            "resmag": _finite(data.resmag),
+            "velocity": _finite(
+                np.hypot(station.east_vel.to_numpy(), station.north_vel.to_numpy())
+            ),
+            "block": _finite(block),
+        }
+
+    return data.derived.get(("station_filters",), _build)
+
+
+def segment_filter_values(data):
+    """Memoized ``{filter: per-segment values}``, empty without slip rates."""
+
+    def _build():
+        segment = data.segment
+        if not set(SLIP_RATE_COLUMNS).issubset(segment.columns):
+            return {}
+        rates = segment[list(SLIP_RATE_COLUMNS)].to_numpy(dtype=float)
+        return {"slip": _finite(np.sqrt(np.sum(rates**2, axis=1)))}
+
+    return data.derived.get(("segment_filters",), _build)
+
+
+def filter_bounds(datasets):
+    """``{filter: [min, max]}`` over the enabled datasets, rounded outwards."""
+    values = {}
+    for ds in datasets:
+        if not ds.enabled or ds.data is None:
+            continue
+        for source in (station_filter_values, segment_filter_values):
+            for name, array in source(ds.data).items():
+                if len(array):
+                    values.setdefault(name, []).append(array)
+    bounds = {}
+    for name, arrays in values.items():
+        merged = np.concatenate(arrays)
+        bounds[name] = [float(np.floor(merged.min())), float(np.ceil(merged.max()))]
+    return bounds
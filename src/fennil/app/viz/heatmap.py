@@ -0,0 +1,306 @@
+"""
+Station residuals interpolated onto a raster and drawn as one image.
+
+The stations' residual magnitudes (or east/north components) are spread over
+a grid regular in Web Mercator by inverse distance weighting of the nearest
+stations; pixels farther than :data:`HEATMAP_MAX_STATION_DEG` from every
+station stay transparent. Rasters are memoized per dataset, component and
+grid, and shipped as a single PNG for a BitmapLayer: with fennil.js the PNG
+holds the values and the footer colormaps color it on the GPU, otherwise the
+colors are baked in.
+"""
+
+import base64
+import struct
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from fennil.app.deck.primitives import bitmap_layers
+from fennil.app.geo_projs import (
+    WEB_MERCATOR_RADIUS,
+    sph2cart,
+    web_mercator_to_wgs84,
+    wgs84_to_web_mercator,
+)
+
+from .styles import (
+    RES_COMPONENT_COLORMAP,
+    RES_DIFF_COLORMAP,
+    RES_HEATMAP_OPACITY,
+    RES_MAG_COLORMAP,
+)
+
+# Station columns of each residual component; "mag" is Dataset.resmag
+RESIDUAL_COMPONENTS = {
+    "mag": None,
+    "east": "model_east_vel_residual",
+    "north": "model_north_vel_residual",
+}
+REQUIRED_HEATMAP_COLS = {"model_east_vel_residual", "model_north_vel_residual"}
+
+# Pixels along the long side of the raster
+HEATMAP_SIZE = 512
+HEATMAP_PAD_DEG = 0.5
+HEATMAP_MAX_STATION_DEG = 1.0
+HEATMAP_NEIGHBORS = 8
+HEATMAP_POWER = 2.0
+# Pixels interpolated at once (bounds the distance matrix)
+_IDW_CHUNK = 2048
+_MAX_LAT = 85.0
+
+
+@dataclass(frozen=True)
+class RasterGrid:
+    """Pixel grid regular in Web Mercator, as deck.gl stretches its images."""
+
+    # Web Mercator bounds, meters
+    x_min: float
+    y_min: float
+    x_max: float
+    y_max: float
+    width: int
+    height: int
+
+    @property
+    def bounds(self):
+        """[west, south, east, north] in degrees."""
+        west, south = web_mercator_to_wgs84(self.x_min, self.y_min)
+        east, north = web_mercator_to_wgs84(self.x_max, self.y_max)
+        return [float(west), float(south), float(east), float(north)]
+
+    def pixel_centers(self):
+        """Lon/lat of the pixel centers, row by row from the north edge."""
+        x_step = (self.x_max - self.x_min) / self.width
+        y_step = (self.y_max - self.y_min) / self.height
+        x = self.x_min + (np.arange(self.width) + 0.5) * x_step
+        y = self.y_max - (np.arange(self.height) + 0.5) * y_step
+        lon, lat = web_mercator_to_wgs84(*np.meshgrid(x, y))
+        return lon.ravel(), lat.ravel()
+
+    def near(self, lon, lat, distance_deg):
+        """
+        (height, width) mask of the pixels that may lie within
+        ``distance_deg`` of a point: squares around each point, sized with the
+        Web Mercator scale at its latitude.
+        """
+        pixel = (self.x_max - self.x_min) / self.width
+        x, y = wgs84_to_web_mercator(np.asarray(lon), np.asarray(lat))
+        col = np.floor((x - self.x_min) / pixel).astype(np.int64)
+        row = np.floor((self.y_max - y) / pixel).astype(np.int64)
+        scale = 1.0 / np.cos(np.radians(np.minimum(np.abs(lat) + distance_deg, 89)))
+        radius = np.ceil(
+            WEB_MERCATOR_RADIUS * np.radians(distance_deg) * scale / pixel
+        ).astype(np.int64)
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        for c, r, d in zip(col, row, radius, strict=True):
+            mask[max(r - d, 0) : r + d + 1, max(c - d, 0) : c + d + 1] = True
+        return mask
+
+
+def raster_grid(lon, lat, size=HEATMAP_SIZE):
+    """:class:`RasterGrid` of square pixels covering the points, ``size`` across."""
+    lat_min = max(float(np.min(lat)) - HEATMAP_PAD_DEG, -_MAX_LAT)
+    lat_max = min(float(np.max(lat)) + HEATMAP_PAD_DEG, _MAX_LAT)
+    x_min, y_min = wgs84_to_web_mercator(float(np.min(lon)) - HEATMAP_PAD_DEG, lat_min)
+    x_max, y_max = wgs84_to_web_mercator(float(np.max(lon)) + HEATMAP_PAD_DEG, lat_max)
+    pixel = max(x_max - x_min, y_max - y_min) / size
+    return RasterGrid(
+        x_min=float(x_min),
+        y_min=float(y_min),
+        x_max=float(x_max),
+        y_max=float(y_max),
+        width=max(1, round((x_max - x_min) / pixel)),
+        height=max(1, round((y_max - y_min) / pixel)),
+    )
+
+
+def idw_interpolate(
+    lon,
+    lat,
+    station_lon,
+    station_lat,
+    values,
+    neighbors=HEATMAP_NEIGHBORS,
+    power=HEATMAP_POWER,
+    max_distance_deg=HEATMAP_MAX_STATION_DEG,
+):
+    """
+    Inverse distance weighted ``values`` (one per station) at ``lon``/``lat``,
+    from the ``neighbors`` nearest stations; NaN beyond ``max_distance_deg``
+    of every station. Distances are chords of the unit sphere.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    values = values[finite]
+    result = np.full(np.shape(lon), np.nan)
+    if not len(values):
+        return result
+
+    stations = np.column_stack(
+        sph2cart(np.asarray(station_lon)[finite], np.asarray(station_lat)[finite], 1.0)
+    )
+    points = np.column_stack(sph2cart(lon, lat, 1.0))
+    k = min(neighbors, len(values))
+    max_chord2 = (2.0 * np.sin(np.radians(max_distance_deg) / 2.0)) ** 2
+    for start in range(0, len(points), _IDW_CHUNK):
+        chord2 = np.maximum(
+            2.0 - 2.0 * (points[start : start + _IDW_CHUNK] @ stations.T), 0.0
+        )
+        near = np.flatnonzero(chord2.min(axis=1) <= max_chord2)
+        chord2 = chord2[near]
+        nearest = np.argpartition(chord2, k - 1, axis=1)[:, :k]
+        distance2 = np.take_along_axis(chord2, nearest, axis=1)
+        # 1 / d**power; a pixel on a station takes its value
+        weights = 1.0 / np.maximum(distance2, 1e-18) ** (power / 2.0)
+        result[start + near] = np.sum(weights * values[nearest], axis=1) / np.sum(
+            weights, axis=1
+        )
+    return result
+
+
+def station_raster_grid(data, size=HEATMAP_SIZE):
+    return raster_grid(data.station.lon, data.station.lat, size)
+
+
+def residual_raster(data, component="mag", grid=None):
+    """
+    Memoized (height, width) raster of a residual ``component`` of the
+    stations over ``grid`` (the dataset's own grid by default).
+    """
+    grid = station_raster_grid(data) if grid is None else grid
+
+    def _build():
+        station = data.station
+        column = RESIDUAL_COMPONENTS[component]
+        values = data.resmag if column is None else station[column].to_numpy()
+        station_lon = station.lon.to_numpy(dtype=float)
+        station_lat = station.lat.to_numpy(dtype=float)
+        # Most of a raster spanning a sparse network is empty; only the
+        # pixels around the stations are interpolated
+        near = grid.near(station_lon, station_lat, HEATMAP_MAX_STATION_DEG).ravel()
+        lon, lat = grid.pixel_centers()
+        raster = np.full(grid.height * grid.width, np.nan)
+        raster[near] = idw_interpolate(
+            lon[near], lat[near], station_lon, station_lat, values
+        )
+        return raster.reshape(grid.height, grid.width)
+
+    return data.derived.get(("residual_raster", component, grid), _build)
+
+
+def encode_png(rgba):
+    """PNG bytes of an (height, width, 4) uint8 image."""
+    height, width, _ = rgba.shape
+    # Every scanline starts with its filter type, 0 (none)
+    scanlines = np.zeros((height, 1 + 4 * width), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, -1)
+
+    def _chunk(tag, payload):
+        crc = zlib.crc32(tag + payload) & 0xFFFFFFFF
+        return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", crc)
+
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+            _chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 6)),
+            _chunk(b"IEND", b""),
+        )
+    )
+
+
+def png_data_url(rgba):
+    return "data:image/png;base64," + base64.b64encode(encode_png(rgba)).decode()
+
+
+def scalar_image(raster):
+    """
+    RGBA image of the raster values quantized in the red channel, opaque
+    where defined, and the ``[min, max]`` range the channel spans.
+    """
+    finite = np.isfinite(raster)
+    if finite.any():
+        low, high = float(raster[finite].min()), float(raster[finite].max())
+    else:
+        low, high = 0.0, 0.0
+    high = high if high > low else low + 1.0
+    rgba = np.zeros((*raster.shape, 4), dtype=np.uint8)
+    scaled = (np.where(finite, raster, low) - low) / (high - low)
+    rgba[..., 0] = np.round(255 * scaled).astype(np.uint8)
+    rgba[..., 3] = np.where(finite, 255, 0)
+    return rgba, [low, high]
+
+
+def color_image(raster, colormap):
+    """RGBA image of the raster colored through ``colormap``, for exports."""
+    finite = np.isfinite(raster)
+    palette = np.asarray(colormap.palette, dtype=np.uint8)
+    rgba = palette[colormap.index(raster)]
+    rgba[~finite] = 0
+    return rgba
+
+
+def raster_layers(prefix, raster, grid, colormap, folder_number, client_colors):
+    if not np.isfinite(raster).any():
+        return []
+    if client_colors:
+        rgba, raster_range = scalar_image(raster)
+        return bitmap_layers(
+            prefix,
+            png_data_url(rgba),
+            grid.bounds,
+            folder_number,
+            opacity=RES_HEATMAP_OPACITY,
+            colormap=colormap,
+            raster_range=raster_range,
+        )
+    return bitmap_layers(
+        prefix,
+        png_data_url(color_image(raster, colormap)),
+        grid.bounds,
+        folder_number,
+        opacity=RES_HEATMAP_OPACITY,
+    )
+
+
+def component_colormap(component):
+    return RES_MAG_COLORMAP if component == "mag" else RES_COMPONENT_COLORMAP
+
+
+def residual_heatmap_layers(folder_number, data, component, client_colors=True):
+    """Heatmap of a residual ``component`` of the stations of ``data``."""
+    return raster_layers(
+        f"res_heat_{component}",
+        residual_raster(data, component),
+        station_raster_grid(data),
+        component_colormap(component),
+        folder_number,
+        client_colors,
+    )
+
+
+def residual_heatmap_compare_layers(
+    right_dataset, left_dataset, component, client_colors=True
+):
+    """
+    Heatmap of the residual ``component`` of ``left_dataset`` minus that of
+    ``right_dataset`` (as the residual comparison), both interpolated onto the
+    grid covering their stations.
+    """
+    grid = raster_grid(
+        np.concatenate((right_dataset.station.lon, left_dataset.station.lon)),
+        np.concatenate((right_dataset.station.lat, left_dataset.station.lat)),
+    )
+    difference = residual_raster(left_dataset, component, grid) - residual_raster(
+        right_dataset, component, grid
+    )
+    return raster_layers(
+        f"res_heat_diff_{component}",
+        difference,
+        grid,
+        RES_DIFF_COLORMAP,
+        "compare",
+        client_colors,
+    )
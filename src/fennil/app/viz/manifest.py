@@ -0,0 +1,353 @@
+"""
+Specs of the fields shown in the drawer, keyed by the module implementing them.
+
+Building the UI only needs these specs. The field modules in ``fields/`` (and
+with them numpy, pandas and pydeck) are imported the first time a dataset is
+checked or drawn.
+"""
+
+from fennil.app.registry import FieldSpec
+
+FIELDS_PACKAGE = "fennil.app.viz.fields"
+
+MANIFEST = {
+    "locs": FieldSpec(
+        priority=0,
+        label="Locs",
+        icon="mdi-circle-medium",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "black",
+            "colors": [
+                (0, 0, 0, 220),
+                (0, 0, 0, 220),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "obs": FieldSpec(
+        priority=10,
+        label="Obs",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 0, 205, 1)",
+            "colors": [
+                (0, 0, 205, 255),
+                (0, 0, 205, 255),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "sig": FieldSpec(
+        priority=10,
+        label="Sig",
+        icon="mdi-ellipse-outline",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 0, 205, 1)",
+            "colors": [
+                (0, 0, 205, 200),
+                (0, 0, 205, 200),
+            ],
+        },
+    ),
+    "mod": FieldSpec(
+        priority=11,
+        label="Mod",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(205, 0, 0, 0.78)",
+            "colors": [
+                (205, 0, 0, 200),
+                (205, 0, 0, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "res": FieldSpec(
+        priority=12,
+        label="Res",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(205, 0, 205, 0.78)",
+            "colors": [
+                (205, 0, 205, 200),
+                (205, 0, 205, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "heat": FieldSpec(
+        priority=12,
+        label="Res heat",
+        icon="mdi-blur",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "Mag", "value": "mag"},
+            {"text": "E", "value": "east"},
+            {"text": "N", "value": "north"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(227, 26, 28, 0.78)",
+        },
+    ),
+    "rot": FieldSpec(
+        priority=13,
+        label="Rot",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 205, 0, 0.78)",
+            "colors": [
+                (0, 205, 0, 200),
+                (0, 205, 0, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "euler": FieldSpec(
+        priority=13,
+        label="Rot grid",
+        icon="mdi-grid",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 150, 0, 0.78)",
+            "colors": [
+                (0, 150, 0, 160),
+                (0, 120, 0, 160),
+            ],
+            "line_width": (1, 1),
+        },
+    ),
+    "seg": FieldSpec(
+        priority=14,
+        label="Seg",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 205, 205, 0.78)",
+            "colors": [
+                (0, 205, 205, 200),
+                (0, 205, 205, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "tri": FieldSpec(
+        priority=15,
+        label="Tri",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(205, 133, 0, 0.78)",
+            "colors": [
+                (205, 133, 0, 200),
+                (205, 133, 0, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "mog": FieldSpec(
+        priority=16,
+        label="Mog",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(128, 128, 128, 0.78)",
+            "colors": [
+                (128, 128, 128, 200),
+                (102, 102, 102, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "str": FieldSpec(
+        priority=16,
+        label="Str",
+        icon="mdi-vector-line",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(0, 128, 128, 0.78)",
+            "colors": [
+                (0, 128, 128, 200),
+                (0, 102, 102, 200),
+            ],
+            "line_width": (1, 2),
+        },
+    ),
+    "strain": FieldSpec(
+        priority=17,
+        label="Strain",
+        icon="mdi-triangle-outline",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "Obs", "value": "obs"},
+            {"text": "Mod", "value": "mod"},
+            {"text": "Res", "value": "res"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(214, 39, 40, 0.78)",
+        },
+    ),
+    "slip": FieldSpec(
+        priority=20,
+        label="Slip",
+        icon="mdi-chart-line-variant",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "SS", "value": "ss"},
+            {"text": "DS", "value": "ds"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "#1976D2",
+            "colors": [
+                (0, 0, 255, 255),
+                (0, 128, 0, 255),
+            ],
+            "line_width": (1, 1),
+        },
+    ),
+    "tde": FieldSpec(
+        priority=21,
+        label="TDE",
+        icon="mdi-texture-box",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "SS", "value": "ss"},
+            {"text": "DS", "value": "ds"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(14, 0, 214, 1)",
+        },
+    ),
+    "fault_proj": FieldSpec(
+        priority=30,
+        label="Fault Proj",
+        icon="mdi-bandage",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "colors": [
+                (128, 128, 128, 255),
+                (128, 128, 128, 255),
+            ],
+            "line_width": (1, 2),
+            "fill": [
+                (173, 216, 230, 77),
+                (144, 238, 144, 77),
+            ],
+            "line": [
+                (0, 0, 255, 255),
+                (0, 128, 0, 255),
+            ],
+        },
+    ),
+    "play": FieldSpec(
+        priority=40,
+        label="Playback",
+        icon="mdi-play-circle-outline",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "SS", "value": "ss"},
+            {"text": "DS", "value": "ds"},
+            {"text": "Res", "value": "res"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(255, 127, 14, 0.78)",
+        },
+    ),
+    "res_compare": FieldSpec(
+        priority=50,
+        label="Res compare",
+        icon="mdi-circle-multiple",
+        ui_type="VCheckbox",
+        options=None,
+        default=False,
+        styles={
+            "icon_color": "rgba(205, 0, 205, 0.78)",
+            "colors": [
+                (205, 0, 205, 200),
+                (205, 0, 205, 200),
+            ],
+            "line_width": (1, 2),
+        },
+        multiple=False,
+    ),
+    "heat_compare": FieldSpec(
+        priority=50,
+        label="Heat compare",
+        icon="mdi-blur-linear",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "Mag", "value": "mag"},
+            {"text": "E", "value": "east"},
+            {"text": "N", "value": "north"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(205, 0, 205, 0.78)",
+        },
+        multiple=False,
+    ),
+    "slip_compare": FieldSpec(
+        priority=51,
+        label="Slip compare",
+        icon="mdi-align-vertical-center",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "SS", "value": "ss"},
+            {"text": "DS", "value": "ds"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(44, 160, 44, 0.78)",
+        },
+        multiple=False,
+    ),
+    "tde_compare": FieldSpec(
+        priority=52,
+        label="TDE compare",
+        icon="mdi-texture-box",
+        ui_type="VBtnToggle",
+        options=[
+            {"text": "SS", "value": "ss"},
+            {"text": "DS", "value": "ds"},
+        ],
+        default=None,
+        styles={
+            "icon_color": "rgba(44, 160, 44, 0.78)",
+        },
+        multiple=False,
+    ),
+}
@@ -0,0 +1,121 @@
+"""
+Layers animated through the playback frames of a dataset (see app.playback).
+
+Geometry is sent once, with the values of every frame; fennil.js
+(FennilFrameLayer) colors and sizes the rows from the frame picked in the
+playback bar, so stepping through the runs never rebuilds the layers.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.deck.primitives import icon_layers, indexed_mesh_layers, path_layers
+
+from .faults import fault_line_dataframe
+from .res_compare import CIRCLE_ICON
+from .styles import (
+    PLAYBACK_STATION_SIZE_PIXELS,
+    RES_MAG_COLORMAP,
+    SLIP_COLORMAP,
+    SLIP_WIDTH_CAP_MM_PER_YR,
+    SLIP_WIDTH_MIN_PIXELS,
+    SLIP_WIDTH_SCALE,
+)
+from .tde import tde_mesh_payload
+
+# Field options, and the frame kinds each one animates
+PLAYBACK_OPTIONS = {
+    "ss": ("segment_ss", "tde_ss"),
+    "ds": ("segment_ds", "tde_ds"),
+    "res": ("resmag",),
+}
+
+
+def playback_frames(data, kind):
+    """Memoized frames payload of ``kind``."""
+    return data.derived.get(
+        ("playback_frames", data.playback.key, kind),
+        lambda: data.playback.payload(kind),
+    )
+
+
+def segment_frame_layers(folder_number, data, kind, velocity_scale):
+    paths = data.segment_paths
+    frames = data.playback.frames[kind]
+    paths_df = fault_line_dataframe(data, False, chained=True)
+    paths_df["frame_index"] = paths.vertex_values(np.arange(len(data.segment)))
+    # First frame, until fennil.js reads the current one
+    paths_df["color_value"] = paths.vertex_values(frames[0])
+    paths_df["line_width"] = paths.vertex_values(
+        np.minimum(np.abs(frames[0]), SLIP_WIDTH_CAP_MM_PER_YR)
+    )
+    return path_layers(
+        f"play_{kind}",
+        paths_df,
+        [255, 255, 255, 255],
+        "line_width",
+        folder_number,
+        width_min_pixels=SLIP_WIDTH_MIN_PIXELS,
+        width_scale=SLIP_WIDTH_SCALE * velocity_scale,
+        width_units="pixels",
+        colormap=SLIP_COLORMAP,
+        frames=playback_frames(data, kind),
+        width_cap=SLIP_WIDTH_CAP_MM_PER_YR,
+    )
+
+
+def tde_frame_layers(folder_number, data, kind, view_3d=False):
+    payload = tde_mesh_payload(data, view_3d)
+    frames = playback_frames(data, kind)
+    return indexed_mesh_layers(
+        f"play_{kind}",
+        {**payload, "key": f"{payload['key']}-{frames['key']}"},
+        [],
+        SLIP_COLORMAP,
+        folder_number,
+        frames=frames,
+    )
+
+
+def station_frame_layers(folder_number, data, kind):
+    station = data.station
+    stations_df = pd.DataFrame(
+        {
+            "lon": station.lon.to_numpy(),
+            "lat": station.lat.to_numpy(),
+            "icon": [CIRCLE_ICON] * len(station),
+            "color_value": data.playback.frames[kind][0],
+        }
+    )
+    return icon_layers(
+        f"play_{kind}",
+        stations_df,
+        get_position=["lon", "lat"],
+        get_icon="icon",
+        get_color=[255, 255, 255, 255],
+        get_size=PLAYBACK_STATION_SIZE_PIXELS,
+        folder_number=folder_number,
+        colormap=RES_MAG_COLORMAP,
+        frames=playback_frames(data, kind),
+    )
+
+
+def playback_layers(folder_number, data, option, velocity_scale, view_3d=False):
+    """
+    Surface (TDE) and line/point layers of the frames of a field ``option``
+    (see :data:`PLAYBACK_OPTIONS`), drawn on the geometry of ``data``.
+    """
+    velocity_scale = 1.0 if velocity_scale is None else float(velocity_scale)
+    surface, layers = [], []
+    for kind in PLAYBACK_OPTIONS.get(option, ()):
+        if kind not in data.playback.frames:
+            continue
+        if kind.startswith("tde_"):
+            surface.extend(tde_frame_layers(folder_number, data, kind, view_3d))
+        elif kind.startswith("segment_"):
+            layers.extend(
+                segment_frame_layers(folder_number, data, kind, velocity_scale)
+            )
+        else:
+            layers.extend(station_frame_layers(folder_number, data, kind))
+    return surface, layers
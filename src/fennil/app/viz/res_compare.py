@@ -6,12 +6,10 @@ import pandas as pd
 from fennil.app.deck.primitives import icon_layers
 
 from .styles import (
-    RDBU_11,
-    RES_COMPARE_DIFF_MAX,
-    RES_COMPARE_DIFF_MIN,
     RES_COMPARE_SIZE_SCALE,
     RES_COMPARE_UNIQUE_COLOR,
     RES_COMPARE_UNIQUE_SIZE_PIXELS,
+    RES_DIFF_COLORMAP,
 )
 
 CIRCLE_ICON = {
@@ -29,20 +27,6 @@ CIRCLE_ICON = {
 }
 
 
-def _map_residual_diff_colors(values):
-    colors = []
-    span = RES_COMPARE_DIFF_MAX - RES_COMPARE_DIFF_MIN
-    for raw_value in values:
-        value = raw_value if np.isfinite(raw_value) else 0.0
-        value = float(np.clip(value, RES_COMPARE_DIFF_MIN, RES_COMPARE_DIFF_MAX))
-        position = (value - RES_COMPARE_DIFF_MIN) / span
-        color_index = int(np.floor(position * len(RDBU_11)))
-        color_index = max(0, min(len(RDBU_11) - 1, color_index))
-        r, g, b = RDBU_11[color_index]
-        colors.append([r, g, b, 220])
-    return colors
-
-
 def _residual_station_data(dataset):
     return pd.DataFrame(
         {
@@ -53,7 +37,14 @@ def _residual_station_data(dataset):
     )
 
 
-def residual_compare_layers(right_dataset, left_dataset, velocity_scale):
+def residual_compare_layers(
+    right_dataset, left_dataset, velocity_scale, client_colors=False
+):
+    """
+    Residual magnitude differences at the stations of both datasets, and the
+    stations found in only one. With ``client_colors`` the differences are
+    colored on the client through :data:`RES_DIFF_COLORMAP`.
+    """
     right = _residual_station_data(right_dataset)
     left = _residual_station_data(left_dataset)
 
@@ -89,10 +80,15 @@ def residual_compare_layers(right_dataset, left_dataset, velocity_scale):
                 "lat": common["lat"].to_numpy(),
                 "res_mag_diff": res_mag_diff,
                 "size": sized_res_mag_diff,
-                "color": _map_residual_diff_colors(res_mag_diff),
                 "icon": [CIRCLE_ICON] * len(common),
             }
         )
+        if client_colors:
+            common_df["color_value"] = np.nan_to_num(res_mag_diff, nan=0.0)
+            color = [255, 255, 255, 255]
+        else:
+            common_df["color"] = RES_DIFF_COLORMAP.colors(res_mag_diff)
+            color = "color"
         common_df["tooltip"] = [
             f"<b>Resid. diff</b>: {value:.4f} mm/yr" for value in res_mag_diff
         ]
@@ -103,12 +99,13 @@ def residual_compare_layers(right_dataset, left_dataset, velocity_scale):
                 common_df,
                 get_position=["lon", "lat"],
                 get_icon="icon",
-                get_color="color",
+                get_color=color,
                 get_size="size",
                 folder_number="compare",
                 position_lon_key="lon",
                 size_min_pixels=0,
                 pickable=True,
+                colormap=RES_DIFF_COLORMAP if client_colors else None,
             )
         )
 
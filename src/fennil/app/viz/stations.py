@@ -3,7 +3,8 @@ import pandas as pd
 from fennil.app.deck.primitives import scatter_layers
 
 
-def station_layers(folder_number, station, color):
+def station_layers(folder_number, station, color, filters=None):
+    """Station dots; ``filters`` maps filter names to per-station values."""
     station_df = pd.DataFrame(
         {
             "lon": station.lon.to_numpy(),
@@ -12,6 +13,9 @@ def station_layers(folder_number, station, color):
         }
     )
     station_df["tooltip"] = [f"<b>Name</b>: {name}" for name in station_df["name"]]
+    filters = filters or {}
+    for name, values in filters.items():
+        station_df[f"filter_{name}"] = values
 
     return scatter_layers(
         "stations",
@@ -22,4 +26,5 @@ def station_layers(folder_number, station, color):
         radius_min_pixels=2,
         radius_max_pixels=5,
         pickable=True,
+        filters=tuple(filters),
     )
@@ -0,0 +1,287 @@
+"""
+Horizontal strain rates of the station velocities on a triangulation.
+
+The stations are triangulated once (Delaunay, in Web Mercator so small
+triangles keep their angles) and each triangle gets the gradient operator of
+a linear velocity field through its corners, stacked in one sparse matrix.
+The strain rates of any velocity pair (observed, modeled, residual) are then
+a single sparse product. Triangulating needs scipy (``fennil[strain]``).
+"""
+
+import hashlib
+import importlib.util
+from dataclasses import dataclass
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.deck.primitives import indexed_mesh_layers, line_layers, polygon_layers
+from fennil.app.geo_projs import RADIUS_EARTH, wgs84_to_web_mercator
+
+from .styles import (
+    STRAIN_AXIS_SCALE,
+    STRAIN_COLORMAP,
+    STRAIN_CONTRACTION_COLOR,
+    STRAIN_EXTENSION_COLOR,
+)
+
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+
+# Station velocity columns of each velocity source
+STRAIN_VELOCITIES = {
+    "obs": ("east_vel", "north_vel"),
+    "mod": ("model_east_vel", "model_north_vel"),
+    "res": ("model_east_vel_residual", "model_north_vel_residual"),
+}
+# Triangles spanning gaps in the network or too thin to resolve a gradient
+STRAIN_MAX_EDGE_KM = 250.0
+STRAIN_MIN_ANGLE_DEG = 10.0
+# (mm/yr) / km -> nanostrain/yr
+_NANOSTRAIN = 1.0e3
+_STRAIN_DECIMALS = 3
+
+
+@dataclass(frozen=True)
+class StrainOperator:
+    """Triangulation of a station set and its velocity gradient operator."""
+
+    triangles: np.ndarray  # (n_triangles, 3) station rows
+    centroid_lon: np.ndarray  # (n_triangles,)
+    centroid_lat: np.ndarray  # (n_triangles,)
+    # (2 * n_triangles, n_stations) sparse d/dx rows then d/dy rows, 1/km
+    gradient: object
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def strain_rates(self, east, north):
+        """:class:`StrainRates` of per-station velocities (mm/yr)."""
+        velocity = np.column_stack((east, north)).astype(float)
+        du = _NANOSTRAIN * (self.gradient @ velocity)
+        n = len(self)
+        east_x, north_x = du[:n, 0], du[:n, 1]
+        east_y, north_y = du[n:, 0], du[n:, 1]
+        return StrainRates(east_x, north_y, 0.5 * (east_y + north_x))
+
+
+@dataclass(frozen=True)
+class StrainRates:
+    """Horizontal strain rate tensor per triangle, nanostrain/yr."""
+
+    exx: np.ndarray
+    eyy: np.ndarray
+    exy: np.ndarray
+
+    @property
+    def dilatation(self):
+        return self.exx + self.eyy
+
+    def principal(self):
+        """
+        Most extensional and most contractional rates, and the direction of
+        the first (degrees counter-clockwise from east).
+        """
+        mean = (self.exx + self.eyy) / 2
+        radius = np.hypot((self.exx - self.eyy) / 2, self.exy)
+        angle = np.degrees(0.5 * np.arctan2(2 * self.exy, self.exx - self.eyy))
+        return mean + radius, mean - radius, angle
+
+
+def triangle_gradients(x, y, triangles):
+    """
+    Coefficients of the x and y derivatives of the linear interpolant on each
+    triangle: ``d/dx = sum(dx[t, i] * value[triangles[t, i]])``.
+    """
+    x0, x1, x2 = (x[triangles[:, i]] for i in range(3))
+    y0, y1, y2 = (y[triangles[:, i]] for i in range(3))
+    area2 = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    dx = np.column_stack((y1 - y2, y2 - y0, y0 - y1)) / area2[:, None]
+    dy = np.column_stack((x2 - x1, x0 - x2, x1 - x0)) / area2[:, None]
+    return dx, dy
+
+
+def _well_shaped(x, y, triangles):
+    """Triangles with short enough edges and wide enough angles."""
+    corners = np.stack((x[triangles], y[triangles]), axis=-1)
+    edges = np.linalg.norm(corners - np.roll(corners, -1, axis=1), axis=-1)
+    # The smallest angle faces the shortest edge
+    shortest, middle, longest = np.sort(edges, axis=1).T
+    cosine = (middle**2 + longest**2 - shortest**2) / np.maximum(
+        2 * middle * longest, 1e-12
+    )
+    angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    return (longest <= STRAIN_MAX_EDGE_KM) & (angle >= STRAIN_MIN_ANGLE_DEG)
+
+
+def build_strain_operator(lon, lat):
+    """:class:`StrainOperator` of the stations at ``lon``/``lat``."""
+    from scipy.sparse import csr_matrix
+    from scipy.spatial import Delaunay, QhullError
+
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    try:
+        points = np.column_stack(wgs84_to_web_mercator(lon, lat))
+        triangles = Delaunay(points).simplices
+    except QhullError:
+        # Collinear or coincident stations (e.g. a small isolated block)
+        triangles = np.empty((0, 3), dtype=int)
+
+    # Local east/north km around each triangle centroid
+    centroid_lon = lon[triangles].mean(axis=1)
+    centroid_lat = lat[triangles].mean(axis=1)
+    km_per_degree = np.radians(RADIUS_EARTH) / 1.0e3
+    x = km_per_degree * (lon[triangles] - centroid_lon[:, None])
+    x *= np.cos(np.radians(centroid_lat))[:, None]
+    y = km_per_degree * (lat[triangles] - centroid_lat[:, None])
+    local = np.arange(3 * len(triangles)).reshape(-1, 3)
+    keep = _well_shaped(x.ravel(), y.ravel(), local)
+
+    triangles = triangles[keep]
+    dx, dy = triangle_gradients(x[keep].ravel(), y[keep].ravel(), local[: keep.sum()])
+    n = len(triangles)
+    rows = np.repeat(np.arange(2 * n), 3)
+    gradient = csr_matrix(
+        (
+            np.concatenate((dx.ravel(), dy.ravel())),
+            (rows, np.tile(triangles.ravel(), 2)),
+        ),
+        shape=(2 * n, len(lon)),
+    )
+    return StrainOperator(
+        triangles=triangles,
+        centroid_lon=centroid_lon[keep],
+        centroid_lat=centroid_lat[keep],
+        gradient=gradient,
+    )
+
+
+def strain_operator(data):
+    """Memoized :class:`StrainOperator` of the dataset stations."""
+    station = data.station
+    return data.derived.get(
+        ("strain_operator",),
+        lambda: build_strain_operator(station.lon, station.lat),
+    )
+
+
+def strain_rates(data, source):
+    """Memoized :class:`StrainRates` of a :data:`STRAIN_VELOCITIES` source."""
+
+    def _build():
+        east, north = STRAIN_VELOCITIES[source]
+        return strain_operator(data).strain_rates(
+            data.station[east].to_numpy(), data.station[north].to_numpy()
+        )
+
+    return data.derived.get(("strain_rates", source), _build)
+
+
+def strain_mesh_payload(data):
+    """Flat positions/triangles lists of the triangulation, built once."""
+
+    def _build():
+        station = data.station
+        positions = np.column_stack((station.lon, station.lat))
+        return {
+            "key": uuid4().hex,
+            "positions": positions.ravel().tolist(),
+            "triangles": strain_operator(data).triangles.ravel().tolist(),
+        }
+
+    return data.derived.get(("strain_mesh_payload",), _build)
+
+
+def strain_axes_dataframe(operator, rates, velocity_scale):
+    """Principal axes as segments centered on the triangles, colored by sign."""
+    first, second, angle = rates.principal()
+    rows = []
+    for values, direction in ((first, angle), (second, angle + 90.0)):
+        half = 0.5 * STRAIN_AXIS_SCALE * velocity_scale * np.abs(values)
+        theta = np.radians(direction)
+        dlat = np.degrees(half * np.sin(theta) / RADIUS_EARTH)
+        dlon = np.degrees(
+            half
+            * np.cos(theta)
+            / (RADIUS_EARTH * np.cos(np.radians(operator.centroid_lat)))
+        )
+        rows.append(
+            pd.DataFrame(
+                {
+                    "start_lon": operator.centroid_lon - dlon,
+                    "start_lat": operator.centroid_lat - dlat,
+                    "end_lon": operator.centroid_lon + dlon,
+                    "end_lat": operator.centroid_lat + dlat,
+                    "color": [
+                        STRAIN_EXTENSION_COLOR
+                        if value > 0
+                        else STRAIN_CONTRACTION_COLOR
+                        for value in values
+                    ],
+                }
+            )
+        )
+    axes = pd.concat(rows, ignore_index=True)
+    return axes[np.isfinite(axes[["start_lon", "end_lon"]]).all(axis=1)]
+
+
+def strain_rate_layers(folder_number, data, source, velocity_scale, client_layers=True):
+    """
+    Triangles colored by dilatation rate, and the principal strain rate axes
+    at their centroids (``velocity_scale`` scales them like the vectors).
+    Returns the surface and line layers separately.
+    """
+    operator = strain_operator(data)
+    if not len(operator):
+        return [], []
+    rates = strain_rates(data, source)
+    dilatation = np.round(np.nan_to_num(rates.dilatation, nan=0.0), _STRAIN_DECIMALS)
+    velocity_scale = 1.0 if velocity_scale is None else float(velocity_scale)
+
+    if client_layers:
+        payload = strain_mesh_payload(data)
+        digest = hashlib.blake2b(dilatation.tobytes(), digest_size=8).hexdigest()
+        surface = indexed_mesh_layers(
+            f"strain_{source}",
+            {**payload, "key": f"{payload['key']}-{digest}"},
+            dilatation.tolist(),
+            STRAIN_COLORMAP,
+            folder_number,
+        )
+    else:
+        station = data.station
+        corners = np.stack(
+            (
+                station.lon.to_numpy()[operator.triangles],
+                station.lat.to_numpy()[operator.triangles],
+            ),
+            axis=-1,
+        )
+        surface = polygon_layers(
+            f"strain_{source}",
+            pd.DataFrame(
+                {
+                    "polygon": corners.tolist(),
+                    "color": STRAIN_COLORMAP.colors(dilatation),
+                }
+            ),
+            "color",
+            [0, 0, 0, 0],
+            0,
+            folder_number,
+            line_width_min_pixels=0,
+            stroked=False,
+            pickable=False,
+        )
+
+    axes = line_layers(
+        f"strain_axes_{source}",
+        strain_axes_dataframe(operator, rates, velocity_scale),
+        "color",
+        1,
+        folder_number,
+        width_min_pixels=1,
+        pickable=False,
+    )
+    return surface, axes
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 import numpy as np
 
 VELOCITY_SCALE = 1000
@@ -5,20 +7,31 @@ VECTOR_ARROW_SIZE_FACTOR = 6
 VECTOR_ARROW_MIN_PIXELS = 8
 VECTOR_ARROW_MAX_PIXELS = 28
 
+# Station uncertainty ellipses: axes in standard deviations, fill alpha of the
+# field color and vertices of the polygons drawn without fennil.js
+ELLIPSE_SIGMA = 1.0
+ELLIPSE_FILL_ALPHA = 40
+ELLIPSE_POLYGON_POINTS = 32
+
 RES_COMPARE_SIZE_SCALE = VELOCITY_SCALE / 400.0
 RES_COMPARE_DIFF_MIN = -5.0
 RES_COMPARE_DIFF_MAX = 5.0
 RES_COMPARE_UNIQUE_SIZE_PIXELS = 15.0
+# Stations colored by residual magnitude during playback
+PLAYBACK_STATION_SIZE_PIXELS = 10.0
 RES_COMPARE_UNIQUE_COLOR = [0, 0, 0, 220]
 
+# Principal strain rate axes: meters per nanostrain/yr, extension and
+# contraction colors
+STRAIN_AXIS_SCALE = 200.0
+STRAIN_EXTENSION_COLOR = [214, 39, 40, 220]
+STRAIN_CONTRACTION_COLOR = [33, 102, 172, 220]
+STRAIN_RATE_MAX = 200.0
+
 FAULT_PROJ_LINE_WIDTH = 1
 SLIP_WIDTH_SCALE = 0.05
 SLIP_WIDTH_MIN_PIXELS = 1
 SLIP_WIDTH_CAP_MM_PER_YR = 400.0
-SLIP_NEGATIVE_COLOR = [31, 119, 180, 220]  # tab:blue
-SLIP_POSITIVE_COLOR = [255, 127, 14, 220]  # tab:orange
-SLIP_NEGATIVE_EXTREME_COLOR = [25, 230, 255, 220]  # bright blue
-SLIP_POSITIVE_EXTREME_COLOR = [255, 40, 40, 220]  # bright red
 
 SLIP_COMPARE_MATCH_TOL_DEG = 1.0e-4
 SLIP_COMPARE_WIDTH_SCALE = SLIP_WIDTH_SCALE * 128
@@ -26,6 +39,7 @@ SLIP_COMPARE_WIDTH_MIN_PIXELS = 1
 SLIP_COMPARE_FASTER_COLOR = [44, 160, 44, 220]  # green
 SLIP_COMPARE_SLOWER_COLOR = [214, 39, 40, 220]  # red
 SLIP_COMPARE_NEUTRAL_COLOR = [140, 140, 140, 220]
+SLIP_DIFF_MAX = 20.0
 
 
 # ColorBrewer RdBu[11] palette for discrete slip-rate coloring
@@ -42,6 +56,18 @@ RDBU_11 = [
     (33, 102, 172),
     (5, 48, 97),
 ]
+# ColorBrewer YlOrRd[9] palette for residual magnitudes
+YLORRD_9 = [
+    (255, 255, 204),
+    (255, 237, 160),
+    (254, 217, 118),
+    (254, 178, 76),
+    (253, 141, 60),
+    (252, 78, 42),
+    (227, 26, 28),
+    (189, 0, 38),
+    (128, 0, 38),
+]
 RED = [255, 0, 0, 255]
 BLACK = [0, 0, 0, 255]
 
@@ -49,18 +75,95 @@ SLIP_RATE_MIN = -100.0
 SLIP_RATE_MAX = 100.0
 
 
-def map_slip_colors(values):
-    """Map slip values to discrete RdBu[11] colors."""
-    colors_array = []
-    span = SLIP_RATE_MAX - SLIP_RATE_MIN
-    for raw_value in values:
-        value = raw_value
-        if not np.isfinite(value):
-            value = 0.0
-        value = float(np.clip(value, SLIP_RATE_MIN, SLIP_RATE_MAX))
-        position = (value - SLIP_RATE_MIN) / span
-        index = int(np.floor(position * len(RDBU_11)))
-        index = max(0, min(len(RDBU_11) - 1, index))
-        r, g, b = RDBU_11[index]
-        colors_array.append([r, g, b, 255])
-    return colors_array
+RES_HEATMAP_MAX = 5.0
+RES_HEATMAP_OPACITY = 0.7
+
+SLIP_PALETTE = [[r, g, b, 255] for r, g, b in RDBU_11]
+RES_DIFF_PALETTE = [[r, g, b, 220] for r, g, b in RDBU_11]
+RES_MAG_PALETTE = [[r, g, b, 255] for r, g, b in YLORRD_9]
+RES_COMPONENT_PALETTE = [[r, g, b, 255] for r, g, b in RDBU_11]
+# Contraction blue, extension red
+STRAIN_PALETTE = [[r, g, b, 160] for r, g, b in reversed(RDBU_11)]
+
+
+@dataclass(frozen=True)
+class Colormap:
+    """
+    Discrete palette spread over ``[vmin, vmax]``, values outside are clamped.
+
+    fennil.js applies it on the GPU to the scalar values of the layers, with
+    the range of the footer legend; :meth:`colors` bakes it for exports.
+    """
+
+    name: str
+    label: str
+    unit: str
+    palette: list
+    vmin: float
+    vmax: float
+
+    def index(self, values):
+        """Palette index of each value (non-finite -> 0)."""
+        values = np.asarray(values, dtype=float)
+        values = np.where(np.isfinite(values), values, 0.0)
+        values = np.clip(values, self.vmin, self.vmax)
+        position = (values - self.vmin) / (self.vmax - self.vmin)
+        index = np.floor(position * len(self.palette)).astype(int)
+        return np.clip(index, 0, len(self.palette) - 1)
+
+    def colors(self, values):
+        return [self.palette[index] for index in self.index(values)]
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "unit": self.unit,
+            "palette": self.palette,
+            "range": [self.vmin, self.vmax],
+        }
+
+
+SLIP_COLORMAP = Colormap(
+    "slip", "Slip rate", "mm/yr", SLIP_PALETTE, SLIP_RATE_MIN, SLIP_RATE_MAX
+)
+SLIP_DIFF_COLORMAP = Colormap(
+    "slip_diff", "Slip diff.", "mm/yr", SLIP_PALETTE, -SLIP_DIFF_MAX, SLIP_DIFF_MAX
+)
+RES_DIFF_COLORMAP = Colormap(
+    "res_diff",
+    "Resid. diff.",
+    "mm/yr",
+    RES_DIFF_PALETTE,
+    RES_COMPARE_DIFF_MIN,
+    RES_COMPARE_DIFF_MAX,
+)
+RES_MAG_COLORMAP = Colormap(
+    "res_mag", "Resid. mag.", "mm/yr", RES_MAG_PALETTE, 0.0, RES_HEATMAP_MAX
+)
+RES_COMPONENT_COLORMAP = Colormap(
+    "res_component",
+    "Resid. E/N",
+    "mm/yr",
+    RES_COMPONENT_PALETTE,
+    -RES_HEATMAP_MAX,
+    RES_HEATMAP_MAX,
+)
+STRAIN_COLORMAP = Colormap(
+    "strain",
+    "Dilatation",
+    "nstrain/yr",
+    STRAIN_PALETTE,
+    -STRAIN_RATE_MAX,
+    STRAIN_RATE_MAX,
+)
+COLORMAPS = {
+    cmap.name: cmap
+    for cmap in (
+        SLIP_COLORMAP,
+        SLIP_DIFF_COLORMAP,
+        RES_DIFF_COLORMAP,
+        RES_MAG_COLORMAP,
+        RES_COMPONENT_COLORMAP,
+        STRAIN_COLORMAP,
+    )
+}
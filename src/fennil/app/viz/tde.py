@@ -1,13 +1,77 @@
-from fennil.app.deck.primitives import line_layers, polygon_layers
+import hashlib
+from uuid import uuid4
 
-from .styles import BLACK, RED, map_slip_colors
+import numpy as np
+import pandas as pd
 
+from fennil.app.deck.primitives import (
+    indexed_mesh_layers,
+    line_layers,
+    polygon_layers,
+)
 
-def tde_mesh_layers(folder_number, tde_df, slip_values):
-    if tde_df is None or tde_df.empty:
+from .styles import BLACK, RED, SLIP_COLORMAP
+
+# Vertex positions are rounded to ~0.1 m and depths to 1 m before they are sent
+# to the client.
+TDE_POSITION_DECIMALS = 6
+TDE_DEPTH_DECIMALS = 3
+# Slip rates (mm/yr) are colored on the client, 0.001 mm/yr is plenty
+TDE_VALUE_DECIMALS = 3
+
+
+def tde_mesh_payload(data, view_3d=False):
+    """
+    Flat positions/triangles lists of the dataset's TDE mesh, built once per view.
+
+    The 2D payload uses the horizontally projected positions of steep meshes;
+    the 3D one keeps the true surface positions and adds per-vertex depths (km).
+    ``key`` identifies the geometry so the client only builds its buffers once.
+    """
+
+    def _build():
+        mesh = data.tde_mesh
+        payload = {
+            "key": uuid4().hex,
+            "positions": np.round(
+                mesh.positions(projected=not view_3d), TDE_POSITION_DECIMALS
+            ).tolist(),
+            "triangles": mesh.triangles.ravel().tolist(),
+        }
+        if view_3d:
+            payload["depths"] = np.round(mesh.dep, TDE_DEPTH_DECIMALS).tolist()
+        return payload
+
+    return data.derived.get(("tde_mesh_payload", view_3d), _build)
+
+
+def tde_mesh_layers(folder_number, data, slip_kind, indexed=True, view_3d=False):
+    mesh = data.tde_mesh
+    if mesh is None or mesh.empty:
         return []
-    tde_df = tde_df.copy()
-    tde_df["color"] = map_slip_colors(slip_values)
+    slip = mesh.slip(slip_kind)
+    if indexed:
+        payload = tde_mesh_payload(data, view_3d)
+        values = np.round(
+            np.nan_to_num(np.asarray(slip, dtype=float), nan=0.0), TDE_VALUE_DECIMALS
+        )
+        # Values are baked into the client buffers, the key follows them too
+        digest = hashlib.blake2b(values.tobytes(), digest_size=8).hexdigest()
+        return indexed_mesh_layers(
+            "tde",
+            {**payload, "key": f"{payload['key']}-{digest}"},
+            values.tolist(),
+            SLIP_COLORMAP,
+            folder_number,
+        )
+
+    # Plain polygons, for consumers without fennil.js (standalone HTML export).
+    tde_df = pd.DataFrame(
+        {
+            "polygon": mesh.polygons(),
+            "color": SLIP_COLORMAP.colors(slip),
+        }
+    )
     return polygon_layers(
         "tde",
         tde_df,
@@ -0,0 +1,213 @@
+"""
+TDE slip rate differences between two runs.
+
+Triangles of the first run are matched to the second run's: identical
+triangles through a hash of their quantized corners, the others to the
+second run triangle with the nearest centroid (within
+:data:`TDE_COMPARE_MAX_DISTANCE_KM`), so runs with different mesh files
+still compare. Match tables are memoized per pair of meshes.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.deck.primitives import indexed_mesh_layers, polygon_layers
+from fennil.app.geo_projs import RADIUS_EARTH, sph2cart
+
+from .styles import SLIP_DIFF_COLORMAP
+from .tde import TDE_VALUE_DECIMALS, tde_mesh_payload
+
+# Corners closer than this are the same vertex
+TDE_COMPARE_MATCH_TOL_DEG = 1.0e-4
+TDE_COMPARE_MATCH_TOL_KM = 1.0e-3
+# Farther centroids do not resample each other
+TDE_COMPARE_MAX_DISTANCE_KM = 20.0
+# Triangles matched to the other mesh at once (bounds the distance matrix)
+_NEAREST_CHUNK = 1024
+# Odd multipliers mixing the quantized coordinates into 64-bit keys
+_COORD_MIX = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64
+)
+_CORNER_MIX = np.array(
+    [0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB], dtype=np.uint64
+)
+
+
+@dataclass(frozen=True)
+class TriangleKeys:
+    """Hash and centroid of each triangle of a mesh."""
+
+    hashes: np.ndarray  # (n_triangles,) uint64, independent of corner order
+    centroids: np.ndarray  # (n_triangles, 3) Cartesian km
+    digest: str  # of the whole geometry
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+@dataclass(frozen=True)
+class TdeMatch:
+    """Triangle of the other mesh matched to each triangle, -1 for none."""
+
+    source: np.ndarray  # (n_triangles,)
+    identical: np.ndarray  # (n_triangles,) bool
+
+    @property
+    def matched(self):
+        return self.source >= 0
+
+
+def triangle_hashes(lon, lat, dep):
+    """
+    uint64 hash of each triangle of (n_triangles, 3) corner coordinates,
+    quantized to the match tolerances, whatever the order of its corners.
+    """
+    quantized = np.stack(
+        (
+            np.rint(np.asarray(lon) / TDE_COMPARE_MATCH_TOL_DEG),
+            np.rint(np.asarray(lat) / TDE_COMPARE_MATCH_TOL_DEG),
+            np.rint(np.asarray(dep) / TDE_COMPARE_MATCH_TOL_KM),
+        ),
+        axis=-1,
+    ).astype(np.int64)
+    # Wrapping uint64 arithmetic, one key per corner then per triangle
+    corners = np.bitwise_xor.reduce(quantized.view(np.uint64) * _COORD_MIX, axis=-1)
+    corners = np.sort(corners, axis=1)
+    return np.bitwise_xor.reduce(corners * _CORNER_MIX, axis=1)
+
+
+def triangle_keys(lon, lat, dep):
+    """:class:`TriangleKeys` of (n_triangles, 3) corner coordinates."""
+    hashes = triangle_hashes(lon, lat, dep)
+    centroids = np.column_stack(
+        sph2cart(
+            lon.mean(axis=1),
+            lat.mean(axis=1),
+            RADIUS_EARTH / 1.0e3 + dep.mean(axis=1),
+        )
+    )
+    digest = hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+    return TriangleKeys(hashes=hashes, centroids=centroids, digest=digest)
+
+
+def tde_triangle_keys(data):
+    """Memoized :class:`TriangleKeys` of the dataset TDE mesh."""
+
+    def _build():
+        mesh = data.tde_mesh
+        return triangle_keys(
+            mesh.source_lon[mesh.triangles],
+            mesh.source_lat[mesh.triangles],
+            mesh.dep[mesh.triangles],
+        )
+
+    return data.derived.get(("tde_compare_keys",), _build)
+
+
+def nearest_centroids(points, centroids):
+    """Index of the nearest of ``centroids`` to each point, and its distance."""
+    # Centered so the expanded squared distances keep their precision
+    origin = centroids.mean(axis=0)
+    points = points - origin
+    centroids = centroids - origin
+    norms = np.sum(centroids**2, axis=1)
+    nearest = np.empty(len(points), dtype=np.int64)
+    distance2 = np.empty(len(points))
+    for start in range(0, len(points), _NEAREST_CHUNK):
+        chunk = points[start : start + _NEAREST_CHUNK]
+        d2 = norms - 2.0 * (chunk @ centroids.T)
+        index = np.argmin(d2, axis=1)
+        nearest[start : start + len(chunk)] = index
+        distance2[start : start + len(chunk)] = d2[
+            np.arange(len(chunk)), index
+        ] + np.sum(chunk**2, axis=1)
+    return nearest, np.sqrt(np.maximum(distance2, 0.0))
+
+
+def match_triangles(keys, other):
+    """:class:`TdeMatch` of the ``keys`` triangles in the ``other`` mesh."""
+    source = np.full(len(keys), -1, dtype=np.int64)
+    identical = np.zeros(len(keys), dtype=bool)
+    if not len(other):
+        return TdeMatch(source=source, identical=identical)
+
+    order = np.argsort(other.hashes, kind="stable")
+    sorted_hashes = other.hashes[order]
+    positions = np.minimum(np.searchsorted(sorted_hashes, keys.hashes), len(other) - 1)
+    identical = sorted_hashes[positions] == keys.hashes
+    source[identical] = order[positions[identical]]
+
+    rest = np.flatnonzero(~identical)
+    if len(rest):
+        nearest, distance = nearest_centroids(keys.centroids[rest], other.centroids)
+        source[rest] = np.where(distance <= TDE_COMPARE_MAX_DISTANCE_KM, nearest, -1)
+    return TdeMatch(source=source, identical=identical)
+
+
+def tde_match(right_dataset, left_dataset):
+    """
+    Memoized :class:`TdeMatch` of the ``right_dataset`` triangles in the
+    ``left_dataset`` mesh, cached with the first keyed by the second geometry.
+    """
+    other = tde_triangle_keys(left_dataset)
+    return right_dataset.derived.get(
+        ("tde_match", other.digest),
+        lambda: match_triangles(tde_triangle_keys(right_dataset), other),
+    )
+
+
+def tde_compare_layers(
+    right_dataset, left_dataset, slip_kind, client_colors=True, view_3d=False
+):
+    """
+    Slip rate of the second run minus the first on the first run triangles
+    (as the slip comparison), drawn where a match was found.
+    """
+    right = right_dataset.tde_mesh
+    left = left_dataset.tde_mesh
+    if right is None or left is None or right.empty or left.empty:
+        return []
+    match = tde_match(right_dataset, left_dataset)
+    matched = match.matched
+    if not matched.any():
+        return []
+    diff = left.slip(slip_kind)[match.source[matched]] - right.slip(slip_kind)[matched]
+    diff = np.round(np.nan_to_num(diff, nan=0.0), TDE_VALUE_DECIMALS)
+
+    if client_colors:
+        payload = tde_mesh_payload(right_dataset, view_3d)
+        triangles = right.triangles[matched]
+        digest = hashlib.blake2b(
+            triangles.tobytes() + diff.tobytes(), digest_size=8
+        ).hexdigest()
+        return indexed_mesh_layers(
+            "tde_compare",
+            {
+                **payload,
+                "key": f"{payload['key']}-compare-{digest}",
+                "triangles": triangles.ravel().tolist(),
+            },
+            diff.tolist(),
+            SLIP_DIFF_COLORMAP,
+            "compare",
+        )
+
+    corners = np.stack(
+        (right.lon[right.triangles[matched]], right.lat[right.triangles[matched]]), -1
+    )
+    return polygon_layers(
+        "tde_compare",
+        pd.DataFrame(
+            {"polygon": corners.tolist(), "color": SLIP_DIFF_COLORMAP.colors(diff)}
+        ),
+        "color",
+        [0, 0, 0, 0],
+        0,
+        "compare",
+        line_width_min_pixels=0,
+        stroked=False,
+        pickable=False,
+    )
@@ -1,11 +1,17 @@
+from dataclasses import dataclass
 from urllib.parse import quote
 
 import numpy as np
 import pandas as pd
 
 from fennil.app.deck.primitives import icon_layers, line_layers
-from fennil.app.geo_projs import normalize_longitude_difference, web_mercator_to_wgs84
+from fennil.app.geo_projs import (
+    WEB_MERCATOR_RADIUS,
+    normalize_longitude_difference,
+    web_mercator_y_to_latitude,
+)
 
+from .filters import station_filter_values
 from .styles import (
     VECTOR_ARROW_MAX_PIXELS,
     VECTOR_ARROW_MIN_PIXELS,
@@ -27,32 +33,130 @@ ARROW_ICON = {
 }
 
 
+@dataclass(frozen=True)
+class VectorGeometry:
+    """Scale-independent part of a vector field anchored at fixed points."""
+
+    start_lon: np.ndarray
+    start_lat: np.ndarray
+    start_y: np.ndarray
+    # Endpoint offsets for velocity_scale == 1, in degrees of longitude and
+    # Web Mercator meters respectively.
+    unit_lon: np.ndarray
+    unit_y: np.ndarray
+    magnitude: np.ndarray
+    angle: np.ndarray
+    arrow_mask: np.ndarray
+
+    def endpoints(self, velocity_scale):
+        # Longitude is linear in Web Mercator x, so it is a plain multiply-add;
+        # latitude still needs the inverse projection of the scaled y.
+        end_lon = normalize_longitude_difference(
+            self.start_lon, self.start_lon + velocity_scale * self.unit_lon
+        )
+        end_lat = web_mercator_y_to_latitude(
+            self.start_y + velocity_scale * self.unit_y
+        )
+        return end_lon, end_lat
+
+
+def build_vector_geometry(lon, lat, y, east_component, north_component):
+    east_component = np.asarray(east_component)
+    north_component = np.asarray(north_component)
+
+    unit_x = VELOCITY_SCALE * east_component
+    unit_lon = np.rad2deg(unit_x / WEB_MERCATOR_RADIUS)
+
+    magnitude = np.hypot(east_component, north_component)
+    # IconLayer rotation is counter-clockwise; convert from clockwise bearing.
+    angle = -np.degrees(np.arctan2(east_component, north_component)) % 360.0
+
+    return VectorGeometry(
+        start_lon=np.asarray(lon),
+        start_lat=np.asarray(lat),
+        start_y=np.asarray(y),
+        unit_lon=unit_lon,
+        unit_y=VELOCITY_SCALE * north_component,
+        magnitude=magnitude,
+        angle=angle,
+        arrow_mask=np.isfinite(magnitude) & (magnitude > 0),
+    )
+
+
+def station_vector_geometry(data, east_key, north_key):
+    """Memoized unit-scale geometry for a pair of station velocity columns."""
+
+    def _build():
+        return build_vector_geometry(
+            data.station.lon.to_numpy(),
+            data.station.lat.to_numpy(),
+            data.y_station,
+            data.station[east_key].to_numpy(),
+            data.station[north_key].to_numpy(),
+        )
+
+    return data.derived.get(("vector_geometry", east_key, north_key), _build)
+
+
+def station_vector_endpoints(data, east_key, north_key, velocity_scale):
+    """Memoized vector tips for one velocity scale."""
+    geometry = station_vector_geometry(data, east_key, north_key)
+    return data.derived.get(
+        ("vector_endpoints", east_key, north_key, float(velocity_scale)),
+        lambda: geometry.endpoints(velocity_scale),
+    )
+
+
 def velocity_layers(
     layer_id_prefix,
-    station,
-    x_station,
-    y_station,
-    east_component,
-    north_component,
+    data,
+    east_key,
+    north_key,
     base_color,
     line_width,
     folder_number,
     velocity_scale,
+    filtered=False,
 ):
-    """Build velocity lines and matching arrowhead tips (including -360 duplicates)."""
-    x_station = np.asarray(x_station)
-    y_station = np.asarray(y_station)
-    east_component = np.asarray(east_component)
-    north_component = np.asarray(north_component)
+    """
+    Build velocity lines and matching arrowhead tips (including -360
+    duplicates); ``filtered`` ones carry the station filter values.
+    """
+    geometry = station_vector_geometry(data, east_key, north_key)
+    end_lon, end_lat = station_vector_endpoints(
+        data, east_key, north_key, velocity_scale
+    )
+    return vector_layers(
+        layer_id_prefix,
+        geometry,
+        end_lon,
+        end_lat,
+        base_color,
+        line_width,
+        folder_number,
+        filters=station_filter_values(data) if filtered else None,
+    )
 
-    start_lon = station.lon.to_numpy()
-    start_lat = station.lat.to_numpy()
 
-    scale = velocity_scale * VELOCITY_SCALE
-    x_end = x_station + scale * east_component
-    y_end = y_station + scale * north_component
-    end_lon, end_lat = web_mercator_to_wgs84(x_end, y_end)
-    end_lon = normalize_longitude_difference(start_lon, end_lon)
+def vector_layers(
+    layer_id_prefix,
+    geometry,
+    end_lon,
+    end_lat,
+    base_color,
+    line_width,
+    folder_number,
+    filters=None,
+    levels=None,
+    level_zoom=None,
+):
+    """
+    ``filters`` maps filter names to per-vector values (see viz.filters);
+    ``levels`` holds per-vector zoom levels, shown from zoom
+    ``level_zoom + level`` on (see deck.primitives.level_layer).
+    """
+    start_lon = geometry.start_lon
+    start_lat = geometry.start_lat
 
     base_df = pd.DataFrame(
         {
@@ -62,6 +166,11 @@ def velocity_layers(
             "end_lat": end_lat,
         }
     )
+    filters = filters or {}
+    for name, values in filters.items():
+        base_df[f"filter_{name}"] = values
+    if levels is not None:
+        base_df["level"] = levels
     layers = line_layers(
         layer_id_prefix,
         base_df,
@@ -70,25 +179,28 @@ def velocity_layers(
         folder_number,
         width_min_pixels=1,
         pickable=False,
+        filters=tuple(filters),
+        level_zoom=level_zoom,
     )
 
-    vector_magnitude = np.hypot(east_component, north_component)
-    arrow_mask = np.isfinite(vector_magnitude) & (vector_magnitude > 0)
+    arrow_mask = geometry.arrow_mask
     if not np.any(arrow_mask):
         return layers
 
-    # IconLayer rotation is counter-clockwise; convert from clockwise bearing.
-    angle = -np.degrees(np.arctan2(east_component, north_component)) % 360.0
     arrow_count = int(np.count_nonzero(arrow_mask))
 
     arrow_df = pd.DataFrame(
         {
             "lon": end_lon[arrow_mask],
             "lat": end_lat[arrow_mask],
-            "angle": angle[arrow_mask],
+            "angle": geometry.angle[arrow_mask],
             "icon": [ARROW_ICON] * arrow_count,
         }
     )
+    for name, values in filters.items():
+        arrow_df[f"filter_{name}"] = values[arrow_mask]
+    if levels is not None:
+        arrow_df["level"] = levels[arrow_mask]
     arrow_size = float(
         np.clip(
             line_width * VECTOR_ARROW_SIZE_FACTOR,
@@ -111,6 +223,8 @@ def velocity_layers(
             size_max_pixels=VECTOR_ARROW_MAX_PIXELS,
             billboard=False,
             pickable=False,
+            filters=tuple(filters),
+            level_zoom=level_zoom,
         )
     )
 
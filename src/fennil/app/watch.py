@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from fennil.app.catalog import OPTIONAL_RUN_FILES, REQUIRED_RUN_FILES
+from fennil.app.sources import run_source
+
+# Seconds between two looks at a watched run folder
+WATCH_INTERVAL = 2.0
+
+
+class RunWatcher:
+    """
+    Detect which model files of a run folder changed.
+
+    Files are the names ``reload_folder_data`` takes; each is looked up like
+    the loader does, so a compressed ``model_station.csv.gz`` is watched as
+    ``model_station.csv``.
+
+    The files are polled (size and mtime) rather than watched with inotify,
+    which needs no extra dependency and also works on the network
+    filesystems runs are usually written to. A change is only reported once
+    the file looked the same on two consecutive polls, so a file celeri is
+    still writing is not read half way.
+    """
+
+    def __init__(self, folder, files=(*REQUIRED_RUN_FILES, *OPTIONAL_RUN_FILES)):
+        self.folder = Path(folder)
+        self._source = run_source(folder)
+        self.files = tuple(files)
+        self._previous = self._signature()
+        self._accepted = self._previous
+
+    def _signature(self):
+        signature = {}
+        for name in self.files:
+            try:
+                signature[name] = self._source.signature([name])[1]
+            except OSError:
+                signature[name] = None
+        return signature
+
+    def poll(self):
+        """Files that changed since :meth:`accept` and are no longer changing."""
+        current = self._signature()
+        settled = current == self._previous
+        self._previous = current
+        if not settled:
+            return []
+        # A required file missing is being rewritten, an optional one was removed
+        return [
+            name
+            for name in self.files
+            if current[name] != self._accepted[name]
+            and (current[name] is not None or name in OPTIONAL_RUN_FILES)
+        ]
+
+    def accept(self):
+        """Mark the files reported by the last :meth:`poll` as read."""
+        self._accepted = self._previous
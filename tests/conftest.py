@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from fennil.app.registry import FIELD_REGISTRY, LayerContext
+from fennil.app.state import DatasetSnapshot
+from fennil.app.viz import load_all_viz
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+@pytest.fixture
+def build_layers():
+    """
+    Build the layers of ``data`` drawn with ``fields`` as the first dataset:
+    ``build(data, fields, client_layers=True, velocity_scale=1.0)`` returns
+    the layers by id and the dataset snapshot.
+    """
+    load_all_viz()
+
+    def build(data, fields, client_layers=True, velocity_scale=1.0, folder=RUN):
+        dataset = DatasetSnapshot.from_data(folder, data, fields)
+        ctx = LayerContext(
+            FIELD_REGISTRY.export_specs(),
+            [dataset, DatasetSnapshot()],
+            velocity_scale,
+            client_layers=client_layers,
+        )
+        FIELD_REGISTRY.build_layers(ctx)
+        return {layer.id: layer for layer in ctx.all_layers}, dataset
+
+    return build
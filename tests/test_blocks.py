@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.blocks import block_items, build_block_index
+from fennil.app.io import block_subset, load_folder_data
+
+RUN = Path(__file__).parents[1] / "data" / "0000000226"
+
+
+def test_block_index_groups_stations_and_segments():
+    index = build_block_index(
+        station_labels=[2, 0, 2, 5],
+        west_labels=[0, 2, 2],
+        east_labels=[2, 2, 5],
+        block_labels=[5, 2, 0],
+        names=["c", "b ", "a"],
+    )
+    assert index.labels.tolist() == [0, 2, 5]
+    assert index.names == ("a", "b", "c")
+    assert index.stations([2]).tolist() == [0, 2]
+    assert index.stations([0, 5, 7]).tolist() == [1, 3]
+    # Segment 1 lies inside block 2, segment 2 borders blocks 2 and 5
+    assert index.segments([2]).tolist() == [0, 1, 2]
+    assert index.segments([5]).tolist() == [2]
+
+    stats = index.residual_stats(np.array([1.0, 2.0, 3.0, 4.0]))
+    assert stats["stations"].tolist() == [1, 2, 1]
+    np.testing.assert_allclose(stats["mean"], [2.0, 2.0, 4.0])
+    np.testing.assert_allclose(stats["rms"], [2.0, np.sqrt(5.0), 4.0])
+    np.testing.assert_allclose(stats["max"], [2.0, 3.0, 4.0])
+
+
+def test_block_subset():
+    data = load_folder_data(RUN)
+    assert data.block is not None
+    index = data.block_index
+    assert len(index) == len(data.block)
+    assert len(block_items(data)) == len(index)
+
+    label = int(index.labels[np.argmax(index.station_counts)])
+    subset = block_subset(data, [str(label)])
+    assert (subset.station.block_label == label).all()
+    assert len(subset.station) == index.station_counts.max()
+    sides = subset.segment[["west_labels", "east_labels"]].to_numpy()
+    assert (sides == label).any(axis=1).all()
+    assert block_subset(data, [label]) is subset
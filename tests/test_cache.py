@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fennil.app.cache import DerivedCache
+from fennil.app.geo_projs import (
+    normalize_longitude_difference,
+    web_mercator_to_wgs84,
+    wgs84_to_web_mercator,
+)
+from fennil.app.viz.styles import VELOCITY_SCALE
+from fennil.app.viz.vectors import build_vector_geometry
+
+
+def test_derived_cache_hits_and_misses():
+    cache = DerivedCache(maxsize=2)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get(("a", 1), factory) == 1
+    assert cache.get(("a", 1), factory) == 1
+    assert cache.get(("b", 1), factory) == 2
+    assert cache.get(("b", 2), factory) == 3
+    # ("a", 1) was the least recently used entry and got evicted
+    assert ("a", 1) not in cache
+    assert len(cache) == 2
+
+    summary = cache.stats.summary()
+    assert summary["a"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+    assert summary["b"]["misses"] == 2
+
+    cache.invalidate("b")
+    assert len(cache) == 0
+
+
+def test_derived_cache_computes_once_across_threads():
+    cache = DerivedCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(cache.get, ("slow",), factory)
+        started.wait(5)
+        others = [executor.submit(cache.get, ("slow",), factory) for _ in range(3)]
+        release.set()
+        results = [first.result()] + [future.result() for future in others]
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+    assert cache.stats.summary()["slow"]["misses"] == 1
+
+
+def test_vector_endpoints_match_projection():
+    lon = np.array([-179.9, 10.0, 140.0])
+    lat = np.array([-60.0, 0.0, 42.0])
+    east = np.array([-30.0, 5.0, 0.0])
+    north = np.array([2.0, -5.0, 0.0])
+    x, y = wgs84_to_web_mercator(lon, lat)
+
+    geometry = build_vector_geometry(lon, lat, y, east, north)
+    for velocity_scale in (0.5, 1.0, 20.0):
+        scale = velocity_scale * VELOCITY_SCALE
+        expected_lon, expected_lat = web_mercator_to_wgs84(
+            x + scale * east, y + scale * north
+        )
+        expected_lon = normalize_longitude_difference(lon, expected_lon)
+
+        end_lon, end_lat = geometry.endpoints(velocity_scale)
+        np.testing.assert_allclose(end_lon, expected_lon, atol=1e-9)
+        np.testing.assert_allclose(end_lat, expected_lat, atol=1e-9)
+
+    np.testing.assert_array_equal(geometry.arrow_mask, [True, True, False])
@@ -0,0 +1,62 @@
+import json
+
+from fennil.app.catalog import REQUIRED_RUN_FILES, RunCatalog
+
+
+def make_run(folder, segments=3, solve_type="qp2"):
+    folder.mkdir(parents=True)
+    for name in REQUIRED_RUN_FILES:
+        (folder / name).write_text("a,b\n1,2\n")
+    (folder / "model_segment.csv").write_text("a,b\n" + "1,2\n" * segments)
+    (folder / "config.json").write_text(
+        json.dumps({"solve_type": solve_type, "segment_file_name": "/x/seg_001.csv"})
+    )
+
+
+def test_catalog_scans_incrementally(tmp_path):
+    root = tmp_path / "runs"
+    make_run(root / "0000000001", segments=5)
+    make_run(root / "0000000002", solve_type="hmatrix")
+    (root / "notes").mkdir()
+    (root / "readme.txt").write_text("")
+    path = tmp_path / "catalog.json"
+
+    catalog = RunCatalog(root, path=path)
+    assert catalog.refresh() == 3
+    run = catalog.runs["0000000001"]
+    assert run.valid
+    assert run.stats == {"stations": 1, "segments": 5, "triangles": 1}
+    assert run.params == {"solve_type": "qp2", "segment_file_name": "seg_001.csv"}
+    assert not catalog.runs["notes"].valid
+
+    # Reloaded from disk, only the folder that changed is scanned again
+    catalog = RunCatalog(root, path=path)
+    assert catalog.refresh() == 0
+    (root / "0000000002" / "model_block.csv").write_text("a\n1\n2\n")
+    assert catalog.refresh() == 1
+    assert catalog.runs["0000000002"].stats["blocks"] == 2
+
+    page, total = catalog.search("hmatrix")
+    assert [entry.name for entry in page] == ["0000000002"]
+    assert total == 1
+    page, total = catalog.search(offset=1, limit=2)
+    assert total == 4
+    assert [getattr(item, "name", item) for item in page] == ["0000000002", "notes"]
+    page, total = catalog.search(valid_only=True)
+    assert total == 2
+
+
+def test_catalog_lists_before_scanning(tmp_path):
+    root = tmp_path / "runs"
+    make_run(root / "0000000001")
+    catalog = RunCatalog(root, path=tmp_path / "catalog.json")
+
+    assert catalog.list_folder()
+    assert catalog.runs["0000000001"].valid is None
+    assert not catalog.list_folder(max_age=60)
+
+    assert catalog.stale(["0000000001", "missing"]) == ["0000000001"]
+    assert catalog.scan(["0000000001"]) == 1
+    assert catalog.runs["0000000001"].valid
+    assert catalog.stale(["0000000001"]) == []
+    assert catalog.stale(["0000000001"], max_age=0) == ["0000000001"]
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.styles import SLIP_COLORMAP
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+def test_colormap_bins():
+    index = SLIP_COLORMAP.index([-1e3, -100, 0, 99.9, 100, np.nan])
+    assert index.tolist() == [0, 0, 5, 10, 10, 5]
+    assert SLIP_COLORMAP.colors([0]) == [SLIP_COLORMAP.palette[5]]
+
+
+def test_slip_colored_on_client(build_layers):
+    data = load_folder_data(RUN)
+    # Segments -> FennilPathLayer -> FennilFilterLayer -> FennilColormapLayer
+    layers, _ = build_layers(data, {"slip": "ss"})
+    colormapped = layers["segments_1"].layer.layer
+    assert colormapped.type == "FennilColormapLayer"
+    assert colormapped.colormap == "slip"
+    assert colormapped.value_range == [SLIP_COLORMAP.vmin, SLIP_COLORMAP.vmax]
+    assert "color_value" in colormapped.layer.data[0]
+
+    layers, _ = build_layers(data, {"slip": "ss"}, client_layers=False)
+    baked = layers["segments_1"]
+    assert baked.type == "LineLayer"
+    assert "color" in baked.data[0]
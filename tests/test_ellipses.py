@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.ellipses import ellipse_shapes
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+def test_ellipse_shapes_match_eigen_decomposition():
+    rng = np.random.default_rng(0)
+    east_sig = rng.uniform(0.5, 3.0, 50)
+    north_sig = rng.uniform(0.5, 3.0, 50)
+    corr = rng.uniform(-0.9, 0.9, 50)
+    shapes = ellipse_shapes(east_sig, north_sig, corr)
+
+    cov_en = corr * east_sig * north_sig
+    cov = np.empty((50, 2, 2))
+    cov[:, 0, 0] = east_sig**2
+    cov[:, 1, 1] = north_sig**2
+    cov[:, 0, 1] = cov[:, 1, 0] = cov_en
+    eigvals, eigvecs = np.linalg.eigh(cov)
+    np.testing.assert_allclose(shapes.major, np.sqrt(eigvals[:, 1]))
+    np.testing.assert_allclose(shapes.minor, np.sqrt(eigvals[:, 0]))
+    # The major axis is the leading eigenvector, up to its sign
+    axis = np.stack(
+        [np.cos(np.radians(shapes.angle)), np.sin(np.radians(shapes.angle))], axis=-1
+    )
+    np.testing.assert_allclose(np.abs(np.sum(axis * eigvecs[:, :, 1], axis=1)), 1.0)
+
+
+def test_ellipse_layers(build_layers):
+    data = load_folder_data(RUN)
+
+    def build(client_layers, velocity_scale=1.0):
+        layers, dataset = build_layers(
+            data, {"sig": True}, client_layers, velocity_scale
+        )
+        assert "sig" in dataset.available_fields
+        return layers
+
+    layers = build(client_layers=True)
+    ellipses = layers["ellipses_343"].layer
+    assert ellipses.type == "FennilEllipseLayer"
+    assert ellipses.layer.type == "ScatterplotLayer"
+    assert len(ellipses.layer.data) == len(data.station)
+    # Rescaling moves the vector tips, the shapes are scaled on the GPU
+    rescaled = build(client_layers=True, velocity_scale=2.0)["ellipses_343"].layer
+    assert rescaled.layer.radius_scale == 2.0
+    assert rescaled.layer.data[0]["ratio"] == ellipses.layer.data[0]["ratio"]
+
+    assert build(client_layers=False)["ellipses_343"].type == "PolygonLayer"
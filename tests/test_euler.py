@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.euler import (
+    EULER_GRID_STATIC_LEVEL,
+    euler_grid,
+    euler_grid_layers,
+    grid_levels,
+    rotation_velocities,
+)
+
+RUN = Path(__file__).parents[1] / "data" / "0000000226"
+
+
+def test_grid_levels_nest():
+    i, j = np.meshgrid(np.arange(9), np.arange(9))
+    level = grid_levels(i.ravel(), j.ravel(), levels=3)
+    counts = np.bincount(level)
+    # Each level doubles the resolution of the ones above it
+    assert np.cumsum(counts).tolist() == [4, 9, 25, 81]
+
+
+def test_rotation_velocities_match_stations():
+    data = load_folder_data(RUN)
+    station = data.station
+    poles = data.block.set_index("block_label").loc[station.block_label]
+    east, north = rotation_velocities(
+        station.lon.to_numpy(),
+        station.lat.to_numpy(),
+        poles.euler_lon.to_numpy(),
+        poles.euler_lat.to_numpy(),
+        poles.euler_rate.to_numpy(),
+    )
+    np.testing.assert_allclose(
+        east, station.model_east_vel_rotation, rtol=1e-2, atol=0.05
+    )
+    np.testing.assert_allclose(
+        north, station.model_north_vel_rotation, rtol=1e-2, atol=0.05
+    )
+
+
+def test_euler_grid_layers():
+    data = load_folder_data(RUN)
+    grid = euler_grid(data)
+    assert grid is euler_grid(data)
+    assert len(grid) > 0
+
+    layers = euler_grid_layers(1, data, (0, 150, 0, 160), 1, 1.0)
+    assert layers[0].type == "FennilLevelLayer"
+    assert len(layers[0].layer.data) == len(grid)
+
+    static = euler_grid_layers(1, data, (0, 150, 0, 160), 1, 1.0, client_layers=False)
+    assert static[0].type == "LineLayer"
+    assert len(static[0].data) == np.count_nonzero(
+        grid.level <= EULER_GRID_STATIC_LEVEL
+    )
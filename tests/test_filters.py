@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.filters import (
+    STATION_FILTERS,
+    filter_bounds,
+    station_filter_values,
+)
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+FIELDS = {"obs": True, "slip": "ss"}
+
+
+def test_filtered_layers_carry_filter_values(build_layers):
+    data = load_folder_data(RUN)
+    values = station_filter_values(data)
+    assert tuple(values) == STATION_FILTERS
+    np.testing.assert_allclose(values["resmag"], data.resmag)
+
+    layers, dataset = build_layers(data, FIELDS)
+    filtered = {
+        layer_id: layer
+        for layer_id, layer in layers.items()
+        if layer.type == "FennilFilterLayer"
+    }
+    assert filtered["obs_vel_343"].filters == "resmag,velocity,block"
+    assert "filter_resmag" in filtered["obs_vel_343"].layer.data[0]
+    # Fault paths stay visible, slip paths are filtered per vertex
+    assert layers["segments_1"].layer.type == "FennilFilterLayer"
+
+    bounds = filter_bounds([dataset])
+    assert set(bounds) == {*STATION_FILTERS, "slip"}
+    assert bounds["resmag"][0] <= values["resmag"].min()
+
+    # Standalone exports have no fennil.js to apply them
+    layers, _ = build_layers(data, FIELDS, client_layers=False)
+    assert all(layer.type != "FennilFilterLayer" for layer in layers.values())
@@ -0,0 +1,74 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.heatmap import (
+    encode_png,
+    idw_interpolate,
+    residual_heatmap_compare_layers,
+    residual_heatmap_layers,
+    residual_raster,
+    scalar_image,
+    station_raster_grid,
+)
+
+RUN = Path(__file__).parents[1] / "data" / "0000000226"
+OTHER_RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+def test_idw_interpolate():
+    values = idw_interpolate(
+        np.array([10.0, 10.5, 11.0, 40.0]),
+        np.zeros(4),
+        np.array([10.0, 11.0]),
+        np.zeros(2),
+        np.array([1.0, 3.0]),
+    )
+    np.testing.assert_allclose(values[:3], [1.0, 2.0, 3.0])
+    # Farther than HEATMAP_MAX_STATION_DEG from every station
+    assert np.isnan(values[3])
+
+
+def test_encode_png():
+    raster = np.array([[0.0, 1.0], [np.nan, 2.0]])
+    rgba, value_range = scalar_image(raster)
+    assert value_range == [0.0, 2.0]
+    assert rgba[..., 0].tolist() == [[0, 128], [0, 255]]
+    assert rgba[..., 3].tolist() == [[255, 255], [0, 255]]
+
+    png = encode_png(rgba)
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    assert struct.unpack(">II", png[16:24]) == (2, 2)
+    start = png.index(b"IDAT") + 4
+    (length,) = struct.unpack(">I", png[start - 8 : start - 4])
+    scanlines = zlib.decompress(png[start : start + length])
+    assert scanlines == b"\x00" + rgba[0].tobytes() + b"\x00" + rgba[1].tobytes()
+
+
+def test_residual_heatmap_layers():
+    data = load_folder_data(RUN)
+    grid = station_raster_grid(data)
+    raster = residual_raster(data)
+    assert raster is residual_raster(data, "mag", grid)
+    assert raster.shape == (grid.height, grid.width)
+    # Only the pixels around the stations are interpolated, all of them
+    lon, lat = grid.pixel_centers()
+    full = idw_interpolate(
+        lon, lat, data.station.lon.to_numpy(), data.station.lat.to_numpy(), data.resmag
+    )
+    np.testing.assert_array_equal(raster.ravel(), full)
+
+    layers = residual_heatmap_layers(1, data, "east")
+    assert layers[0].type == "FennilRasterLayer"
+    assert layers[0].colormap == "res_component"
+    assert layers[0].layer.image.startswith("data:image/png;base64,")
+    static = residual_heatmap_layers(1, data, "mag", client_colors=False)
+    assert static[0].type == "BitmapLayer"
+    assert [layer.id for layer in static] == ["res_heat_mag_1", "res_heat_mag_shift_1"]
+
+    other = load_folder_data(OTHER_RUN)
+    compare = residual_heatmap_compare_layers(data, other, "mag")
+    assert compare[0].colormap == "res_diff"
@@ -0,0 +1,77 @@
+from dataclasses import replace
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.cache import DerivedCache
+from fennil.app.io import build_tde_data
+from fennil.app.mesh import index_vertices, perimeter_edges
+from fennil.app.viz.tde import tde_mesh_layers
+
+
+def test_shared_vertices_and_perimeter():
+    # Unit square split in two triangles, plus a lone triangle in another mesh
+    # that reuses the same coordinates.
+    lon = np.array([[0.0, 1.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+    lat = np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 1.0], [0.0, 0.0, 1.0]])
+    dep = np.zeros_like(lon)
+    mesh_idx = np.array([0, 0, 1])
+
+    first_corner, triangles = index_vertices(lon, lat, dep, mesh_idx)
+    assert len(first_corner) == 7
+    assert triangles.dtype == np.int32
+    assert triangles[0, 1] == triangles[1, 0]
+
+    edges, edge_triangle = perimeter_edges(triangles, len(first_corner))
+    assert len(edges) == 4 + 3
+    assert sorted(np.bincount(edge_triangle)) == [2, 2, 3]
+
+
+def steep_meshes():
+    return pd.DataFrame(
+        {
+            "lon1": [130.0, 131.0],
+            "lat1": [30.0, 30.0],
+            "dep1": [0.0, 0.0],
+            "lon2": [131.0, 131.0],
+            "lat2": [30.0, 31.0],
+            "dep2": [0.0, -1000.0],
+            "lon3": [130.0, 130.0],
+            "lat3": [31.0, 31.0],
+            "dep3": [-1000.0, -1000.0],
+            "mesh_idx": [0, 0],
+            "strike_slip_rate": [1.0, 2.0],
+            "dip_slip_rate": [3.0, 4.0],
+        }
+    )
+
+
+def test_build_tde_data_indexed():
+    available, mesh, perim_df = build_tde_data(steep_meshes())
+    assert available
+    assert len(mesh.lon) == 4
+    assert len(mesh) == 2
+    assert len(perim_df) == 4
+    assert np.array(mesh.polygons()).shape == (2, 3, 2)
+
+
+def test_tde_mesh_layers_3d():
+    _, mesh, _ = build_tde_data(steep_meshes())
+    data = SimpleNamespace(tde_mesh=mesh, derived=DerivedCache())
+
+    layer_2d, shift = tde_mesh_layers(1, data, "ss")
+    layer_3d, _ = tde_mesh_layers(1, data, "ss", view_3d=True)
+    assert layer_2d.type == layer_3d.type == "FennilMeshLayer"
+    assert shift.mesh == {"ref": layer_2d.id}
+    assert "depths" not in layer_2d.mesh
+    assert layer_3d.mesh["depths"] == mesh.dep.tolist()
+    # The steep mesh is projected in 2D only
+    assert layer_3d.mesh["positions"] == mesh.positions(projected=False).tolist()
+    assert layer_2d.mesh["positions"] != layer_3d.mesh["positions"]
+    # Keys are stable per view and change with the slip colors
+    assert tde_mesh_layers(1, data, "ss")[0].mesh["key"] == layer_2d.mesh["key"]
+    data.tde_mesh = replace(mesh, ss_rate=-20 * mesh.ss_rate)
+    recolored, _ = tde_mesh_layers(1, data, "ss")
+    assert recolored.mesh["key"] != layer_2d.mesh["key"]
+    assert recolored.mesh["positions"] is layer_2d.mesh["positions"]
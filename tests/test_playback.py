@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import block_subset
+from fennil.app.playback import load_playback
+
+DATA = Path(__file__).parents[1] / "data"
+RUNS = [DATA / name for name in ("0000000343", "0000000344", "0000000226")]
+
+
+def test_playback_frames():
+    data = load_playback(RUNS, workers=1)
+    playback = data.playback
+    assert playback.names == ("0000000343", "0000000344", "0000000226")
+    assert playback.frames["resmag"].shape == (3, len(data.station))
+    assert playback.frames["segment_ss"].shape == (3, len(data.segment))
+    assert playback.frames["tde_ds"].shape == (3, len(data.tde_mesh))
+    assert all(values.dtype == np.float32 for values in playback.frames.values())
+
+    # The first frame is the run the geometry comes from
+    station = data.station
+    resmag = np.hypot(station.model_east_vel_residual, station.model_north_vel_residual)
+    np.testing.assert_allclose(playback.frames["resmag"][0], resmag, rtol=1e-6)
+    np.testing.assert_allclose(
+        playback.frames["segment_ss"][0],
+        data.segment.model_strike_slip_rate,
+        rtol=1e-6,
+    )
+    # Other runs differ, even on another mesh
+    assert not np.array_equal(
+        playback.frames["tde_ss"][0], playback.frames["tde_ss"][2]
+    )
+
+    payload = playback.payload("resmag")
+    assert payload["key"].endswith("-resmag")
+    assert len(payload["values"]) == payload["count"] * payload["size"]
+
+
+def test_playback_layers(build_layers):
+    data = load_playback(RUNS[:2], workers=1)
+    layers, dataset = build_layers(data, {"play": "ss"})
+    assert "play" in dataset.available_fields
+    assert {"play_segment_ss_1", "play_tde_ss_1"} <= set(layers)
+
+    # Segments -> FennilPathLayer -> FennilFrameLayer -> FennilColormapLayer
+    frames = layers["play_segment_ss_1"].layer
+    assert frames.type == "FennilFrameLayer"
+    assert frames.frames["size"] == len(data.segment)
+    assert "frame_index" in frames.layer.layer.data[0]
+
+    # Headless renders have no client to step the frames
+    layers, _ = build_layers(data, {"play": "ss"}, client_layers=False)
+    assert not any(layer_id.startswith("play_") for layer_id in layers)
+
+
+def test_playback_block_subset(build_layers):
+    data = load_playback(RUNS[:2], workers=1)
+    index = data.block_index
+    label = int(index.labels[np.argmax(index.station_counts)])
+    subset = block_subset(data, [label])
+    frames = subset.playback.frames
+    assert frames["resmag"].shape == (2, len(subset.station))
+    assert frames["segment_ss"].shape == (2, len(subset.segment))
+    np.testing.assert_array_equal(frames["tde_ss"], data.playback.frames["tde_ss"])
+
+    layers, _ = build_layers(subset, {"play": "res"})
+    # Icons -> FennilFrameLayer -> FennilColormapLayer
+    assert layers["play_resmag_1"].type == "FennilFrameLayer"
+    assert layers["play_resmag_1"].frames["size"] == len(subset.station)
@@ -0,0 +1,45 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from fennil.app.catalog import REQUIRED_RUN_FILES
+from fennil.app.prefetch import Prefetcher, folder_signature
+
+
+def make_runs(root, count):
+    folders = []
+    for idx in range(count):
+        folder = root / f"{idx:010d}"
+        folder.mkdir()
+        for name in REQUIRED_RUN_FILES:
+            (folder / name).write_text("")
+        folders.append(folder)
+    return folders
+
+
+def test_prefetch_cancels_and_serves_loaded_runs(tmp_path):
+    a, b, c = make_runs(tmp_path, 3)
+    release = threading.Event()
+    loaded = []
+
+    def loader(folder):
+        release.wait(5)
+        loaded.append(folder.name)
+        return SimpleNamespace(tde_mesh=None, values=np.zeros(1000))
+
+    prefetcher = Prefetcher(loader, workers=1, max_bytes=20_000)
+    prefetcher.prefetch([a, b])
+    # The selection moved on: b has not started yet and is dropped
+    prefetcher.prefetch([a, c])
+    release.set()
+
+    data = prefetcher.load(a)
+    assert prefetcher.load(a) is data
+    assert prefetcher.load(c) is prefetcher.load(c)
+    assert sorted(loaded) == [a.name, c.name]
+
+    # Two 8 kB datasets fit in the 20 kB budget, the least recent is evicted
+    prefetcher.load(b)
+    assert folder_signature(a) not in prefetcher.cache
+    assert len(prefetcher.cache) == 2
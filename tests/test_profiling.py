@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from fennil.app.profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.update(), profiler.stage("fields"):
+        pass
+    assert not profiler.updates
+
+
+def test_stages_and_chrome_trace():
+    profiler = Profiler()
+    profiler.enabled = True
+    with profiler.update(scale=1.0):
+        with profiler.stage("fields"), profiler.stage("field", field="obs"):
+            pass
+        profiler.attribute_layers("obs", [SimpleNamespace(id="obs_vel_1")])
+        profiler.record_payload({"layers": [{"id": "obs_vel_1"}, {"id": "x"}]})
+
+    report = profiler.report()
+    (update,) = report["updates"]
+    assert [stage["label"] for stage in update["stages"]] == [
+        "fields",
+        "field / obs",
+    ]
+    assert set(update["fields_kb"]) == {"obs", "other"}
+
+    trace = profiler.to_chrome_trace()["traceEvents"]
+    assert [event["name"] for event in trace] == [
+        "update_layers",
+        "field / obs",
+        "fields",
+    ]
+    assert all(event["ph"] == "X" for event in trace)
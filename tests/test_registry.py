@@ -0,0 +1,59 @@
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from fennil.app.registry import FieldRegistry, LayerContext
+from fennil.app.viz.manifest import FIELDS_PACKAGE, MANIFEST
+
+
+def test_lazy_field_resolves_on_first_use():
+    registry = FieldRegistry()
+    registry.register_lazy("obs", MANIFEST["obs"], f"{FIELDS_PACKAGE}.obs")
+    assert registry.field_defaults() == {"obs": False}
+    assert registry.builder("obs") is sys.modules[f"{FIELDS_PACKAGE}.obs"].builder
+
+
+def test_startup_skips_heavy_imports():
+    code = (
+        "import sys; from fennil.app.core import FennilApp; FennilApp(); "
+        "print(sorted({'pandas', 'pydeck', 'fennil.app.io'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_parallel_build_merges_in_field_order():
+    registry = FieldRegistry()
+    names = ["a", "b", "c", "d"]
+    derived_calls = []
+
+    def derive(data):
+        derived_calls.append(data)
+
+    def builder(name, ctx):
+        # Later fields finish first
+        time.sleep(0.01 * (len(names) - names.index(name)))
+        ctx.layers.append(name)
+        ctx.vector_layers.append(f"{name}-vector")
+
+    for name in names:
+        registry.register(
+            name, MANIFEST["obs"], builder, lambda _: True, derived=(derive,)
+        )
+
+    data = object()
+    dataset = SimpleNamespace(
+        enabled=True,
+        fields=dict.fromkeys(names, True),
+        available_fields=names,
+        data=data,
+    )
+    ctx = LayerContext(registry.export_specs(), [dataset], 1.0)
+    registry.build_layers(ctx)
+
+    assert ctx.layers == names
+    assert ctx.vector_layers == [f"{name}-vector" for name in names]
+    assert derived_calls == [data]
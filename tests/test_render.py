@@ -0,0 +1,45 @@
+import json
+import shutil
+from pathlib import Path
+
+from fennil.app.render import (
+    RenderJob,
+    main,
+    parse_fields,
+    parse_view,
+    shared_meshes,
+)
+
+DATA = Path(__file__).resolve().parents[1] / "data" / "0000000226"
+
+
+def test_parse_arguments():
+    assert parse_fields(["obs", "tde=ss"]) == {"obs": True, "tde": "ss"}
+    assert parse_view("auto") is None
+    view = parse_view("36.5,138,6,30")
+    assert (view.latitude, view.longitude, view.zoom, view.pitch) == (
+        36.5,
+        138.0,
+        6.0,
+        30.0,
+    )
+
+
+def test_render_json(tmp_path):
+    args = [str(DATA), "--fields", "obs", "--format", "json"]
+    assert main([*args, "--output", str(tmp_path), "--workers", "1"]) == 0
+    deck = json.loads((tmp_path / "0000000226.json").read_text())
+    assert any(layer["id"].startswith("obs") for layer in deck["layers"])
+
+
+def test_render_shared_mesh_workers(tmp_path):
+    folders = []
+    for name in ("a", "b"):
+        shutil.copytree(DATA, tmp_path / "runs" / name)
+        folders.append(str(tmp_path / "runs" / name))
+    assert len(shared_meshes([RenderJob(Path(f), tmp_path) for f in folders])) == 1
+
+    args = [*folders, "--format", "json", "--workers", "2"]
+    assert main([*args, "--output", str(tmp_path)]) == 0
+    assert (tmp_path / "a.json").exists()
+    assert (tmp_path / "b.json").exists()
@@ -0,0 +1,65 @@
+import asyncio
+
+from fennil.app.scheduler import RenderScheduler
+
+
+def test_requests_are_coalesced_and_superseded_renders_cancelled():
+    state = {"value": 0}
+    pushed = []
+
+    async def render(token):
+        value = state["value"]
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            token.raise_if_cancelled()
+        pushed.append(value)
+
+    async def scenario():
+        scheduler = RenderScheduler(render, delay=0.01)
+        # A burst of changes renders once
+        for value in range(1, 6):
+            state["value"] = value
+            scheduler.request()
+        await scheduler.wait()
+        assert pushed == [5]
+
+        # A change during a render cancels it, the latest state still lands
+        state["value"] = 6
+        scheduler.request()
+        await asyncio.sleep(0.03)
+        state["value"] = 7
+        scheduler.request()
+        await scheduler.wait()
+        assert pushed == [5, 7]
+        return scheduler.stats
+
+    stats = asyncio.run(scenario())
+    assert stats == {"requested": 7, "rendered": 2, "coalesced": 4, "cancelled": 1}
+
+
+def test_failed_render_keeps_serving_and_renders_without_loop():
+    pushed = []
+
+    async def render(token):
+        token.raise_if_cancelled()
+        if not pushed:
+            pushed.append("failed")
+            msg = "broken field"
+            raise ValueError(msg)
+        pushed.append("ok")
+
+    async def scenario():
+        scheduler = RenderScheduler(render, delay=0.01)
+        scheduler.request()
+        await scheduler.wait()
+        scheduler.request()
+        await scheduler.wait()
+
+    asyncio.run(scenario())
+    assert pushed == ["failed", "ok"]
+
+    # No running event loop: the render happens in request()
+    scheduler = RenderScheduler(render)
+    scheduler.request()
+    assert pushed == ["failed", "ok", "ok"]
+    assert scheduler.stats["rendered"] == 1
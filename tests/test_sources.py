@@ -0,0 +1,58 @@
+import gzip
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from fennil.app.catalog import RunCatalog
+from fennil.app.io import is_valid_data_folder, load_folder_data, mesh_digest
+from fennil.app.prefetch import folder_signature
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+def make_archive(tmp_path, suffix):
+    archive = tmp_path / f"runs{suffix}"
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path in RUN.iterdir():
+                zf.write(path, f"{RUN.name}/{path.name}")
+    else:
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(RUN, arcname=f"./{RUN.name}")
+    return archive
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_runs_load_from_archives(tmp_path, suffix):
+    archive = make_archive(tmp_path, suffix)
+    run = archive / RUN.name
+    assert is_valid_data_folder(run)
+    assert not is_valid_data_folder(archive / "missing")
+    assert mesh_digest(run) == mesh_digest(RUN)
+
+    data = load_folder_data(run)
+    expected = load_folder_data(RUN)
+    assert len(data.station) == len(expected.station)
+    assert len(data.tde_mesh) == len(expected.tde_mesh)
+    # Keyed by the archive version, so the prefetch cache keeps it
+    assert folder_signature(run)[1] is not None
+
+    catalog = RunCatalog(archive, path=tmp_path / "catalog.json")
+    catalog.refresh()
+    assert list(catalog.runs) == [RUN.name]
+    assert catalog.runs[RUN.name].valid
+
+
+def test_compressed_csv_files(tmp_path):
+    run = tmp_path / RUN.name
+    shutil.copytree(RUN, run)
+    station = run / "model_station.csv"
+    with station.open("rb") as src, gzip.open(f"{station}.gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    station.unlink()
+
+    assert is_valid_data_folder(run)
+    assert len(load_folder_data(run).station) == len(load_folder_data(RUN).station)
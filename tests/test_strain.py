@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.strain import (
+    build_strain_operator,
+    strain_operator,
+    strain_rate_layers,
+    strain_rates,
+)
+
+# Triangulating needs the strain extra
+pytest.importorskip("scipy")
+
+RUN = Path(__file__).parents[1] / "data" / "0000000226"
+
+
+def test_uniform_strain_is_recovered():
+    lon, lat = np.meshgrid(np.linspace(139.0, 140.0, 6), np.linspace(35.0, 36.0, 6))
+    lon, lat = lon.ravel(), lat.ravel()
+    operator = build_strain_operator(lon, lat)
+    assert len(operator) > 0
+
+    # Local km east/north of the network center
+    x = 111.195 * (lon - 139.5) * np.cos(np.radians(lat))
+    y = 111.195 * (lat - 35.5)
+    # 0.1 (mm/yr)/km east-west extension is 100 nanostrain/yr
+    rates = operator.strain_rates(0.1 * x, np.zeros_like(y))
+    np.testing.assert_allclose(rates.dilatation, 100.0, rtol=2e-2)
+    first, second, angle = rates.principal()
+    np.testing.assert_allclose(first, 100.0, rtol=2e-2)
+    np.testing.assert_allclose(second, 0.0, atol=2.0)
+    np.testing.assert_allclose(np.abs(angle), 0.0, atol=1.0)
+
+    # Rigid rotation does not strain
+    rotation = operator.strain_rates(-0.1 * y, 0.1 * x)
+    np.testing.assert_allclose(rotation.dilatation, 0.0, atol=2.0)
+
+    # Collinear stations have no triangulation
+    operator = build_strain_operator([139.0, 139.5, 140.0], [35.0, 35.5, 36.0])
+    assert len(operator) == 0
+    assert len(operator.strain_rates([1.0] * 3, [0.0] * 3).dilatation) == 0
+
+
+def test_strain_rate_layers():
+    data = load_folder_data(RUN)
+    operator = strain_operator(data)
+    assert strain_operator(data) is operator
+    assert strain_rates(data, "obs") is strain_rates(data, "obs")
+
+    surface, axes = strain_rate_layers(1, data, "res", 1.0)
+    assert surface[0].type == "FennilMeshLayer"
+    assert len(surface[0].mesh["values"]) == len(operator)
+    assert len(axes[0].data) == 2 * len(operator)
+
+    surface, _ = strain_rate_layers(1, data, "res", 1.0, client_layers=False)
+    assert surface[0].type == "PolygonLayer"
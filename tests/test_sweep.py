@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fennil.app.sweep import main, summarize_frames, sweep_matrix
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+def _frames(residual, ss, extra_station=False):
+    lon = [10.0, 11.0, 12.0] + ([13.0] if extra_station else [])
+    station = pd.DataFrame(
+        {
+            "lon": lon,
+            "lat": [45.0] * len(lon),
+            "model_east_vel_residual": [residual] * len(lon),
+            "model_north_vel_residual": [0.0] * len(lon),
+        }
+    )
+    segment = pd.DataFrame(
+        {
+            "lon1": [10.0, 11.0],
+            "lat1": [44.0, 44.0],
+            "lon2": [11.0, 12.0],
+            "lat2": [44.0, 44.0],
+            "model_strike_slip_rate": [ss, ss],
+            "model_dip_slip_rate": [1.0, 1.0],
+            "model_tensile_slip_rate": [0.0, 0.0],
+        }
+    )
+    return station, segment
+
+
+def test_sweep_matrix_metrics():
+    first = summarize_frames("a", "a", *_frames(1.0, 2.0))
+    station, segment = _frames(3.0, 5.0, extra_station=True)
+    # Same segments, reversed and listed twice
+    segment = pd.concat([segment, segment], ignore_index=True)
+    segment[["lon1", "lon2"]] = segment[["lon2", "lon1"]].to_numpy()
+    second = summarize_frames("b", "b", station, segment)
+    assert len(second.segment_keys) == 2
+
+    matrix = sweep_matrix([first, second])
+    np.testing.assert_allclose(matrix.metrics["res_rms"], [[0, 2], [2, 0]])
+    np.testing.assert_allclose(matrix.metrics["ss_rms"], [[0, 3], [3, 0]])
+    np.testing.assert_allclose(matrix.metrics["ds_rms"], 0)
+    np.testing.assert_allclose(matrix.metrics["station_coverage"][0, 1], 0.75)
+    np.testing.assert_array_equal(matrix.shared_stations, [[3, 3], [3, 4]])
+    np.testing.assert_array_equal(matrix.shared_segments, 2)
+    assert len(matrix.cell_colors("res_rms")) == 2
+
+
+def test_sweep_cli(tmp_path, capsys):
+    folders = [str(DATA / name) for name in ("0000000343", "0000000344")]
+    output = tmp_path / "sweep.json"
+    assert main([*folders, "--workers", "2", "--output", str(output)]) == 0
+    content = json.loads(output.read_text())
+    assert content["names"] == ["0000000343", "0000000344"]
+    res_rms = np.array(content["metrics"]["res_rms"])
+    assert res_rms[0, 0] == 0
+    assert res_rms[0, 1] == res_rms[1, 0] > 0
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+
+def test_sweep_matrix_json_without_shared_keys():
+    first = summarize_frames("a", "a", *_frames(1.0, 2.0))
+    station, segment = _frames(1.0, 2.0)
+    station["lon"] += 50.0
+    segment[["lon1", "lon2"]] += 50.0
+    second = summarize_frames("b", "b", station, segment)
+
+    content = sweep_matrix([first, second]).to_dict()
+    assert content["metrics"]["res_rms"][0] == [0.0, None]
+    json.dumps(content, allow_nan=False)
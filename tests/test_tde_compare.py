@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+
+from fennil.app.io import load_folder_data
+from fennil.app.viz.tde_compare import (
+    TDE_COMPARE_MAX_DISTANCE_KM,
+    tde_compare_layers,
+    tde_match,
+    tde_triangle_keys,
+    triangle_hashes,
+)
+
+DATA = Path(__file__).parents[1] / "data"
+
+
+def test_triangle_hashes_ignore_corner_order():
+    lon = np.array(
+        [[140.0, 141.0, 140.5], [140.5, 140.0, 141.0], [140.0, 141.0, 140.6]]
+    )
+    lat = np.array([[35.0, 35.0, 36.0], [36.0, 35.0, 35.0], [35.0, 35.0, 36.0]])
+    dep = np.array([[0.0, -5.0, -10.0], [-10.0, 0.0, -5.0], [0.0, -5.0, -10.0]])
+    hashes = triangle_hashes(lon, lat, dep)
+    assert hashes[0] == hashes[1]
+    assert hashes[0] != hashes[2]
+
+
+def test_tde_match_between_meshes():
+    right = load_folder_data(DATA / "0000000343")
+    left = load_folder_data(DATA / "0000000344")
+    assert len(tde_triangle_keys(right)) < len(tde_triangle_keys(left))
+
+    match = tde_match(right, left)
+    assert tde_match(right, left) is match
+    assert match.identical.any()
+    # Identical triangles carry the same geometry in both runs
+    rows = np.flatnonzero(match.identical)
+    right_mesh, left_mesh = right.tde_mesh, left.tde_mesh
+    np.testing.assert_allclose(
+        np.sort(right_mesh.source_lon[right_mesh.triangles[rows]], axis=1),
+        np.sort(left_mesh.source_lon[left_mesh.triangles[match.source[rows]]], axis=1),
+    )
+
+    # The extra mesh of the second run has no counterpart in the first
+    reverse = tde_match(left, right)
+    unmatched = ~reverse.matched
+    assert unmatched.any()
+    keys = tde_triangle_keys(left).centroids[unmatched][:100]
+    other = tde_triangle_keys(right).centroids
+    distance = np.linalg.norm(keys[:, None] - other[None], axis=-1).min(axis=1)
+    assert (distance > TDE_COMPARE_MAX_DISTANCE_KM).all()
+
+    layers = tde_compare_layers(right, left, "ss")
+    assert layers[0].type == "FennilMeshLayer"
+    assert layers[0].mesh["colormap"] == "slip_diff"
+    assert len(layers[0].mesh["values"]) == np.count_nonzero(match.matched)
+    static = tde_compare_layers(right, left, "ds", client_colors=False)
+    assert static[0].type == "PolygonLayer"
@@ -0,0 +1,30 @@
+import numpy as np
+
+from fennil.app.topology import chain_segments
+
+
+def test_chain_segments():
+    # 0 -> 1 -> 2 with the middle segment stored reversed, then a junction at
+    # (2, 0) where two more segments start, plus a closed triangle.
+    lon1 = np.array([0.0, 2.0, 2.0, 2.0, 10.0, 11.0, 10.0])
+    lat1 = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0])
+    lon2 = np.array([1.0, 1.00001, 3.0, 2.0, 11.0, 10.0, 10.0])
+    lat2 = np.array([0.0, 0.0, 0.0, 1.0, 0.0, 1.0, 0.0])
+
+    paths = chain_segments(lon1, lat1, lon2, lat2)
+    assert sorted(paths.segments.tolist()) == list(range(7))
+    by_segments = dict(
+        zip(
+            map(tuple, paths.split(np.arange(7))),
+            paths.positions(lon1, lat1, lon2, lat2),
+            strict=True,
+        )
+    )
+    assert by_segments[(0, 1)] == [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]]
+    assert (2,) in by_segments
+    assert (3,) in by_segments
+    assert len(by_segments[(4, 5, 6)]) == 4
+
+    widths = paths.vertex_values(np.arange(7.0))
+    assert [len(w) for w in widths] == [len(p) for p in by_segments.values()]
+    assert widths[0] == [0.0, 1.0, 1.0]
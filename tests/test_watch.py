@@ -0,0 +1,84 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fennil.app.io import load_folder_data, reload_folder_data
+from fennil.app.watch import RunWatcher
+
+RUN = Path(__file__).parents[1] / "data" / "0000000343"
+
+
+def test_watcher_reports_settled_changes(tmp_path):
+    path = tmp_path / "model_segment.csv"
+    path.write_text("a\n1\n")
+    watcher = RunWatcher(tmp_path, files=["model_segment.csv"])
+    assert watcher.poll() == []
+
+    path.write_text("a\n1\n2\n")
+    # Still changing on the first look, reported once it settled
+    assert watcher.poll() == []
+    assert watcher.poll() == ["model_segment.csv"]
+    assert watcher.poll() == ["model_segment.csv"]
+    watcher.accept()
+    assert watcher.poll() == []
+
+
+def test_reload_only_recomputes_changed_files(tmp_path):
+    run = tmp_path / RUN.name
+    shutil.copytree(RUN, run)
+    data = load_folder_data(run)
+    data.derived.get(("vector_geometry", "e", "n"), lambda: "stations")
+    data.derived.get(("tde_mesh_payload", False), lambda: "geometry")
+    data.derived.get(("fault_paths",), lambda: "paths")
+
+    meshes = pd.read_csv(run / "model_meshes.csv")
+    meshes["strike_slip_rate"] += 1.0
+    meshes.to_csv(run / "model_meshes.csv", index=False)
+    segment = pd.read_csv(run / "model_segment.csv")
+    segment.loc[0, "lon1"] += 0.5
+    segment.to_csv(run / "model_segment.csv", index=False)
+
+    reloaded = reload_folder_data(data, run, ["model_segment.csv", "model_meshes.csv"])
+    assert reloaded.station is data.station
+    assert reloaded.segment.lon1.iloc[0] == data.segment.lon1.iloc[0] + 0.5
+    # Same triangles: the geometry is kept, only the rates change
+    assert reloaded.tde_mesh.lon is data.tde_mesh.lon
+    np.testing.assert_allclose(reloaded.tde_mesh.ss_rate, data.tde_mesh.ss_rate + 1)
+    assert ("vector_geometry", "e", "n") in reloaded.derived
+    assert ("tde_mesh_payload", False) in reloaded.derived
+    assert ("fault_paths",) not in reloaded.derived
+    # The previous dataset is left untouched
+    assert ("fault_paths",) in data.derived
+
+
+def test_watcher_follows_compressed_and_optional_files(tmp_path):
+    station = tmp_path / "model_station.csv.gz"
+    station.write_bytes(b"a")
+    watcher = RunWatcher(tmp_path)
+    assert "model_block.csv" in watcher.files
+
+    station.write_bytes(b"ab")
+    (tmp_path / "model_block.csv").write_text("a\n1\n")
+    watcher.poll()
+    assert watcher.poll() == ["model_station.csv", "model_block.csv"]
+    watcher.accept()
+
+    # A removed block file is reported, the loader then drops the blocks
+    (tmp_path / "model_block.csv").unlink()
+    watcher.poll()
+    assert watcher.poll() == ["model_block.csv"]
+
+
+def test_reload_rejects_partial_files(tmp_path):
+    run = tmp_path / RUN.name
+    shutil.copytree(RUN, run)
+    data = load_folder_data(run)
+    station = pd.read_csv(run / "model_station.csv")
+    station.drop(columns="model_east_vel_residual").to_csv(
+        run / "model_station.csv", index=False
+    )
+    with pytest.raises(ValueError, match="model_east_vel_residual"):
+        reload_folder_data(data, run, ["model_station.csv"])